@@ -13,65 +13,89 @@ los requerimientos nutricionales diarios, considerando únicamente las restricci
 globales del día y sin distinguir entre diferentes franjas horarias.
 """
 
-import json
 import gurobipy as gp
 from gurobipy import GRB
+from catalogo import cargar_catalogo
+from instrumentacion import hito
+from perfil import PERFIL_BASE
+from resultados import Resultado, lector_gurobi, metadatos_gurobi, publicar
 
-# Cargar datos desde el archivo JSON
-with open("alimentos.json", "r", encoding="utf-8") as file:
-    data = json.load(file)
-
-# Crear modelo
-model = gp.Model("Modelo1")
+# Cargar el catálogo compilado de alimentos
+cat = cargar_catalogo()
+data = cat.indice
 
 # Parámetros nutricionales
-precio = {i: float(info["Precio (€/100g)"]) for i, info in data.items()}
-energia = {i: float(info["Energía (Kcal)"]) for i, info in data.items()}
-carbohidratos = {i: float(info["Hidratos de carbono (g)"]) for i, info in data.items()}
-proteina = {i: float(info["Proteínas (g)"]) for i, info in data.items()}
-grasa = {i: float(info["Lípidos totales (g)"]) for i, info in data.items()}
-
-# Variable de decisión: cantidad de cada alimento en gramos
-X = {i: model.addVar(lb=0, vtype=GRB.CONTINUOUS) for i in data}
-
-# Función objetivo
-model.setObjective(gp.quicksum(precio[i]/100 * X[i] for i in data), GRB.MINIMIZE)
-
-# Restricción de calorías
-model.addConstr(gp.quicksum(energia[i]/100 * X[i] for i in data) >= 2900)
-model.addConstr(gp.quicksum(energia[i]/100 * X[i] for i in data) <= 3100)
-
-# Restricción de carbohidratos (40% de calorías)
-model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i] for i in data) >= 0.4 * 2900)
-model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i] for i in data) <= 0.4 * 3100)
-
-# Restricción de proteínas (30% de calorías)
-model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i] for i in data) >= 0.3 * 2900)
-model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i] for i in data) <= 0.3 * 3100)
-
-# Restricción de grasas (30% de calorías)
-model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i] for i in data) >= 0.3 * 2900)
-model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i] for i in data) <= 0.3 * 3100)
-
-# Resolver el modelo
-model.optimize()
-
-# Mostrar los resultados
-if model.status == GRB.OPTIMAL:
-    output_lines = []
-    output_lines.append("\nDieta óptima encontrada:")
-    for i in data:
-        cantidad = X[i].X
-        if cantidad > 0:
-            output_lines.append(f"  {i}: {cantidad:.2f} g")
-    output_lines.append(f"\nCoste total: {model.ObjVal:.2f} €")
-    # Imprimir por pantalla
-    for line in output_lines:
-        print(line)
-    # Guardar en fichero
-    with open("Resultados/dieta_optima_Modelo1.txt", "w", encoding="utf-8") as f:
-        for line in output_lines:
-            f.write(line + "\n")
-    print("\nDieta óptima guardada en 'Resultados/dieta_optima_Modelo1.txt'.")
-else:
-    print("No se encontró una solución óptima.")
\ No newline at end of file
+precio = cat.diccionario("precio")
+energia = cat.diccionario("energia")
+carbohidratos = cat.diccionario("carbohidratos")
+proteina = cat.diccionario("proteina")
+grasa = cat.diccionario("grasa")
+
+
+def construir_modelo(perfil=PERFIL_BASE):
+    """
+    Construye el Modelo 1 para el perfil nutricional indicado.
+    Devuelve el modelo y un diccionario con las variables de decisión.
+    """
+    kcal_min, kcal_max = perfil["kcal_min"], perfil["kcal_max"]
+    macros = perfil["reparto_macros"]
+
+    # Crear modelo
+    model = gp.Model("Modelo1")
+
+    # Variable de decisión: cantidad de cada alimento en gramos
+    X = {i: model.addVar(lb=0, vtype=GRB.CONTINUOUS) for i in data}
+    hito("variables")
+
+    # Función objetivo
+    model.setObjective(gp.quicksum(precio[i]/100 * X[i] for i in data), GRB.MINIMIZE)
+
+    # Restricción de calorías
+    model.addConstr(gp.quicksum(energia[i]/100 * X[i] for i in data) >= kcal_min, name="calorias_min")
+    model.addConstr(gp.quicksum(energia[i]/100 * X[i] for i in data) <= kcal_max, name="calorias_max")
+
+    # Restricción de carbohidratos (40% de calorías)
+    model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i] for i in data) >= macros["carbohidratos"] * kcal_min, name="carbohidratos_min")
+    model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i] for i in data) <= macros["carbohidratos"] * kcal_max, name="carbohidratos_max")
+
+    # Restricción de proteínas (30% de calorías)
+    model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i] for i in data) >= macros["proteina"] * kcal_min, name="proteina_min")
+    model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i] for i in data) <= macros["proteina"] * kcal_max, name="proteina_max")
+
+    # Restricción de grasas (30% de calorías)
+    model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i] for i in data) >= macros["grasa"] * kcal_min, name="grasa_min")
+    model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i] for i in data) <= macros["grasa"] * kcal_max, name="grasa_max")
+
+    hito("restricciones")
+    return model, {"X": X}
+
+
+def extraer_resultado(variables, valor, metadatos=None):
+    """
+    Extrae la solución como Resultado (ver resultados.py). 'valor' lee en bloque los
+    valores de las variables (resultados.lector_gurobi o Solucion.valor).
+    """
+    X = valor(variables["X"])
+    return Resultado.desde_registros(((None, None, None, i, X[i]) for i in data if X[i] > 0), metadatos)
+
+
+def escribir_resultados(model, variables, ruta="Resultados/dieta_optima_Modelo1"):
+    """
+    Muestra los resultados y los guarda en ruta (.json, .npz y el informe en .txt).
+    """
+    if model.status == GRB.OPTIMAL:
+        resultado = extraer_resultado(variables, lector_gurobi(model), metadatos_gurobi(model, "Modelo1", PERFIL_BASE))
+        publicar(resultado, ruta)
+    else:
+        print("No se encontró una solución óptima.")
+
+
+if __name__ == "__main__":
+    # Crear modelo
+    model, variables = construir_modelo()
+
+    # Resolver el modelo
+    model.optimize()
+
+    # Mostrar los resultados y guardarlos en un fichero
+    escribir_resultados(model, variables)
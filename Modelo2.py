@@ -15,170 +15,205 @@ los requisitos de nutrientes, incluir la división de comidas permite distribuir
 nutrientes de una manera más realista.
 """
 
-import json
+import numpy as np
 import gurobipy as gp
 from gurobipy import GRB
+from catalogo import cargar_catalogo
+from instrumentacion import hito
+from perfil import PERFIL_BASE
+from resultados import Resultado, lector_gurobi, metadatos_gurobi, publicar
 
-# Cargar datos desde el archivo JSON
-with open("alimentos.json", "r", encoding="utf-8") as file:
-    data = json.load(file)
-
-# Crear modelo
-model = gp.Model("Modelo2")
+# Cargar el catálogo compilado de alimentos
+cat = cargar_catalogo()
+data = cat.indice
 
 # Índices
 franjas = ["desayuno", "comida", "merienda", "cena"]
 
-# Mapear categorías a números
-categorias_map = {
-    "Cereales y derivados": 1, "Leche y productos lácteos": 2, "Huevos": 3, "Azúcares y dulces": 4,
-    "Aceites y grasas": 5, "Verduras y hortalizas": 6, "Legumbres": 7, "Frutas": 8, "Frutos secos": 9,
-    "Carnes": 10, "Productos cárnicos": 11, "Pescados": 12, "Crustáceos y moluscos": 13,
-    "Condimentos y aperitivos": 14, "Bebidas": 15
-}
-
 # Parámetros nutricionales
-precio = {i: float(info["Precio (€/100g)"]) for i, info in data.items()}
-energia = {i: float(info["Energía (Kcal)"]) for i, info in data.items()}
-carbohidratos = {i: float(info["Hidratos de carbono (g)"]) for i, info in data.items()}
-proteina = {i: float(info["Proteínas (g)"]) for i, info in data.items()}
-grasa = {i: float(info["Lípidos totales (g)"]) for i, info in data.items()}
-categorias = {i: categorias_map[info["Categoría"]] for i, info in data.items()}
-maximo = {i: float(info["Máximo (g/día)"]) for i, info in data.items()}
+precio = cat.diccionario("precio")
+energia = cat.diccionario("energia")
+carbohidratos = cat.diccionario("carbohidratos")
+proteina = cat.diccionario("proteina")
+grasa = cat.diccionario("grasa")
+categorias = cat.diccionario("categoria")
+maximo = cat.diccionario("maximo")
 
 # Crear subconjuntos por categoría
-frutas = [i for i in data if data[i]["Categoría"] == "Frutas"]
-legumbres = [i for i in data if data[i]["Categoría"] == "Legumbres"]
-carnes = [i for i in data if data[i]["Categoría"] == "Carnes"]
-pescados = [i for i in data if data[i]["Categoría"] == "Pescados"]
-lacteos = [i for i in data if data[i]["Categoría"] == "Leche y productos lácteos"]
-verduras = [i for i in data if data[i]["Categoría"] == "Verduras y hortalizas"]
-azúcares = [i for i in data if data[i]["Categoría"] == "Azúcares y dulces"]
+frutas = cat.subconjunto("Frutas")
+legumbres = cat.subconjunto("Legumbres")
+carnes = cat.subconjunto("Carnes")
+pescados = cat.subconjunto("Pescados")
+lacteos = cat.subconjunto("Leche y productos lácteos")
+verduras = cat.subconjunto("Verduras y hortalizas")
+azúcares = cat.subconjunto("Azúcares y dulces")
 
 # Creamos el subconjunto de alimentos que pueden ser postre
-postre = [i for i in data if data[i].get("Extra") == "Postre"]
-
-# Distribución de calorías por franja horaria
-distr_calorica = {"desayuno": 0.2, "comida": 0.4, "merienda": 0.1, "cena": 0.3}
-
-# Distribución de macronutrientes por franja horaria
-distr_macros = {
-    "carbohidratos": {"desayuno": 0.5, "comida": 0.35, "merienda": 0.4, "cena": 0.4},
-    "proteina": {"desayuno": 0.25, "comida": 0.4, "merienda": 0.3, "cena": 0.3},
-    "grasa": {"desayuno": 0.25, "comida": 0.25, "merienda": 0.3, "cena": 0.3}
-}
-
-# Categorías permitidas por franja
-categorias_permitidas = {
-    "desayuno": {1, 2, 3, 4, 5, 8, 11},
-    "comida": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15},
-    "merienda": {1, 2, 3, 4, 5, 8, 9, 11},
-    "cena": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15}
-}
-
-# Variable de decisión: cantidad en gramos de cada alimento i en la franja j
-X = {(i, j): model.addVar(lb=0, vtype=GRB.CONTINUOUS) for i in data for j in franjas} #categorias no permitidas aqui
-
-# Variable de decisión binaria: 1 si esta presente el alimento i en la franja j
-Y = {(i, j): model.addVar(vtype=GRB.BINARY) for i in data for j in franjas}
-
-# Variable de decisión binaria: 1 si esta presente el tipo de alimento en la franja j
-F = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # frutas
-V = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # verduras
-L = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # legumbres
-C = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # carne
-P = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # pescado
-LC = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # leche y lácteos
-A = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # azúcares y dulces
-
-# Función objetivo
-model.setObjective(gp.quicksum(precio[i]/100 * X[i, j] for i in data for j in franjas), GRB.MINIMIZE)
-
-   
-# Restricciones por franja
-for j in franjas:
-    d_j = distr_calorica[j]
-    # Restricción de calorías
-    model.addConstr(gp.quicksum(energia[i]/100 * X[i, j] for i in data) >= d_j * 2900)
-    model.addConstr(gp.quicksum(energia[i]/100 * X[i, j] for i in data) <= d_j * 3100)
-    # Restricción de macronutrientes
-    model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j] for i in data) >= distr_macros["carbohidratos"][j] * d_j * 2900)
-    model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j] for i in data) <= distr_macros["carbohidratos"][j] * d_j * 3100)
-    model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j] for i in data) >= distr_macros["proteina"][j] * d_j * 2900)
-    model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j] for i in data) <= distr_macros["proteina"][j] * d_j * 3100)
-    model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j] for i in data) >= distr_macros["grasa"][j] * d_j * 2900)
-    model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j] for i in data) <= distr_macros["grasa"][j] * d_j * 3100)
-    # Restricción de categorías permitidas
-    for i in data:
-        if categorias[i] not in categorias_permitidas[j]:
-            model.addConstr(X[i, j] == 0)
-    # Restricción de gramos mínimo y máximo por alimento
-        model.addConstr(X[i, j] >= 20 * Y[i, j])
-        model.addConstr(X[i, j] <= maximo[i] * Y[i, j])
-    # Restriccion al menos 150g de frutas
-    model.addConstr(gp.quicksum(X[i, j] for i in frutas) >= 150 * F[j])
-    # Restriccion al menos 80g de verduras y máximo 250g
-    model.addConstr(gp.quicksum(X[i, j] for i in verduras) >= 80 * V[j])
-    model.addConstr(gp.quicksum(X[i, j] for i in verduras) <= 250 * V[j])
-    # Restriccion máximo 100g de legumbres
-    model.addConstr(gp.quicksum(X[i, j] for i in legumbres) <= 100 * L[j])
-    # Restriccion máximo 250g de carne
-    model.addConstr(gp.quicksum(X[i, j] for i in carnes) <= 250 * C[j])
-    # Restriccion máximo 200g de pescado
-    model.addConstr(gp.quicksum(X[i, j] for i in pescados) <= 200 * P[j])
-    # Restriccion en una misma franja solo puede haber carne o pescado, no ambos
-    model.addConstr(C[j] + P[j] <= 1)
-    # Restriccion máximo 200g de leche o lácteos
-    model.addConstr(gp.quicksum(X[i, j] for i in lacteos) <= 200 * LC[j])
-    # Restriccion máximo 35g de azúcares o dulces
-    model.addConstr(gp.quicksum(X[i, j] for i in azúcares) <= 35 * A[j])
-
-# Restricción no repetir alimentos     
-for i in data:
-    model.addConstr(gp.quicksum(Y[i, j] for j in franjas) <= 1)
-    
-# Restricciones adicionales (frutas en 3 franjas al menos, verduras en 2 franjas al menos, legumbres como mucho en 1 franja)
-model.addConstr(gp.quicksum(F[j] for j in franjas) >= 3)
-model.addConstr(gp.quicksum(V[j] for j in franjas) >= 2)
-model.addConstr(gp.quicksum(L[j] for j in franjas) <= 1)
-model.addConstr(gp.quicksum(A[j] for j in franjas) <= 1)
-
-# Restricción en el desayuno incluir leche o café o ambos
-if "leche desnatada" in data and "café" in data:
-    model.addConstr(X["leche desnatada", "desayuno"] + X["café", "desayuno"] >= 200)
-    
-
-# Restriccion de no incluir arroz y pasta en desayuno y merienda
+postre = cat.postres()
+
+# Alimentos que no se pueden incluir en desayuno y merienda
 alimentos_prohibidos = ["arroz", "pasta", "quinoa"]
-for j in ["desayuno", "merienda"]:
-    for i in alimentos_prohibidos:
-        model.addConstr(X[i, j] == 0)
-
-# Restricción de incluir postres en comida y cena
-for j in ["comida", "cena"]:
-    model.addConstr(gp.quicksum(X[i, j] for i in frutas + postre if i in data) >= 150)
-    
-# Resolver el modelo
-model.optimize()
-
-# Mostrar los resultados y guardarlos en un fichero
-if model.status == GRB.OPTIMAL:
-    output_lines = []
-    output_lines.append("\nDieta óptima encontrada:")
+prohibidos_franja = {j: alimentos_prohibidos for j in ["desayuno", "merienda"]}
+
+
+def construir_modelo(perfil=PERFIL_BASE, solo_admisibles=True):
+    """
+    Construye el Modelo 2 para el perfil nutricional indicado.
+    Las variables X e Y solo se crean para los pares (alimento, franja) admisibles; con
+    solo_admisibles=False se crean para todos los pares y los no admisibles se anulan con
+    restricciones X == 0 (formulación original).
+    Devuelve el modelo y un diccionario con las variables de decisión y, en "filas", las
+    restricciones de nutrientes y de cantidad máxima (ver modelo_dieta.py).
+    """
+    kcal_min, kcal_max = perfil["kcal_min"], perfil["kcal_max"]
+    distr_calorica = perfil["distr_calorica"]
+    distr_macros = perfil["distr_macros"]
+    categorias_permitidas = perfil["categorias_permitidas"]
+
+    # Pares (alimento, franja) con variable: solo los admisibles o todos
+    admisible = cat.admisibles(franjas, categorias_permitidas, prohibidos_franja)
+    con_variable = admisible if solo_admisibles else np.ones_like(admisible)
+    pares = [(i, j) for i in data for a, j in enumerate(franjas) if con_variable[data[i], a]]
+    alimentos_franja = {j: [i for i in data if con_variable[data[i], a]] for a, j in enumerate(franjas)}
+
+    hito("indices")
+
+    # Crear modelo
+    model = gp.Model("Modelo2")
+
+    # Variable de decisión: cantidad en gramos de cada alimento i en la franja j
+    X = {(i, j): model.addVar(lb=0, vtype=GRB.CONTINUOUS) for (i, j) in pares}
+
+    # Variable de decisión binaria: 1 si esta presente el alimento i en la franja j
+    Y = {(i, j): model.addVar(vtype=GRB.BINARY) for (i, j) in pares}
+
+    # Variable de decisión binaria: 1 si esta presente el tipo de alimento en la franja j
+    F = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # frutas
+    V = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # verduras
+    L = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # legumbres
+    C = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # carne
+    P = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # pescado
+    LC = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # leche y lácteos
+    A = {(j): model.addVar(vtype=GRB.BINARY) for j in franjas}  # azúcares y dulces
+    hito("variables")
+
+    # Función objetivo
+    model.setObjective(gp.quicksum(precio[i]/100 * X[i, j] for (i, j) in pares), GRB.MINIMIZE)
+
+    # Suma de X[i, j] sobre los alimentos de una lista que tienen variable en la franja j
+    def suma(lista, j):
+        return gp.quicksum(X[i, j] for i in lista if (i, j) in X)
+
+    # Restricciones de nutrientes y de cantidad máxima, por (tipo, franja) y (tipo, alimento, franja)
+    filas = {}
+
+    # Restricciones por franja
     for j in franjas:
-        output_lines.append(f"\n{j.capitalize()}:")
-        for i in data:
-            cantidad = X[i, j].X
-            if cantidad > 0:
-                output_lines.append(f"  {i}: {cantidad:.2f} g")
-    output_lines.append(f"\nCoste total: {model.ObjVal:.2f} €")
-    # Imprimir por pantalla
-    for line in output_lines:
-        print(line)
-    # Guardar en fichero
-    with open("Resultados/dieta_optima_Modelo2.txt", "w", encoding="utf-8") as f:
-        for line in output_lines:
-            f.write(line + "\n")
-    print("\nDieta óptima guardada en 'Resultados/dieta_optima_Modelo2.txt'.")
-else:
-    print("No se encontró una solución óptima.")
+        d_j = distr_calorica[j]
+        alimentos = alimentos_franja[j]
+        # Restricción de calorías
+        filas["calorias_min", j] = model.addConstr(gp.quicksum(energia[i]/100 * X[i, j] for i in alimentos) >= d_j * kcal_min)
+        filas["calorias_max", j] = model.addConstr(gp.quicksum(energia[i]/100 * X[i, j] for i in alimentos) <= d_j * kcal_max)
+        # Restricción de macronutrientes
+        filas["carbohidratos_min", j] = model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j] for i in alimentos) >= distr_macros["carbohidratos"][j] * d_j * kcal_min)
+        filas["carbohidratos_max", j] = model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j] for i in alimentos) <= distr_macros["carbohidratos"][j] * d_j * kcal_max)
+        filas["proteina_min", j] = model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j] for i in alimentos) >= distr_macros["proteina"][j] * d_j * kcal_min)
+        filas["proteina_max", j] = model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j] for i in alimentos) <= distr_macros["proteina"][j] * d_j * kcal_max)
+        filas["grasa_min", j] = model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j] for i in alimentos) >= distr_macros["grasa"][j] * d_j * kcal_min)
+        filas["grasa_max", j] = model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j] for i in alimentos) <= distr_macros["grasa"][j] * d_j * kcal_max)
+        # Restricción de categorías permitidas (solo en la formulación original)
+        if not solo_admisibles:
+            for i in data:
+                if categorias[i] not in categorias_permitidas[j]:
+                    model.addConstr(X[i, j] == 0)
+        # Restricción de gramos mínimo y máximo por alimento
+        for i in alimentos:
+            model.addConstr(X[i, j] >= 20 * Y[i, j])
+            filas["maximo", i, j] = model.addConstr(X[i, j] <= maximo[i] * Y[i, j])
+        # Restriccion al menos 150g de frutas
+        model.addConstr(suma(frutas, j) >= 150 * F[j])
+        # Restriccion al menos 80g de verduras y máximo 250g
+        model.addConstr(suma(verduras, j) >= 80 * V[j])
+        model.addConstr(suma(verduras, j) <= 250 * V[j])
+        # Restriccion máximo 100g de legumbres
+        model.addConstr(suma(legumbres, j) <= 100 * L[j])
+        # Restriccion máximo 250g de carne
+        model.addConstr(suma(carnes, j) <= 250 * C[j])
+        # Restriccion máximo 200g de pescado
+        model.addConstr(suma(pescados, j) <= 200 * P[j])
+        # Restriccion en una misma franja solo puede haber carne o pescado, no ambos
+        model.addConstr(C[j] + P[j] <= 1)
+        # Restriccion máximo 200g de leche o lácteos
+        model.addConstr(suma(lacteos, j) <= 200 * LC[j])
+        # Restriccion máximo 35g de azúcares o dulces
+        model.addConstr(suma(azúcares, j) <= 35 * A[j])
+
+    # Restricción no repetir alimentos     
+    for i in data:
+        model.addConstr(gp.quicksum(Y[i, j] for j in franjas if (i, j) in Y) <= 1)
+
+    # Restricciones adicionales (frutas en 3 franjas al menos, verduras en 2 franjas al menos, legumbres como mucho en 1 franja)
+    model.addConstr(gp.quicksum(F[j] for j in franjas) >= 3)
+    model.addConstr(gp.quicksum(V[j] for j in franjas) >= 2)
+    model.addConstr(gp.quicksum(L[j] for j in franjas) <= 1)
+    model.addConstr(gp.quicksum(A[j] for j in franjas) <= 1)
+
+    # Restricción en el desayuno incluir leche o café o ambos
+    if "leche desnatada" in data and "café" in data:
+        model.addConstr(suma(["leche desnatada", "café"], "desayuno") >= 200)
+
+
+    # Restriccion de no incluir arroz y pasta en desayuno y merienda (solo en la formulación original)
+    if not solo_admisibles:
+        for j, prohibidos in prohibidos_franja.items():
+            for i in prohibidos:
+                model.addConstr(X[i, j] == 0)
+
+    # Restricción de incluir postres en comida y cena
+    for j in ["comida", "cena"]:
+        model.addConstr(suma([i for i in frutas + postre if i in data], j) >= 150)
+
+
+    variables = {"X": X, "Y": Y, "F": F, "V": V, "L": L, "C": C, "P": P, "LC": LC, "A": A, "filas": filas}
+    hito("restricciones")
+    return model, variables
+
+
+def extraer_plan(model, X):
+    """
+    Devuelve la solución como diccionario (alimento, franja) -> gramos, leyendo los valores
+    en bloque.
+    """
+    return {k: x for k, x in lector_gurobi(model)(X).items() if x > 0}
+
+
+def extraer_resultado(variables, valor, metadatos=None):
+    """
+    Extrae la solución como Resultado (ver resultados.py). 'valor' lee en bloque los
+    valores de las variables (resultados.lector_gurobi o Solucion.valor).
+    """
+    X = valor(variables["X"])
+    return Resultado.desde_registros(((None, j, None, i, X[i, j]) for j in franjas for i in data
+                                      if X.get((i, j), 0) > 0), metadatos)
+
+
+def escribir_resultados(model, variables, ruta="Resultados/dieta_optima_Modelo2"):
+    """
+    Muestra los resultados y los guarda en ruta (.json, .npz y el informe en .txt).
+    """
+    if model.status == GRB.OPTIMAL:
+        resultado = extraer_resultado(variables, lector_gurobi(model), metadatos_gurobi(model, "Modelo2", PERFIL_BASE))
+        publicar(resultado, ruta)
+    else:
+        print("No se encontró una solución óptima.")
+
+
+if __name__ == "__main__":
+    # Crear modelo
+    model, variables = construir_modelo()
+
+    # Resolver el modelo
+    model.optimize()
+
+    # Mostrar los resultados y guardarlos en un fichero
+    escribir_resultados(model, variables)
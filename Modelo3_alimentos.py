@@ -11,225 +11,745 @@ Este script resuelve el Modelo 3 con alimentos con Gurobi.
 El Modelo 3 con alimentos es una ampliación del Modelo 2. Es un modelo semanal. Se incluye el
 índice d (días) por lo que todas las variables y restricciones del Modelo 2 se
 mantienen pero se modifican para incluir este nuevo índice.
+
+La formulación reforzada (--reforzado, ver construir_modelo_matricial) solo rompe una
+simetría: la de invertir el orden de los días, con un corte que exige que el coste del
+primer día no supere al del último. Queda fuera de su alcance ordenar días con el mismo
+coste, y también el Modelo 3 con recetas (Modelo3_recetas.py), que no tiene ningún corte
+de simetría ni ordenación de recetas.
 """
 
-import json
+import argparse
+import numpy as np
+import scipy.sparse as sp
 import gurobipy as gp
 from gurobipy import GRB
-
-# Cargar datos desde el archivo JSON
-with open("alimentos.json", "r", encoding="utf-8") as file:
-    data = json.load(file)
-
-# Crear modelo
-model = gp.Model("Modelo3_alimentos")
-
-# Índices
-dias = ["1","2","3","4","5","6", "7"]
+from cache_soluciones import CacheSoluciones
+from catalogo import RUTA_ALIMENTOS, cargar_catalogo
+from instrumentacion import hito
+from perfil import PERFIL_BASE
+from horizonte import generar_dias, bloques_semanales
+from incumbentes import FlujoIncumbentes
+from resultados import Resultado, lector_gurobi, metadatos_gurobi, publicar
+
+# Cargar el catálogo compilado de alimentos
+cat = cargar_catalogo()
+data = cat.indice
+
+# Índices (por defecto una semana; el horizonte se puede ampliar con --dias)
+dias = generar_dias(7)
 franjas = ["desayuno", "comida", "merienda", "cena"]
 
-# Mapear categorías a números
-categorias_map = {
-    "Cereales y derivados": 1, "Leche y productos lácteos": 2, "Huevos": 3, "Azúcares y dulces": 4,
-    "Aceites y grasas": 5, "Verduras y hortalizas": 6, "Legumbres": 7, "Frutas": 8, "Frutos secos": 9,
-    "Carnes": 10, "Productos cárnicos": 11, "Pescados": 12, "Crustáceos y moluscos": 13,
-    "Condimentos y aperitivos": 14, "Bebidas": 15
-}
+# Tolerancia de optimalidad del modelo
+MIP_GAP = 0.028
+
+# Ruta base de los resultados (ver resultados.py)
+RUTA_RESULTADOS = "Resultados/dieta_optima_Modelo3_alimentos"
 
 # Parámetros nutricionales
-precio = {i: float(info["Precio (€/100g)"]) for i, info in data.items()}
-energia = {i: float(info["Energía (Kcal)"]) for i, info in data.items()}
-carbohidratos = {i: float(info["Hidratos de carbono (g)"]) for i, info in data.items()}
-proteina = {i: float(info["Proteínas (g)"]) for i, info in data.items()}
-grasa = {i: float(info["Lípidos totales (g)"]) for i, info in data.items()}
-categorias = {i: categorias_map[info["Categoría"]] for i, info in data.items()}
-maximo = {i: float(info["Máximo (g/día)"]) for i, info in data.items()}
+precio = cat.diccionario("precio")
+energia = cat.diccionario("energia")
+carbohidratos = cat.diccionario("carbohidratos")
+proteina = cat.diccionario("proteina")
+grasa = cat.diccionario("grasa")
+categorias = cat.diccionario("categoria")
+maximo = cat.diccionario("maximo")
 
 # Crear subconjuntos por categoría
-frutas = [i for i in data if data[i]["Categoría"] == "Frutas"]
-legumbres = [i for i in data if data[i]["Categoría"] == "Legumbres"]
-carnes = [i for i in data if data[i]["Categoría"] == "Carnes"]
-pescados = [i for i in data if data[i]["Categoría"] == "Pescados"]
-lacteos = [i for i in data if data[i]["Categoría"] == "Leche y productos lácteos"]
-verduras = [i for i in data if data[i]["Categoría"] == "Verduras y hortalizas"]
-azúcares = [i for i in data if data[i]["Categoría"] == "Azúcares y dulces"]
+frutas = cat.subconjunto("Frutas")
+legumbres = cat.subconjunto("Legumbres")
+carnes = cat.subconjunto("Carnes")
+pescados = cat.subconjunto("Pescados")
+lacteos = cat.subconjunto("Leche y productos lácteos")
+verduras = cat.subconjunto("Verduras y hortalizas")
+azúcares = cat.subconjunto("Azúcares y dulces")
 
 #Creamos el subconjunto de alimentos que pueden ser postre
-postre = [i for i in data if data[i].get("Extra") == "Postre"]
-
-# Distribución de calorías por franja horaria
-distr_calorica = {"desayuno": 0.2, "comida": 0.4, "merienda": 0.1, "cena": 0.3}
-
-# Distribución de macronutrientes por franja horaria
-distr_macros = {
-    "carbohidratos": {"desayuno": 0.5, "comida": 0.35, "merienda": 0.4, "cena": 0.4},
-    "proteina": {"desayuno": 0.25, "comida": 0.4, "merienda": 0.3, "cena": 0.3},
-    "grasa": {"desayuno": 0.25, "comida": 0.25, "merienda": 0.3, "cena": 0.3}
-}
-
-# Categorías permitidas por franja
-categorias_permitidas = {
-    "desayuno": {1, 2, 3, 4, 5, 8, 11},
-    "comida": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15},
-    "merienda": {1, 2, 3, 4, 5, 8, 9, 11},
-    "cena": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15}
-}
-
-# Variable de decisión: cantidad en gramos de cada alimento i en la franja j el día d
-X = {(i, j, d): model.addVar(lb=0, vtype=GRB.CONTINUOUS) for i in data for j in franjas for d in dias}
-
-# Variable de decisión binaria: 1 si esta presente el alimento i en la franja j el día d
-Y = {(i, j, d): model.addVar(vtype=GRB.BINARY) for i in data for j in franjas for d in dias}
-
-# Variable de decisión binaria: 1 si esta presente el alimento i  el día d
-Z = {(i, d): model.addVar(vtype=GRB.BINARY) for i in data for d in dias}
-
-# Variable de decisión binaria: 1 si esta presente el tipo de alimento en la franja j el día d
-F = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # frutas
-V = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # verduras
-L = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # legumbres
-C = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # carne
-P = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # pescado
-LC = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # leche y lácteos
-A = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # azúcares y dulces
-
-# Función objetivo
-model.setObjective(gp.quicksum(precio[i]/100 * X[i, j, d] for i in data for j in franjas for d in dias), GRB.MINIMIZE)
-
-# Restricciones por franja horaria y día
-for d in dias:
-    for j in franjas:
-        d_j = distr_calorica[j]
-        # Restricción de calorías
-        model.addConstr(gp.quicksum(energia[i]/100 * X[i, j, d] for i in data) >= d_j * 2900)
-        model.addConstr(gp.quicksum(energia[i]/100 * X[i, j, d] for i in data) <= d_j * 3100)
-        # Restricción de macronutrientes
-        model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j, d] for i in data) >= distr_macros["carbohidratos"][j] * d_j * 2900)
-        model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j, d] for i in data) <= distr_macros["carbohidratos"][j] * d_j * 3100)
-        model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j, d] for i in data) >= distr_macros["proteina"][j] * d_j * 2900)
-        model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j, d] for i in data) <= distr_macros["proteina"][j] * d_j * 3100)
-        model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j, d] for i in data) >= distr_macros["grasa"][j] * d_j * 2900)
-        model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j, d] for i in data) <= distr_macros["grasa"][j] * d_j * 3100)
-        # Restricción de categorías permitidas (cambiar a X)
-        for i in data:
-            if categorias[i] not in categorias_permitidas[j]:
-                model.addConstr(X[i, j, d] == 0)
-        # Restricción de gramos mínimo y máximo por alimento
-            model.addConstr(X[i, j, d] >= 20 * Y[i, j, d])
-            model.addConstr(X[i, j, d] <= maximo[i] * Y[i, j, d])
-        # Restriccion al menos 150g de frutas
-        model.addConstr(gp.quicksum(X[i, j, d] for i in frutas) >= 150 * F[j, d])
-        # Restriccion al menos 80g de verduras y máximo 250g
-        model.addConstr(gp.quicksum(X[i, j, d] for i in verduras) >= 80 * V[j, d])
-        model.addConstr(gp.quicksum(X[i, j, d] for i in verduras) <= 250 * V[j, d])
-        # Restriccion máximo 100g de legumbres
-        model.addConstr(gp.quicksum(X[i, j, d] for i in legumbres) <= 100 * L[j, d])
-        # Restriccion máximo 250g de carne
-        model.addConstr(gp.quicksum(X[i, j, d] for i in carnes) <= 250 * C[j, d])
-        # Restriccion máximo 200g de pescado
-        model.addConstr(gp.quicksum(X[i, j, d] for i in pescados) <= 200 * P[j, d])
-        # Restriccion en una misma franja solo puede haber carne o pescado, no ambos
-        model.addConstr(C[j, d] + P[j, d] <= 1)
-        # Restriccion máximo 200g de leche o lácteos
-        model.addConstr(gp.quicksum(X[i, j, d] for i in lacteos) <= 200 * LC[j, d])
-        # Restriccion máximo 35g de azúcares o dulces
-        model.addConstr(gp.quicksum(X[i, j, d] for i in azúcares) <= 35 * A[j, d])
-
-    # Restricción no repetir alimentos en el día d     
-    for i in data:
-        model.addConstr(gp.quicksum(Y[i, j, d] for j in franjas) <= 1)
-        
-    # Restricciones adicionales (frutas en 3 franjas al menos, verduras en 2 franjas al menos, legumbres como mucho en 1 franja)
-    model.addConstr(gp.quicksum(F[j, d] for j in franjas) >= 3)
-    model.addConstr(gp.quicksum(V[j, d] for j in franjas) >= 2)
-    model.addConstr(gp.quicksum(L[j, d] for j in franjas) <= 1)
-    model.addConstr(gp.quicksum(A[j, d] for j in franjas) <= 1)
-    
-    # Restricción en el desayuno incluir leche o café o ambos
-    if "leche desnatada" in data and "café" in data:
-        model.addConstr(X["leche desnatada", "desayuno", d] + X["café", "desayuno", d] >= 200)
-
-    # Restriccion de no incluir arroz y pasta en desayuno y merienda
-    alimentos_prohibidos = ["arroz", "pasta", "quinoa"]
-    for j in ["desayuno", "merienda"]:
-        for i in alimentos_prohibidos:
-            model.addConstr(X[i, j, d] == 0)
-            
-    # Restricción de incluir postres en comida y cena
-    for j in ["comida", "cena"]:
-        model.addConstr(gp.quicksum(X[i, j, d] for i in frutas + postre if i in data) >= 150)
-
-
-# Restricciones para no repetir alimentos por día
-for i in data:
-    for d in dias:
-        for j in franjas:
-            model.addConstr(Y[i, j, d] <= Z[i, d])
-        #model.addConstr(gp.quicksum(X[i,j,d] for j in franjas) <= maximo[i]*Z[i,d])
-        model.addConstr(Z[i,d] <= gp.quicksum(Y[i, j, d] for j in franjas))
+postre = cat.postres()
 
 # Categorías de alimentos que no pueden repetirse más de 2 veces a la semana    
 categorias_permitida= {6,7,8,10,12} #verduras, legumbres, frutas, pescados y carne
 # Alimentos que sí se pueden repetir sin límite
 alimentos_repetir={"leche desnatada","pasta","huevo", "yogur", "pan blanco", "pan integral"}
 
-# Restricciones para controlar la repetición de alimentos
-for i in data:
-    if categorias[i]  in categorias_permitida: #Los alimentos dentro de "categorias_permitidas" se pueden repetir un máximo de 2 veces por semana
-        model.addConstr(gp.quicksum(Z[i, d] for d in dias) <=2)
-    if i not in alimentos_repetir: #El resto de alimentos se pueden repetir un máximo de 4 veces por semana excepto los de "alimentos_repetir" que se pueden consumir todos los días
-        model.addConstr(gp.quicksum(Z[i, d] for d in dias) <=4)
-
-# Restricciones adicionales: no repetir legumbres más de 3 días, no tomar azúcares más de 2 días         
-model.addConstr(gp.quicksum(Z[i, d] for i in legumbres for d in dias) <=3)
-model.addConstr(gp.quicksum(Z[i, d] for i in azúcares for d in dias) <=2)
-    
-# Restricciones para repetir alimentos en días separados
-for i in data:
-    # Debe de haber 2 días entre consumir el mismo tipo de carne, pescado , verdura , legumbre o fruta 
-    if categorias[i]  in categorias_permitida:
-        for idx in range(len(dias) - 2):
-            d1 = dias[idx]
-            d2 = dias[idx + 1]
-            d3 = dias[idx + 2]
-            model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 1)
-    # El resto de alimentos pueden aparecer como máximo en 2 días consecutivos     
-    if i not in alimentos_repetir:
-        for idx in range(len(dias) - 2):
-            d1 = dias[idx]
-            d2 = dias[idx + 1]
-            d3 = dias[idx + 2]
-            model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 2)
-
-
-# Parámetro para el valor de tolerancia de optimalidad             
-model.setParam('MIPGap', 0.028)
-
-# Resolver el modelo
-model.optimize()
-
-# Mostrar los resultados y guardarlos en un fichero
-if model.status == GRB.OPTIMAL:
-    output_lines = []
-    output_lines.append("\nDieta óptima encontrada:")
+# Alimentos que no se pueden incluir en desayuno y merienda
+alimentos_prohibidos = ["arroz", "pasta", "quinoa"]
+prohibidos_franja = {j: alimentos_prohibidos for j in ["desayuno", "merienda"]}
+
+
+def construir_modelo(dias=dias, perfil=PERFIL_BASE, solo_admisibles=True):
+    """
+    Construye el Modelo 3 con alimentos variable a variable (formulación original)
+    para el horizonte de días y el perfil nutricional indicados.
+    Las variables X e Y solo se crean para los pares (alimento, franja) admisibles; con
+    solo_admisibles=False se crean para todos los pares y los no admisibles se anulan con
+    restricciones X == 0.
+    Devuelve el modelo y un diccionario con las variables de decisión.
+    """
+    kcal_min, kcal_max = perfil["kcal_min"], perfil["kcal_max"]
+    distr_calorica = perfil["distr_calorica"]
+    distr_macros = perfil["distr_macros"]
+    categorias_permitidas = perfil["categorias_permitidas"]
+
+    # Pares (alimento, franja) con variable: solo los admisibles o todos
+    admisible = cat.admisibles(franjas, categorias_permitidas, prohibidos_franja)
+    con_variable = admisible if solo_admisibles else np.ones_like(admisible)
+    pares = [(i, j) for i in data for a, j in enumerate(franjas) if con_variable[data[i], a]]
+    alimentos_franja = {j: [i for i in data if con_variable[data[i], a]] for a, j in enumerate(franjas)}
+
+    hito("indices")
+
+    # Crear modelo
+    model = gp.Model("Modelo3_alimentos")
+
+    # Variable de decisión: cantidad en gramos de cada alimento i en la franja j el día d
+    X = {(i, j, d): model.addVar(lb=0, vtype=GRB.CONTINUOUS) for (i, j) in pares for d in dias}
+
+    # Variable de decisión binaria: 1 si esta presente el alimento i en la franja j el día d
+    Y = {(i, j, d): model.addVar(vtype=GRB.BINARY) for (i, j) in pares for d in dias}
+
+    # Variable de decisión binaria: 1 si esta presente el alimento i  el día d
+    Z = {(i, d): model.addVar(vtype=GRB.BINARY) for i in data for d in dias}
+
+    # Variable de decisión binaria: 1 si esta presente el tipo de alimento en la franja j el día d
+    F = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # frutas
+    V = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # verduras
+    L = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # legumbres
+    C = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # carne
+    P = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # pescado
+    LC = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # leche y lácteos
+    A = {(j, d): model.addVar(vtype=GRB.BINARY) for j in franjas for d in dias}  # azúcares y dulces
+    hito("variables")
+
+    # Función objetivo
+    model.setObjective(gp.quicksum(precio[i]/100 * X[i, j, d] for (i, j) in pares for d in dias), GRB.MINIMIZE)
+
+    # Suma de X[i, j, d] sobre los alimentos de una lista que tienen variable en la franja j
+    def suma(lista, j, d):
+        return gp.quicksum(X[i, j, d] for i in lista if (i, j, d) in X)
+
+    # Restricciones por franja horaria y día
     for d in dias:
-        output_lines.append(f"\nDía: {d.capitalize()}")
         for j in franjas:
-            output_lines.append(f"  {j.capitalize()}:")
-            for i in data:
-                cantidad = X[i, j, d].X
-                if cantidad > 0:
-                    output_lines.append(f"    {i}: {cantidad:.2f} g")
-
-    output_lines.append(f"\nCoste total: {model.ObjVal:.2f} €")
-    # Imprimir por pantalla
-    for line in output_lines:
-        print(line)
-    # Guardar en fichero
-    with open("Resultados/dieta_optima_Modelo3_alimentos.txt", "w", encoding="utf-8") as f:
-        for line in output_lines:
-            f.write(line + "\n")
-    print("\nDieta óptima guardada en 'Resultados/dieta_optima_Modelo3_alimentos.txt'")
-else:
-    print("No se encontró una solución óptima.")
+            d_j = distr_calorica[j]
+            alimentos = alimentos_franja[j]
+            # Restricción de calorías
+            model.addConstr(gp.quicksum(energia[i]/100 * X[i, j, d] for i in alimentos) >= d_j * kcal_min)
+            model.addConstr(gp.quicksum(energia[i]/100 * X[i, j, d] for i in alimentos) <= d_j * kcal_max)
+            # Restricción de macronutrientes
+            model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j, d] for i in alimentos) >= distr_macros["carbohidratos"][j] * d_j * kcal_min)
+            model.addConstr(gp.quicksum(carbohidratos[i]*4/100 * X[i, j, d] for i in alimentos) <= distr_macros["carbohidratos"][j] * d_j * kcal_max)
+            model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j, d] for i in alimentos) >= distr_macros["proteina"][j] * d_j * kcal_min)
+            model.addConstr(gp.quicksum(proteina[i]*4/100 * X[i, j, d] for i in alimentos) <= distr_macros["proteina"][j] * d_j * kcal_max)
+            model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j, d] for i in alimentos) >= distr_macros["grasa"][j] * d_j * kcal_min)
+            model.addConstr(gp.quicksum(grasa[i]*9/100 * X[i, j, d] for i in alimentos) <= distr_macros["grasa"][j] * d_j * kcal_max)
+            # Restricción de categorías permitidas (solo en la formulación original)
+            if not solo_admisibles:
+                for i in data:
+                    if categorias[i] not in categorias_permitidas[j]:
+                        model.addConstr(X[i, j, d] == 0)
+            # Restricción de gramos mínimo y máximo por alimento
+            for i in alimentos:
+                model.addConstr(X[i, j, d] >= 20 * Y[i, j, d])
+                model.addConstr(X[i, j, d] <= maximo[i] * Y[i, j, d])
+            # Restriccion al menos 150g de frutas
+            model.addConstr(suma(frutas, j, d) >= 150 * F[j, d])
+            # Restriccion al menos 80g de verduras y máximo 250g
+            model.addConstr(suma(verduras, j, d) >= 80 * V[j, d])
+            model.addConstr(suma(verduras, j, d) <= 250 * V[j, d])
+            # Restriccion máximo 100g de legumbres
+            model.addConstr(suma(legumbres, j, d) <= 100 * L[j, d])
+            # Restriccion máximo 250g de carne
+            model.addConstr(suma(carnes, j, d) <= 250 * C[j, d])
+            # Restriccion máximo 200g de pescado
+            model.addConstr(suma(pescados, j, d) <= 200 * P[j, d])
+            # Restriccion en una misma franja solo puede haber carne o pescado, no ambos
+            model.addConstr(C[j, d] + P[j, d] <= 1)
+            # Restriccion máximo 200g de leche o lácteos
+            model.addConstr(suma(lacteos, j, d) <= 200 * LC[j, d])
+            # Restriccion máximo 35g de azúcares o dulces
+            model.addConstr(suma(azúcares, j, d) <= 35 * A[j, d])
+
+        # Restricción no repetir alimentos en el día d     
+        for i in data:
+            model.addConstr(gp.quicksum(Y[i, j, d] for j in franjas if (i, j, d) in Y) <= 1)
 
+        # Restricciones adicionales (frutas en 3 franjas al menos, verduras en 2 franjas al menos, legumbres como mucho en 1 franja)
+        model.addConstr(gp.quicksum(F[j, d] for j in franjas) >= 3)
+        model.addConstr(gp.quicksum(V[j, d] for j in franjas) >= 2)
+        model.addConstr(gp.quicksum(L[j, d] for j in franjas) <= 1)
+        model.addConstr(gp.quicksum(A[j, d] for j in franjas) <= 1)
+
+        # Restricción en el desayuno incluir leche o café o ambos
+        if "leche desnatada" in data and "café" in data:
+            model.addConstr(suma(["leche desnatada", "café"], "desayuno", d) >= 200)
+
+        # Restriccion de no incluir arroz y pasta en desayuno y merienda (solo en la formulación original)
+        if not solo_admisibles:
+            for j, prohibidos in prohibidos_franja.items():
+                for i in prohibidos:
+                    model.addConstr(X[i, j, d] == 0)
+
+        # Restricción de incluir postres en comida y cena
+        for j in ["comida", "cena"]:
+            model.addConstr(suma([i for i in frutas + postre if i in data], j, d) >= 150)
+
+
+    # Restricciones para no repetir alimentos por día
+    for i in data:
+        for d in dias:
+            for j in franjas:
+                if (i, j, d) in Y:
+                    model.addConstr(Y[i, j, d] <= Z[i, d])
+            #model.addConstr(gp.quicksum(X[i,j,d] for j in franjas) <= maximo[i]*Z[i,d])
+            model.addConstr(Z[i,d] <= gp.quicksum(Y[i, j, d] for j in franjas if (i, j, d) in Y))
+
+    # Restricciones para controlar la repetición de alimentos (en cada semana del horizonte)
+    for semana in bloques_semanales(dias):
+        for i in data:
+            if categorias[i]  in categorias_permitida: #Los alimentos dentro de "categorias_permitidas" se pueden repetir un máximo de 2 veces por semana
+                model.addConstr(gp.quicksum(Z[i, d] for d in semana) <=2)
+            if i not in alimentos_repetir: #El resto de alimentos se pueden repetir un máximo de 4 veces por semana excepto los de "alimentos_repetir" que se pueden consumir todos los días
+                model.addConstr(gp.quicksum(Z[i, d] for d in semana) <=4)
+
+        # Restricciones adicionales: no repetir legumbres más de 3 días, no tomar azúcares más de 2 días
+        model.addConstr(gp.quicksum(Z[i, d] for i in legumbres for d in semana) <=3)
+        model.addConstr(gp.quicksum(Z[i, d] for i in azúcares for d in semana) <=2)
+
+    # Restricciones para repetir alimentos en días separados
+    for i in data:
+        # Debe de haber 2 días entre consumir el mismo tipo de carne, pescado , verdura , legumbre o fruta 
+        if categorias[i]  in categorias_permitida:
+            for idx in range(len(dias) - 2):
+                d1 = dias[idx]
+                d2 = dias[idx + 1]
+                d3 = dias[idx + 2]
+                model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 1)
+        # El resto de alimentos pueden aparecer como máximo en 2 días consecutivos     
+        if i not in alimentos_repetir:
+            for idx in range(len(dias) - 2):
+                d1 = dias[idx]
+                d2 = dias[idx + 1]
+                d3 = dias[idx + 2]
+                model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 2)
+
+
+    # Parámetro para el valor de tolerancia de optimalidad
+    model.setParam('MIPGap', MIP_GAP)
+
+    variables = {"X": X, "Y": Y, "Z": Z, "F": F, "V": V, "L": L, "C": C, "P": P, "LC": LC, "A": A,
+                 "admisible": con_variable}
+    hito("restricciones")
+    return model, variables
+
+
+def construir_modelo_matricial(dias=dias, perfil=PERFIL_BASE, solo_admisibles=True, reforzado=False):
+    """
+    Construye el mismo Modelo 3 con alimentos usando variables matriciales (MVar) y
+    generando cada bloque de restricciones como una matriz dispersa con addMConstr, en
+    lugar de una restricción por llamada.
+    X e Y tienen dimensiones (par, día), donde los pares (alimento, franja) con variable
+    son los marcados en variables["admisible"] en orden (alimento, franja); Z tiene
+    dimensiones (alimento, día). Las variables se crean en el mismo orden que en
+    construir_modelo, por lo que ambos modelos son idénticos salvo por el orden de las filas.
+    En variables["filas"] se devuelven los bloques de restricciones (MConstr) de cada
+    nutriente, con una fila por (franja, día), y de la cantidad máxima, con una fila por
+    (par, día).
+    Con reforzado=True se añaden restricciones válidas que no cambian el óptimo pero
+    ajustan la relajación lineal y eliminan soluciones simétricas:
+        - el máximo de cada alimento se acota también por el máximo de su grupo
+          (X <= min(máximo, máximo del grupo) * Y),
+        - vinculación desagregada de los binarios de grupo: Y[i, j, d] <= G[j, d] para
+          cada alimento i de un grupo con máximo, y G[j, d] <= suma de Y del grupo (F, V,
+          L, C, P, LC y A valen 1 exactamente cuando hay algún alimento del grupo),
+        - ruptura de simetría: las restricciones son invariantes al invertir el orden de
+          los días (si el horizonte es de semanas completas o de menos de una semana), así
+          que se exige que el coste del primer día no supere al del último.
+    """
+    kcal_min, kcal_max = perfil["kcal_min"], perfil["kcal_max"]
+    distr_calorica = perfil["distr_calorica"]
+    distr_macros = perfil["distr_macros"]
+    categorias_permitidas = perfil["categorias_permitidas"]
+
+    model = gp.Model("Modelo3_alimentos")
+
+    # Pares (alimento, franja) con variable: solo los admisibles o todos
+    admisible = cat.admisibles(franjas, categorias_permitidas, prohibidos_franja)
+    con_variable = admisible if solo_admisibles else np.ones_like(admisible)
+    alimento_par, franja_par = np.nonzero(con_variable)
+    n, J, D, m = len(cat), len(franjas), len(dias), len(alimento_par)
+    pos_franja = {j: k for k, j in enumerate(franjas)}
+    # Posición de cada par (alimento, franja) en X e Y (-1 si no tiene variable)
+    par = np.full((n, J), -1)
+    par[con_variable] = np.arange(m)
+
+    # Variables de decisión (mismo significado y orden que en construir_modelo)
+    X = model.addMVar((m, D), lb=0, vtype=GRB.CONTINUOUS)
+    Y = model.addMVar((m, D), vtype=GRB.BINARY)
+    Z = model.addMVar((n, D), vtype=GRB.BINARY)
+    F, V, L, C, P, LC, A = (model.addMVar((J, D), vtype=GRB.BINARY) for _ in range(7))
+    model.update()
+    hito("variables")
+
+    # Índice de columna de cada variable dentro del modelo
+    col_X = np.arange(m * D).reshape(m, D)
+    col_Y = col_X + m * D
+    col_Z = 2 * m * D + np.arange(n * D).reshape(n, D)
+    base = 2 * m * D + n * D
+    col_F, col_V, col_L, col_C, col_P, col_LC, col_A = (
+        base + k * J * D + np.arange(J * D).reshape(J, D) for k in range(7))
+
+    def añadir(filas, columnas, valores, sentido, rhs):
+        """
+        Añade un bloque de restricciones dado en formato de coordenadas (fila, columna, valor).
+        """
+        rhs = np.asarray(rhs, dtype=float)
+        matriz = sp.csr_matrix((valores, (filas, columnas)), shape=(rhs.size, model.NumVars))
+        return model.addMConstr(matriz, None, sentido, rhs)
+
+    def suma_por_grupo(coef, cols_grupo, factor, sentido, rhs):
+        """
+        Filas "sum_i coef_i * X[i, j, d] + factor * G[j, d] (sentido) rhs" para cada (j, d),
+        sumando solo los alimentos con variable en la franja j.
+        """
+        filas, columnas, valores = [], [], []
+        for a in range(J):
+            k = np.flatnonzero((coef != 0) & con_variable[:, a])
+            filas.append(np.repeat(a * D + np.arange(D), k.size))
+            columnas.append(col_X[par[k, a]].T.ravel())
+            valores.append(np.tile(coef[k], D))
+        if cols_grupo is not None:
+            filas.append(np.arange(J * D))
+            columnas.append(cols_grupo.ravel())
+            valores.append(np.full(J * D, float(factor)))
+        return añadir(np.concatenate(filas), np.concatenate(columnas), np.concatenate(valores), sentido,
+                      np.broadcast_to(rhs, (J, D)).ravel())
+
+    # Función objetivo
+    X.Obj = np.broadcast_to((cat.precio[alimento_par] / 100)[:, None], (m, D))
+    model.ModelSense = GRB.MINIMIZE
+
+    # Restricciones de calorías y macronutrientes por franja horaria y día
+    rhs_min = {}
+    rhs_max = {}
+    for j in franjas:
+        d_j = distr_calorica[j]
+        rhs_min[j] = [d_j * kcal_min] + [distr_macros[k][j] * d_j * kcal_min for k in distr_macros]
+        rhs_max[j] = [d_j * kcal_max] + [distr_macros[k][j] * d_j * kcal_max for k in distr_macros]
+    coeficientes = [cat.energia / 100, cat.carbohidratos * 4 / 100, cat.proteina * 4 / 100, cat.grasa * 9 / 100]
+    # Bloques de restricciones que se pueden modificar después (ver modelo_dieta.py):
+    # filas (franja, día) de cada nutriente y filas (par, día) de la cantidad máxima
+    filas_bloque = {}
+    for k, (nutriente, coef) in enumerate(zip(["calorias"] + list(distr_macros), coeficientes)):
+        minimo = np.array([rhs_min[j][k] for j in franjas])[:, None]
+        maximo_ = np.array([rhs_max[j][k] for j in franjas])[:, None]
+        filas_bloque[f"{nutriente}_min"] = suma_por_grupo(coef, None, 0, GRB.GREATER_EQUAL, minimo)
+        filas_bloque[f"{nutriente}_max"] = suma_por_grupo(coef, None, 0, GRB.LESS_EQUAL, maximo_)
+
+    if not solo_admisibles:
+        # Restricción de categorías permitidas (solo en la formulación original)
+        permitido = np.array([[categorias[i] in categorias_permitidas[j] for j in franjas] for i in data])
+        anulados = col_X[par[~permitido]].ravel()
+        añadir(np.arange(anulados.size), anulados, np.ones(anulados.size), GRB.EQUAL, np.zeros(anulados.size))
+
+        # Restriccion de no incluir arroz y pasta en desayuno y merienda
+        for j, prohibidos in prohibidos_franja.items():
+            model.addConstr(X[par[[data[i] for i in prohibidos], pos_franja[j]], :] == 0)
+
+    # Grupos de alimentos con cantidad máxima por franja: (alimentos, binario, máximo)
+    grupos_maximo = [(verduras, col_V, 250), (legumbres, col_L, 100), (carnes, col_C, 250),
+                     (pescados, col_P, 200), (lacteos, col_LC, 200), (azúcares, col_A, 35)]
+    tope = cat.maximo.astype(float)
+    if reforzado:
+        for lista, _, maximo_grupo in grupos_maximo:
+            k = [data[i] for i in lista]
+            tope[k] = np.minimum(tope[k], maximo_grupo)
+
+    # Restricción de gramos mínimo y máximo por alimento
+    filas = np.tile(np.arange(m * D), 2)
+    columnas = np.concatenate([col_X.ravel(), col_Y.ravel()])
+    valores = np.concatenate([np.ones(m * D), np.full(m * D, -20.0)])
+    añadir(filas, columnas, valores, GRB.GREATER_EQUAL, np.zeros(m * D))
+    valores = np.concatenate([np.ones(m * D), -np.repeat(tope[alimento_par], D)])
+    filas_bloque["maximo"] = añadir(filas, columnas, valores, GRB.LESS_EQUAL, np.zeros(m * D))
+
+    # Restricciones de grupos de alimentos por franja y día
+    def indicador(lista):
+        mascara = np.zeros(n)
+        for i in lista:
+            mascara[data[i]] += 1.0
+        return mascara
+    suma_por_grupo(indicador(frutas), col_F, -150, GRB.GREATER_EQUAL, 0.0)
+    suma_por_grupo(indicador(verduras), col_V, -80, GRB.GREATER_EQUAL, 0.0)
+    suma_por_grupo(indicador(verduras), col_V, -250, GRB.LESS_EQUAL, 0.0)
+    suma_por_grupo(indicador(legumbres), col_L, -100, GRB.LESS_EQUAL, 0.0)
+    suma_por_grupo(indicador(carnes), col_C, -250, GRB.LESS_EQUAL, 0.0)
+    suma_por_grupo(indicador(pescados), col_P, -200, GRB.LESS_EQUAL, 0.0)
+    model.addConstr(C + P <= 1)
+    suma_por_grupo(indicador(lacteos), col_LC, -200, GRB.LESS_EQUAL, 0.0)
+    suma_por_grupo(indicador(azúcares), col_A, -35, GRB.LESS_EQUAL, 0.0)
+
+    if reforzado:
+        # Vinculación desagregada: Y[p, d] - G[franja del par p, d] <= 0
+        for lista, col_G, _ in grupos_maximo:
+            p = np.flatnonzero(np.isin(alimento_par, [data[i] for i in lista]))
+            filas = np.tile(np.arange(p.size * D), 2)
+            columnas = np.concatenate([col_Y[p].ravel(), col_G[franja_par[p]].ravel()])
+            valores = np.concatenate([np.ones(p.size * D), -np.ones(p.size * D)])
+            añadir(filas, columnas, valores, GRB.LESS_EQUAL, np.zeros(p.size * D))
+        # G[j, d] - suma de Y del grupo en (j, d) <= 0: el binario de grupo solo vale 1 si
+        # hay algún alimento del grupo (así los binarios quedan determinados por Y)
+        for lista, col_G in [(frutas, col_F)] + [(lista, col_G) for lista, col_G, _ in grupos_maximo]:
+            p = np.flatnonzero(np.isin(alimento_par, [data[i] for i in lista]))
+            filas = np.concatenate([np.arange(J * D), (franja_par[p][:, None] * D + np.arange(D)).ravel()])
+            columnas = np.concatenate([col_G.ravel(), col_Y[p].ravel()])
+            valores = np.concatenate([np.ones(J * D), -np.ones(p.size * D)])
+            añadir(filas, columnas, valores, GRB.LESS_EQUAL, np.zeros(J * D))
+
+    # Restricción no repetir alimentos en el día d (suma de Y de las franjas de cada alimento)
+    filas_alimento = (alimento_par[:, None] * D + np.arange(D)).ravel()
+    añadir(filas_alimento, col_Y.ravel(), np.ones(m * D), GRB.LESS_EQUAL, np.ones(n * D))
+
+    # Restricciones adicionales por día
+    model.addConstr(F.sum(axis=0) >= 3)
+    model.addConstr(V.sum(axis=0) >= 2)
+    model.addConstr(L.sum(axis=0) <= 1)
+    model.addConstr(A.sum(axis=0) <= 1)
+
+    # Restricción en el desayuno incluir leche o café o ambos
+    if "leche desnatada" in data and "café" in data:
+        k = par[[data["leche desnatada"], data["café"]], pos_franja["desayuno"]]
+        model.addConstr(X[k[k >= 0], :].sum(axis=0) >= 200)
+
+    # Restricción de incluir postres en comida y cena
+    con_postre = [data[i] for i in frutas + postre if i in data]
+    for j in ["comida", "cena"]:
+        k = par[con_postre, pos_franja[j]]
+        model.addConstr(X[k[k >= 0], :].sum(axis=0) >= 150)
+
+    # Restricciones para no repetir alimentos por día
+    filas = np.tile(np.arange(m * D), 2)
+    columnas = np.concatenate([col_Y.ravel(), col_Z[alimento_par].ravel()])
+    valores = np.concatenate([np.ones(m * D), -np.ones(m * D)])
+    añadir(filas, columnas, valores, GRB.LESS_EQUAL, np.zeros(m * D))
+    filas = np.concatenate([np.arange(n * D), filas_alimento])
+    columnas = np.concatenate([col_Z.ravel(), col_Y.ravel()])
+    valores = np.concatenate([np.ones(n * D), -np.ones(m * D)])
+    añadir(filas, columnas, valores, GRB.LESS_EQUAL, np.zeros(n * D))
+
+    # Restricciones para controlar la repetición de alimentos (en cada semana del horizonte)
+    codigos = np.asarray(cat.categoria)
+    limitados = np.flatnonzero(np.isin(codigos, list(categorias_permitida)))
+    no_repetir = np.array([i not in alimentos_repetir for i in data])
+    libres = np.flatnonzero(no_repetir)
+    pos_dia = {d: b for b, d in enumerate(dias)}
+    for semana in bloques_semanales(dias):
+        bloque = slice(pos_dia[semana[0]], pos_dia[semana[-1]] + 1)
+        model.addConstr(Z[limitados, bloque].sum(axis=1) <= 2)
+        model.addConstr(Z[libres, bloque].sum(axis=1) <= 4)
+
+        # Restricciones adicionales: no repetir legumbres más de 3 días, no tomar azúcares más de 2 días
+        model.addConstr(Z[[data[i] for i in legumbres], bloque].sum() <= 3)
+        model.addConstr(Z[[data[i] for i in azúcares], bloque].sum() <= 2)
+
+    # Restricciones para repetir alimentos en días separados (ventanas de 3 días)
+    if D >= 3:
+        model.addConstr(Z[limitados, :-2] + Z[limitados, 1:-1] + Z[limitados, 2:] <= 1)
+        model.addConstr(Z[libres, :-2] + Z[libres, 1:-1] + Z[libres, 2:] <= 2)
+
+    # Ruptura de simetría: coste del primer día <= coste del último día
+    if reforzado and rompe_simetria(dias):
+        coste = cat.precio[alimento_par] / 100
+        model.addConstr(coste @ X[:, 0] - coste @ X[:, D - 1] <= 0)
+
+    # Parámetro para el valor de tolerancia de optimalidad
+    model.setParam('MIPGap', MIP_GAP)
+
+    variables = {"X": X, "Y": Y, "Z": Z, "F": F, "V": V, "L": L, "C": C, "P": P, "LC": LC, "A": A,
+                 "admisible": con_variable, "filas": filas_bloque}
+    hito("restricciones")
+    return model, variables
+
+
+def rompe_simetria(dias):
+    """
+    Indica si la formulación reforzada añade el corte de simetría entre el primer y el
+    último día: las restricciones son invariantes al invertir los días si el horizonte es
+    de semanas completas o de menos de una semana.
+    """
+    D = len(dias)
+    return D >= 2 and (D <= 7 or D % 7 == 0)
+
+
+def arranque_incumple_simetria(cantidades, completos, dias=dias):
+    """
+    Indica si la solución inicial repartida con repartir_arranque incumple el corte de
+    simetría de la formulación reforzada (coste del primer día <= coste del último). Solo
+    se puede saber si el último día está completo; el coste del primer día es una cota
+    inferior si no lo está.
+    """
+    if not rompe_simetria(dias) or dias[-1] not in completos:
+        return False
+    coste = {d: 0.0 for d in (dias[0], dias[-1])}
+    for (i, _, d), g in cantidades.items():
+        if d in coste:
+            coste[d] += precio[i] / 100 * g
+    return coste[dias[0]] > coste[dias[-1]] + 1e-6
+
+
+def densificar(valores, admisible):
+    """
+    Coloca los valores de X o Y del constructor matricial, de dimensiones (par, día), en un
+    array (alimento, franja, día) con ceros en los pares sin variable.
+    """
+    denso = np.zeros(admisible.shape + valores.shape[1:])
+    denso[admisible] = valores
+    return denso
+
+
+def extraer_resultado(variables, valor, dias=dias, metadatos=None):
+    """
+    Extrae la solución como Resultado (ver resultados.py) para las variables de cualquiera
+    de los dos constructores. 'valor' lee en bloque los valores de las variables
+    (resultados.lector_gurobi o Solucion.valor).
+    """
+    metadatos = dict(metadatos or {}, dias=list(dias))
+    X = variables["X"]
+    if isinstance(X, dict):
+        valores = valor(X)
+        registros = ((d, j, None, i, valores[i, j, d]) for d in dias for j in franjas for i in data
+                     if valores.get((i, j, d), 0) > 0)
+    else:
+        valores = densificar(valor(X), variables["admisible"])
+        # Recorrer los valores no nulos ordenados por día, franja y alimento
+        no_nulos = np.nonzero(valores.transpose(2, 1, 0) > 0)
+        registros = ((dias[b], franjas[a], None, cat.nombres[k], float(valores[k, a, b]))
+                     for b, a, k in zip(*(idx.tolist() for idx in no_nulos)))
+    return Resultado.desde_registros(registros, metadatos)
+
+
+def escribir_resultados(model, variables, dias=dias, ruta=RUTA_RESULTADOS):
+    """
+    Muestra los resultados y los guarda en ruta (.json, .npz y el informe en .txt).
+    Devuelve el Resultado (None si no hay solución óptima).
+    """
+    if model.status == GRB.OPTIMAL:
+        metadatos = metadatos_gurobi(model, "Modelo3_alimentos", PERFIL_BASE)
+        resultado = extraer_resultado(variables, lector_gurobi(model), dias, metadatos)
+        publicar(resultado, ruta)
+        return resultado
+    print("No se encontró una solución óptima.")
+    return None
+
+
+def leer_resultados(ruta=RUTA_RESULTADOS):
+    """
+    Lee una dieta guardada por escribir_resultados y la devuelve como diccionario
+    (alimento, franja, día) -> gramos.
+    """
+    return Resultado.cargar(ruta).cantidades()
+
+
+def repartir_arranque(plan, dias=dias, desplazamiento=0):
+    """
+    Reparte un plan de partida entre los días del horizonte para usarlo como solución
+    inicial (MIP start) del Modelo 3.
+
+    plan puede ser un plan diario (alimento, franja) -> gramos, como el del Modelo 2, que
+    se repite cada día, o un plan de varios días (alimento, franja, día) -> gramos, como un
+    resultado semanal anterior, que se rota 'desplazamiento' días.
+    Los alimentos de cada día se aceptan por orden mientras se respeten los límites
+    semanales y las ventanas de separación; los que no caben se descartan.
+    Devuelve las cantidades aceptadas y la lista de días aceptados completos.
+    """
+    if all(len(clave) == 2 for clave in plan):
+        planes = [{(i, j): g for (i, j), g in plan.items() if g > 0}]
+    else:
+        dias_plan = sorted({d for (_, _, d) in plan}, key=int)
+        planes = [{(i, j): g for (i, j, dp), g in plan.items() if dp == d and g > 0} for d in dias_plan]
+
+    limitados = {i for i in data if categorias[i] in categorias_permitida}
+    no_repetir = {i for i in data if i not in alimentos_repetir}
+    grupos = [(set(legumbres), 3), (set(azúcares), 2)]
+    usados = {}  # día -> alimentos presentes ese día
+    cantidades = {}
+    completos = []
+    for b, d in enumerate(dias):
+        plan_dia = planes[(b + desplazamiento) % len(planes)]
+        misma_semana = bloques_semanales(dias[:b + 1])[-1][:-1]
+        previos = [usados[e] for e in dias[max(0, b - 2):b]]
+        usados[d] = set()
+        for (i, j), g in sorted(plan_dia.items()):
+            en_semana = sum(i in usados[e] for e in misma_semana)
+            en_ventana = sum(i in u for u in previos)
+            cabe = not (i in limitados and (en_semana >= 2 or en_ventana >= 1))
+            cabe = cabe and not (i in no_repetir and (en_semana >= 4 or en_ventana >= 2))
+            for grupo, tope in grupos:
+                if i in grupo:
+                    cabe = cabe and sum(len(grupo & usados[e]) for e in misma_semana) + len(grupo & usados[d]) < tope
+            if cabe:
+                cantidades[i, j, d] = g
+                usados[d].add(i)
+        if len(usados[d]) == len({i for (i, _) in plan_dia}):
+            completos.append(d)
+    return cantidades, completos
+
+
+def fijar_arranque(model, variables, cantidades, completos, dias=dias):
+    """
+    Asigna el atributo Start de X, Y, Z y de las binarias de grupo a partir del plan
+    repartido con repartir_arranque. En los días completos se da la solución entera; en el
+    resto solo se fijan los alimentos aceptados y Gurobi completa el resto de la solución.
+    Sirve para los dos constructores del modelo.
+    """
+    n, J, D = len(data), len(franjas), len(dias)
+    pos_franja = {j: a for a, j in enumerate(franjas)}
+    pos_dia = {d: b for b, d in enumerate(dias)}
+    completo = np.zeros(D, dtype=bool)
+    completo[[pos_dia[d] for d in completos]] = True
+
+    X = np.where(completo, 0.0, GRB.UNDEFINED) * np.ones((n, J, 1))
+    Y = X.copy()
+    Z = np.where(completo, 0.0, GRB.UNDEFINED) * np.ones((n, 1))
+    for (i, j, d), g in cantidades.items():
+        X[data[i], pos_franja[j], pos_dia[d]] = g
+        Y[data[i], pos_franja[j], pos_dia[d]] = 1.0
+        Z[data[i], pos_dia[d]] = 1.0
+
+    # Binarias de grupo: solo en los días completos, a partir de los gramos de cada grupo
+    gramos = np.where(X < GRB.UNDEFINED, X, 0.0)
+    def grupo(lista):
+        valores = gramos[[data[i] for i in lista]].sum(axis=0) > 0
+        return np.where(completo, valores.astype(float), GRB.UNDEFINED)
+    frutas_ok = gramos[[data[i] for i in frutas]].sum(axis=0) >= 150
+    inicio = {
+        "X": X, "Y": Y, "Z": Z,
+        "F": np.where(completo, frutas_ok.astype(float), GRB.UNDEFINED),
+        "V": grupo(verduras), "L": grupo(legumbres), "C": grupo(carnes),
+        "P": grupo(pescados), "LC": grupo(lacteos), "A": grupo(azúcares),
+    }
+    # X e Y solo tienen variable en los pares (alimento, franja) admisibles
+    inicio["X"] = X[variables["admisible"]]
+    inicio["Y"] = Y[variables["admisible"]]
+    for nombre, valores in inicio.items():
+        var = variables[nombre]
+        if isinstance(var, dict):
+            # Los diccionarios se crean en el mismo orden que los arrays (C-order)
+            model.setAttr("Start", list(var.values()), valores.ravel().tolist())
+        else:
+            var.Start = valores
+
+
+def registrar_primera_solucion(model, where):
+    """
+    Callback que guarda en model._primera_solucion el instante de la primera solución entera.
+    """
+    if where == GRB.Callback.MIPSOL and model._primera_solucion is None:
+        model._primera_solucion = model.cbGet(GRB.Callback.RUNTIME)
+
+
+def resolver(model, flujo=None, extraer=None):
+    """
+    Resuelve el modelo registrando el tiempo hasta la primera solución entera y hasta
+    alcanzar el MIPGap. Devuelve ambos tiempos (en segundos).
+    Si se indica un flujo (incumbentes.FlujoIncumbentes), cada nueva solución entera se
+    publica a medida que se encuentra, convertida en plan con extraer (ver
+    FlujoIncumbentes.optimizar).
+    """
+    model._primera_solucion = None
+    if flujo is not None:
+        flujo.optimizar(model, extraer, callback=registrar_primera_solucion)
+    else:
+        model.optimize(registrar_primera_solucion)
+    if model._primera_solucion is not None:
+        print(f"\nTiempo hasta la primera solución entera: {model._primera_solucion:.2f} s")
+    else:
+        print("\nNo se encontró ninguna solución entera.")
+    print(f"Tiempo total de resolución: {model.Runtime:.2f} s")
+    return model._primera_solucion, model.Runtime
+
+
+def plan_modelo2(perfil=PERFIL_BASE):
+    """
+    Resuelve el Modelo 2 y devuelve su plan diario (alimento, franja) -> gramos.
+    """
+    import Modelo2
+
+    model, variables = Modelo2.construir_modelo(perfil)
+    model.setParam("OutputFlag", 0)
+    model.optimize()
+    if model.SolCount == 0:
+        raise RuntimeError("El Modelo 2 no tiene solución; no se puede usar como arranque.")
+    return Modelo2.extraer_plan(model, variables["X"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve el Modelo 3 con alimentos con Gurobi.")
+    parser.add_argument("--matricial", action="store_true",
+                        help="construye el modelo con variables matriciales (MVar) y addMConstr")
+    parser.add_argument("--reforzado", action="store_true",
+                        help="formulación reforzada (constructor matricial con vinculación de los binarios de grupo "
+                             "con los de sus alimentos y ruptura de simetría entre días)")
+    parser.add_argument("--dias", type=int, default=7,
+                        help="número de días del horizonte (los límites semanales se aplican cada 7 días)")
+    parser.add_argument("--arranque", choices=["modelo2", "anterior"],
+                        help="solución inicial: plan del Modelo 2 o resultado semanal anterior")
+    parser.add_argument("--desplazamiento", type=int, default=0,
+                        help="días que se rota el resultado semanal anterior")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="resuelve el modelo aunque la solución esté en la caché (ver cache_soluciones.py)")
+    parser.add_argument("--incumbentes", metavar="RUTA",
+                        help="escribe cada nueva solución entera en RUTA como JSONL ('-' para la salida estándar)")
+    args = parser.parse_args()
+    dias = generar_dias(args.dias)
+
+    # Flujo de incumbentes (antes de crear ningún modelo: con '-' reserva la salida estándar)
+    flujo = FlujoIncumbentes(args.incumbentes, "Modelo3_alimentos") if args.incumbentes else None
+
+    # Solución inicial: el resultado anterior se lee antes de sobrescribirlo; el plan del
+    # Modelo 2 solo se calcula si la solución no está en la caché (su clave incluye el
+    # código del Modelo 2, y el perfil y los alimentos de los que depende ya están en ella)
+    plan = leer_resultados() if args.arranque == "anterior" else None
+    fuentes = ["Modelo3_alimentos.py"] + (["Modelo2.py"] if args.arranque == "modelo2" else [])
+
+    # Buscar la solución en la caché (la solución inicial puede cambiar el plan encontrado)
+    cache = CacheSoluciones()
+    parametros = {
+        "dias": len(dias), "MIPGap": MIP_GAP, "resolutor": "gurobi",
+        "constructor": "matricial" if args.matricial or args.reforzado else "escalar",
+        "reforzado": args.reforzado,
+        "arranque": args.arranque, "desplazamiento": args.desplazamiento,
+        "plan_arranque": sorted([*k, v] for k, v in plan.items()) if plan else None,
+    }
+    clave = cache.clave("Modelo3_alimentos", PERFIL_BASE, parametros, ficheros=[RUTA_ALIMENTOS], fuentes=fuentes)
+    resultado = None if args.sin_cache else cache.obtener(clave)
+    if resultado is not None:
+        print("Solución recuperada de la caché de soluciones.")
+        publicar(resultado, RUTA_RESULTADOS)
+        if flujo is not None:
+            flujo.publicar_resultado(resultado)
+    else:
+        # Crear modelo
+        if args.reforzado:
+            model, variables = construir_modelo_matricial(dias, reforzado=True)
+        elif args.matricial:
+            model, variables = construir_modelo_matricial(dias)
+        else:
+            model, variables = construir_modelo(dias)
+        if args.arranque == "modelo2":
+            plan = plan_modelo2()
+        if args.arranque:
+            cantidades, completos = repartir_arranque(plan, dias, args.desplazamiento)
+            fijar_arranque(model, variables, cantidades, completos, dias)
+            print(f"Solución inicial: {len(completos)} de {len(dias)} días completos")
+            if args.reforzado and arranque_incumple_simetria(cantidades, completos, dias):
+                print("Aviso: la solución inicial incumple la ruptura de simetría (el primer día cuesta más "
+                      "que el último) y Gurobi no podrá usarla.")
+
+        # Resolver el modelo (publicando las soluciones enteras si se pide)
+        resolver(model, flujo, lambda valor: extraer_resultado(variables, valor, dias))
+
+        # Mostrar los resultados, guardarlos en un fichero y en la caché
+        resultado = escribir_resultados(model, variables, dias)
+        if resultado is not None:
+            cache.guardar(clave, resultado)
@@ -13,348 +13,398 @@ Es un modelo semanal. Se incluye el índice d (días) y además, incorpora el us
 de recetas, manteniendo las mismas restricciones nutricionales y estructurales básicas.
 """
 
+import argparse
 import gurobipy as gp
 from gurobipy import GRB
 import json
-
-# Cargar datos desde el archivo JSON
-with open("alimentos.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
+from cache_soluciones import CacheSoluciones
+from catalogo import RUTA_ALIMENTOS, cargar_catalogo
+from instrumentacion import hito
+from perfil import PERFIL_BASE
+from horizonte import generar_dias, bloques_semanales
+from incumbentes import FlujoIncumbentes
+from resultados import Resultado, lector_gurobi, metadatos_gurobi, publicar
+
+# Cargar el catálogo compilado de alimentos y las recetas desde el archivo JSON
+cat = cargar_catalogo()
+data = cat.indice
 with open("recetas.json", "r", encoding="utf-8") as f:
     recetas = json.load(f)
 
-# Crear modelo
-model = gp.Model("Modelo3_Recetas")
+# Índices (por defecto una semana; el horizonte se puede ampliar con --dias)
+dias = generar_dias(7)
 
-# Índices
-dias = ["1","2","3","4","5","6", "7"]
+# Tolerancia de optimalidad del modelo
+MIP_GAP = 0.03
 
-# Mapear categorías a números
-categorias_map = {
-    "Cereales y derivados": 1, "Leche y productos lácteos": 2, "Huevos": 3, "Azúcares y dulces": 4,
-    "Aceites y grasas": 5, "Verduras y hortalizas": 6, "Legumbres": 7, "Frutas": 8, "Frutos secos": 9,
-    "Carnes": 10, "Productos cárnicos": 11, "Pescados": 12, "Crustáceos y moluscos": 13,
-    "Condimentos y aperitivos": 14, "Bebidas": 15
-}
+# Ruta base de los resultados (ver resultados.py)
+RUTA_RESULTADOS = "Resultados/dieta_optima_Modelo3_recetas"
 
 # Parámetros nutricionales
-precio = {i: float(info["Precio (€/100g)"]) for i, info in data.items()}
-energia = {i: float(info["Energía (Kcal)"]) for i, info in data.items()}
-carbohidratos = {i: float(info["Hidratos de carbono (g)"]) for i, info in data.items()}
-proteina = {i: float(info["Proteínas (g)"]) for i, info in data.items()}
-grasa = {i: float(info["Lípidos totales (g)"]) for i, info in data.items()}
-categorias = {i: categorias_map[info["Categoría"]] for i, info in data.items()}
-maximo = {i: float(info["Máximo (g/día)"]) for i, info in data.items()}
+precio = cat.diccionario("precio")
+energia = cat.diccionario("energia")
+carbohidratos = cat.diccionario("carbohidratos")
+proteina = cat.diccionario("proteina")
+grasa = cat.diccionario("grasa")
+categorias = cat.diccionario("categoria")
+maximo = cat.diccionario("maximo")
 
 # Crear subconjuntos por categoría
-frutas = [i for i in data if data[i]["Categoría"] == "Frutas"]
-legumbres = [i for i in data if data[i]["Categoría"] == "Legumbres"]
-carnes = [i for i in data if data[i]["Categoría"] == "Carnes"]
-pescados = [i for i in data if data[i]["Categoría"] == "Pescados"]
-lacteos = [i for i in data if data[i]["Categoría"] == "Leche y productos lácteos"]
-verduras = [i for i in data if data[i]["Categoría"] == "Verduras y hortalizas"]
-azúcares = [i for i in data if data[i]["Categoría"] == "Azúcares y dulces"]
+frutas = cat.subconjunto("Frutas")
+legumbres = cat.subconjunto("Legumbres")
+carnes = cat.subconjunto("Carnes")
+pescados = cat.subconjunto("Pescados")
+lacteos = cat.subconjunto("Leche y productos lácteos")
+verduras = cat.subconjunto("Verduras y hortalizas")
+azúcares = cat.subconjunto("Azúcares y dulces")
 
 #Creamos el subconjunto de alimentos que pueden ser postre
-postre = [i for i in data if data[i].get("Extra") == "Postre"]
+postre = cat.postres()
+
+# Categorías de alimentos que no pueden repetirse más de 2 veces a la semana
+categorias_permitida= {6,7,8,10,12}   # verduras, legumbres, frutas, carne, pescado
+# Alimentos que sí se pueden repetir sin límite
+alimentos_repetir = {"leche desnatada", "pasta", "huevo", "yogur", "pan blanco", "pan integral"}
+
+# Alimentos que no se pueden incluir en desayuno y merienda
+alimentos_prohibidos = ["arroz", "pasta", "quinoa"]
+prohibidos_franja = {j: alimentos_prohibidos for j in ["desayuno", "merienda"]}
 
-# Distribución de calorías por franja horaria
-distr_calorica = {"desayuno": 0.2, "comida": 0.4, "merienda": 0.1, "cena": 0.3}
+# Franjas horarias (las de recetas.json)
+franjas = list(recetas)
 
-# Distribución de macronutrientes por franja horaria
-distr_macros = {
-    "carbohidratos": {"desayuno": 0.5, "comida": 0.35, "merienda": 0.4, "cena": 0.4},
-    "proteina": {"desayuno": 0.25, "comida": 0.4, "merienda": 0.3, "cena": 0.3},
-    "grasa": {"desayuno": 0.25, "comida": 0.25, "merienda": 0.3, "cena": 0.3}
+# Conjuntos de alimentos de cada grupo (búsquedas en tiempo constante)
+grupos = {
+    "frutas": set(frutas), "verduras": set(verduras), "legumbres": set(legumbres), "carnes": set(carnes),
+    "pescados": set(pescados), "lacteos": set(lacteos), "azúcares": set(azúcares),
+    "postres": set(frutas + postre), "leche_cafe": {"leche desnatada", "café"},
 }
 
-# Categorías permitidas por franja
-categorias_permitidas = {
-    "desayuno": {1, 2, 3, 4, 5, 8, 11},
-    "comida": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15},
-    "merienda": {1, 2, 3, 4, 5, 8, 9, 11},
-    "cena": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15}
+# Coeficientes por gramo de calorías y de calorías de cada macronutriente
+coeficientes = {
+    "calorias": {i: energia[i] / 100 for i in data},
+    "carbohidratos": {i: carbohidratos[i] * 4 / 100 for i in data},
+    "proteina": {i: proteina[i] * 4 / 100 for i in data},
+    "grasa": {i: grasa[i] * 9 / 100 for i in data},
 }
 
-X = {} # Variable de decisión binaria: 1 si se seleccion en la franja j la receta r el día d
-Q = {} # Variable de decisión: cantidad en gramos de cada alimento i en la franja j de la receta r el día d
-for d in dias:
-    for j, lista in recetas.items():
-        for r, receta in enumerate(lista):
-            X[j, r, d] = model.addVar(vtype=GRB.BINARY)
-            for i, (qmin, qmax) in receta["ingredientes"].items():
-                Q[i, j, r, d] = model.addVar(lb=0, ub=float(qmax))
 
-Y = {} # Variable de decisión binaria: 1 si se seleccion alimento extra i en la franja j el día d 
-Q_extra = {} # Variable de decisión: cantidad en gramos de cada alimento extra i en la franja j el día d
-for d in dias:
-    for i in data:
+def indexar_recetas(recetas):
+    """
+    Indexa los ingredientes de un catálogo de recetas (franja -> lista de recetas).
+    Devuelve los pares (receta, ingrediente) de cada franja, los mismos pares separados
+    por grupo de alimentos y el índice invertido ingrediente -> recetas (franja, receta).
+    """
+    ingredientes_franja = {j: [(r, i) for r, receta in enumerate(lista) for i in receta["ingredientes"]]
+                           for j, lista in recetas.items()}
+    ingredientes_grupo = {j: {g: [(r, i) for r, i in pares if i in conjunto] for g, conjunto in grupos.items()}
+                          for j, pares in ingredientes_franja.items()}
+    recetas_con = {}
+    for j, pares in ingredientes_franja.items():
+        for r, i in pares:
+            recetas_con.setdefault(i, []).append((j, r))
+    return ingredientes_franja, ingredientes_grupo, recetas_con
+
+
+def construir_modelo(dias=dias, perfil=PERFIL_BASE, recetas=recetas):
+    """
+    Construye el Modelo 3 con recetas para el horizonte de días y el perfil nutricional indicados.
+    Los alimentos extra (Y, Q_extra) solo se crean en las franjas en las que son admisibles
+    y las sumas por grupo recorren los ingredientes de cada grupo precalculados por franja.
+    Por defecto se usan todas las recetas de recetas.json; se puede pasar otro catálogo
+    (o un subconjunto, ver generacion_columnas.py) con el mismo formato.
+    Devuelve el modelo y un diccionario con las variables de decisión y, en "filas", las
+    restricciones por franja y día en las que intervienen las recetas.
+    """
+    kcal_min, kcal_max = perfil["kcal_min"], perfil["kcal_max"]
+    distr_calorica = perfil["distr_calorica"]
+    distr_macros = perfil["distr_macros"]
+    categorias_permitidas = perfil["categorias_permitidas"]
+
+    # Alimentos extra admisibles en cada franja (categoría permitida y no prohibidos)
+    admisible = cat.admisibles(franjas, categorias_permitidas, prohibidos_franja)
+    extras_franja = {j: [i for i in data if admisible[data[i], a]] for a, j in enumerate(franjas)}
+    franjas_extra = {i: [j for a, j in enumerate(franjas) if admisible[k, a]] for i, k in data.items()}
+    extras_grupo = {j: {g: [i for i in extras if i in conjunto] for g, conjunto in grupos.items()}
+                    for j, extras in extras_franja.items()}
+    ingredientes_franja, ingredientes_grupo, recetas_con = indexar_recetas(recetas)
+
+    hito("indices")
+
+    # Crear modelo
+    model = gp.Model("Modelo3_Recetas")
+
+    X = {} # Variable de decisión binaria: 1 si se seleccion en la franja j la receta r el día d
+    Q = {} # Variable de decisión: cantidad en gramos de cada alimento i en la franja j de la receta r el día d
+    for d in dias:
+        for j, lista in recetas.items():
+            for r, receta in enumerate(lista):
+                X[j, r, d] = model.addVar(vtype=GRB.BINARY)
+                for i, (qmin, qmax) in receta["ingredientes"].items():
+                    # Los ingredientes de categorías no permitidas en la franja quedan a 0
+                    cota = float(qmax) if categorias[i] in categorias_permitidas[j] else 0.0
+                    Q[i, j, r, d] = model.addVar(lb=0, ub=cota)
+
+    Y = {} # Variable de decisión binaria: 1 si se seleccion alimento extra i en la franja j el día d 
+    Q_extra = {} # Variable de decisión: cantidad en gramos de cada alimento extra i en la franja j el día d
+    for d in dias:
+        for i in data:
+            for j in franjas_extra[i]:
+                Y[i, j, d] = model.addVar(vtype=GRB.BINARY)
+                Q_extra[i, j, d] = model.addVar(lb=0)
+
+    # Variable de decisión binaria: 1 si esta presente el alimento i  el día d
+    Z = {(i, d): model.addVar(vtype=GRB.BINARY) for i in data for d in dias}
+
+    # Variable de decisión binaria: 1 si esta presente el tipo de alimento en la franja j el día d
+    F = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # frutas
+    V = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # verduras
+    L = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # legumbres
+    C = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # carne
+    P = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # pescado
+    LC = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # leche y lácteos
+    A = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # azúcares y dulces
+    hito("variables")
+
+    #Función objetivo:
+    model.setObjective(gp.quicksum( precio[i]/100 * Q[i, j, r, d] for (i, j, r, d) in Q
+                ) + gp.quicksum(precio[i]/100 * Q_extra[i, j, d]  for (i, j, d) in Q_extra), GRB.MINIMIZE)
+
+    # Restricción gramos de alimento i de la receta r entre qmin y qmax y máximo alimento por receta
+    for d in dias: 
+        for j, lista in recetas.items():
+            for r, receta in enumerate(lista):
+                for i, (qmin, qmax) in receta["ingredientes"].items():
+                    model.addConstr(Q[i, j, r, d] <= float(qmax) * X[j, r, d])
+                    model.addConstr(Q[i, j, r, d] >= float(qmin) * X[j, r, d])
+                    model.addConstr(Q[i, j, r, d] <= maximo[i]* X[j, r, d])
+
+    # Suma ponderada de las cantidades (recetas y extras) de una lista de ingredientes y extras
+    def suma(coef, pares, extras, j, d):
+        return (gp.quicksum(coef[i] * Q[i, j, r, d] for r, i in pares)
+                + gp.quicksum(coef[i] * Q_extra[i, j, d] for i in extras))
+
+    def suma_grupo(g, j, d):
+        return (gp.quicksum(Q[i, j, r, d] for r, i in ingredientes_grupo[j][g])
+                + gp.quicksum(Q_extra[i, j, d] for i in extras_grupo[j][g]))
+
+    # Restricciones en las que intervienen las recetas, por (tipo, franja, día)
+    filas = {}
+
+    # Restricciones por franja y día                
+    for d in dias:
         for j in recetas:
-            Y[i, j, d] = model.addVar(vtype=GRB.BINARY)
-            Q_extra[i, j, d] = model.addVar(lb=0)
-
-# Variable de decisión binaria: 1 si esta presente el alimento i  el día d
-Z = {(i, d): model.addVar(vtype=GRB.BINARY) for i in data for d in dias}
-
-# Variable de decisión binaria: 1 si esta presente el tipo de alimento en la franja j el día d
-F = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # frutas
-V = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # verduras
-L = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # legumbres
-C = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # carne
-P = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # pescado
-LC = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # leche y lácteos
-A = {(j, d): model.addVar(vtype=GRB.BINARY) for j in recetas for d in dias}  # azúcares y dulces
-
-#Función objetivo:
-model.setObjective(gp.quicksum( precio[i]/100 * Q[i, j, r, d] for (i, j, r, d) in Q
-            ) + gp.quicksum(precio[i]/100 * Q_extra[i, j, d]  for (i, j, d) in Q_extra), GRB.MINIMIZE)
-
-# Restricción gramos de alimento i de la receta r entre qmin y qmax 
-for d in dias: 
-    for j, lista in recetas.items():
-        for r, receta in enumerate(lista):
-            for i, (qmin, qmax) in receta["ingredientes"].items():
-                model.addConstr(Q[i, j, r, d] <= float(qmax) * X[j, r, d])
-                model.addConstr(Q[i, j, r, d] >= float(qmin) * X[j, r, d])
-                
-# Restricciones por franja y día                
-for d in dias:
-    for j in recetas:
-        d_j = distr_calorica[j]
-        # Restricción de calorías
-        total_kcal = gp.quicksum((energia[i] / 100) * Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"]
-                    ) + gp.quicksum((energia[i] / 100) * Q_extra[i, j, d] for i in data if (i, j, d) in Q_extra)
-        model.addConstr(total_kcal >= d_j * 2900)
-        model.addConstr(total_kcal <= d_j * 3100)
-
-        # Restricción de carbohidratos
-        expr_carbs = gp.quicksum((carbohidratos[i] * 4 / 100) * Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"]
-                    ) + gp.quicksum((carbohidratos[i] * 4 / 100) * Q_extra[i, j, d] for i in data if (i, j, d) in Q_extra)
-        model.addConstr(expr_carbs >= distr_macros["carbohidratos"][j] * d_j * 2900)
-        model.addConstr(expr_carbs <= distr_macros["carbohidratos"][j] * d_j * 3100)
-
-        # Restricción de proteínas
-        expr_prot = gp.quicksum((proteina[i] * 4 / 100) * Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"]
-                    ) + gp.quicksum((proteina[i] * 4 / 100) * Q_extra[i, j, d] for i in data if (i, j, d) in Q_extra)
-        model.addConstr(expr_prot >= distr_macros["proteina"][j] * d_j * 2900)
-        model.addConstr(expr_prot <= distr_macros["proteina"][j] * d_j * 3100)
-
-        # Restricción de grasas
-        expr_grasa = gp.quicksum((grasa[i] * 9 / 100) * Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"]
-                    ) + gp.quicksum((grasa[i] * 9 / 100) * Q_extra[i, j, d] for i in data if (i, j, d) in Q_extra)
-        model.addConstr(expr_grasa >= distr_macros["grasa"][j] * d_j * 2900)
-        model.addConstr(expr_grasa <= distr_macros["grasa"][j] * d_j * 3100)
-
-  
-# Restricción alimento extra deben ser de categoría permitida en esa franja y como mínimo 20g y máximo 
-for d in dias:
+            d_j = distr_calorica[j]
+            pares, extras = ingredientes_franja[j], extras_franja[j]
+            # Restricción de calorías
+            total_kcal = suma(coeficientes["calorias"], pares, extras, j, d)
+            filas["calorias_min", j, d] = model.addConstr(total_kcal >= d_j * kcal_min)
+            filas["calorias_max", j, d] = model.addConstr(total_kcal <= d_j * kcal_max)
+
+            # Restricción de carbohidratos, proteínas y grasas
+            for macro in ("carbohidratos", "proteina", "grasa"):
+                expr = suma(coeficientes[macro], pares, extras, j, d)
+                filas[f"{macro}_min", j, d] = model.addConstr(expr >= distr_macros[macro][j] * d_j * kcal_min)
+                filas[f"{macro}_max", j, d] = model.addConstr(expr <= distr_macros[macro][j] * d_j * kcal_max)
+
+
+    # Restricción alimento extra como mínimo 20g y máximo (solo existen los extras admisibles)
     for (i, j, d) in Q_extra:
-        if categorias[i] not in categorias_permitidas[j]:
-            model.addConstr(Q_extra[i, j, d] == 0)
         model.addConstr(Q_extra[i, j, d] >= 20 * Y[i, j, d])
         model.addConstr(Q_extra[i, j, d] <= maximo[i] * Y[i, j, d])
 
-# Restricción máximo alimento por receta y de las categorías permitidas
-for d in dias:
-    for j, lista in recetas.items():
-        for r, receta in enumerate(lista):
-            for i in receta["ingredientes"]:
-                model.addConstr(Q[i, j, r, d] <= maximo[i]* X[j, r, d])
-                if categorias[i] not in categorias_permitidas[j]:
-                    model.addConstr(Q[i, j, r, d] == 0)
-                 
-# Restricciones por franja horaria y día
-for d in dias:       
-    for j in recetas:
-        # Restriccion al menos 150g de frutas
-        expr_frutas = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in frutas
-        ) + gp.quicksum(Q_extra[i, j, d] for i in frutas if (i, j, d) in Q_extra)
-        model.addConstr(expr_frutas >= 150 * F[j, d])
-        # Restriccion al menos 80g de verduras y máximo 250g
-        expr_verduras = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in verduras
-        ) + gp.quicksum(Q_extra[i, j, d] for i in verduras if (i, j, d) in Q_extra)
-        model.addConstr(expr_verduras >= 80 * V[j, d])
-        model.addConstr(expr_verduras <= 250 * V[j, d])
-        # Restriccion máximo 100g de legumbres
-        expr_legumbres = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in legumbres
-        ) + gp.quicksum(Q_extra[i, j, d] for i in legumbres if (i, j, d) in Q_extra)
-        model.addConstr(expr_legumbres <= 100 * L[j, d])
-        # Restriccion máximo 250g de carne
-        expr_carne = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in carnes
-        ) + gp.quicksum(Q_extra[i, j, d] for i in carnes if (i, j, d) in Q_extra)
-        model.addConstr(expr_carne <= 250 * C[j, d])
-        # Restriccion máximo 200g de pescado
-        expr_pescado = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in pescados
-        ) + gp.quicksum(Q_extra[i, j, d] for i in pescados if (i, j, d) in Q_extra)
-        model.addConstr(expr_pescado <= 200 * P[j, d])
-        # Restriccion en una misma franja solo puede haber carne o pescado, no ambos
-        model.addConstr(C[j, d] + P[j, d] <= 1)
-        # Restriccion máximo 200g de leche o lácteos
-        expr_lacteos = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in lacteos
-        ) + gp.quicksum(Q_extra[i, j, d] for i in lacteos if (i, j, d) in Q_extra)
-        model.addConstr(expr_lacteos <= 200 * LC[j, d])
-        # Restriccion máximo 35g de azúcares o dulces
-        expr_azúcares = gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in azúcares
-        ) + gp.quicksum(Q_extra[i, j, d] for i in azúcares if (i, j, d) in Q_extra)
-        model.addConstr(expr_azúcares <= 35 * A[j, d])
-
-# Restricciones adicionales (frutas en 3 franjas al menos, verduras en 2 franjas al menos, legumbres como mucho en 1 franja)
-for d in dias:
-    model.addConstr(gp.quicksum(F[j, d] for j in recetas) >= 3)
-    model.addConstr(gp.quicksum(V[j, d] for j in recetas) >= 2)
-    model.addConstr(gp.quicksum(L[j, d] for j in recetas) <= 1)
-    model.addConstr(gp.quicksum(A[j, d] for j in recetas) <= 1)
-          
-# Restricción al menos una receta por franja
-for d in dias:
-    for j in recetas:
-        model.addConstr(gp.quicksum(X[j, r, d] for r in range(len(recetas[j]))) >= 1)
-
-
-# Restricción si un alimento está en una receta seleccionada, no puede usarse como extra en ninguna franja
-for d in dias:
-    for i in data:
-        recetas_con_ingrediente = []
-        for j, lista in recetas.items():
-            for r, receta in enumerate(lista):
-                if i in receta["ingredientes"]:
-                    recetas_con_ingrediente.append(X[j, r, d])
-        if recetas_con_ingrediente:
-            for franja in recetas:
-                model.addConstr(Q_extra[i, franja, d] <= maximo[i] * (1.0 - gp.quicksum(recetas_con_ingrediente)))
-
-# Restricción se selecciona alimento extra si es necesario y como mucho en una franja
-for d in dias:
-    for i in data:
+    # Restricciones por franja horaria y día
+    for d in dias:       
         for j in recetas:
-            model.addConstr(Q_extra[i, j, d] <= maximo[i] * Y[i, j, d])
-        model.addConstr(gp.quicksum(Y[i, j, d] for j in recetas) <= 1)
-
-# Restricción de incluir 200g de leche o café en el desayuno
-for d in dias:
-    leche_cafe_recetas = gp.quicksum(Q[i, "desayuno", r, d] for r, receta in enumerate(recetas["desayuno"])
-        for i in receta["ingredientes"] if i in ["leche desnatada", "café"])
-
-    leche_cafe_extra = gp.quicksum(Q_extra[i, "desayuno", d] for i in ["leche desnatada", "café"]
-        if (i, "desayuno", d) in Q_extra)
-    model.addConstr(leche_cafe_recetas + leche_cafe_extra >= 200)
-
-# Restriccion de no incluir arroz y pasta en desayuno y merienda
-for d in dias:
-    alimentos_prohibidos = ["arroz", "pasta", "quinoa"]
-    for j in ["desayuno", "merienda"]:
-        for i in alimentos_prohibidos:
-            model.addConstr(Q_extra[i, j, d] == 0)
-
-# Restricción de incluir postres en comida y cena
-for d in dias:
-    for j in ["comida", "cena"]:
-        model.addConstr(
-            gp.quicksum(Q[i, j, r, d] for r, receta in enumerate(recetas[j]) for i in receta["ingredientes"] if i in frutas + postre
-            ) + gp.quicksum(Q_extra[i, j, d] for i in frutas + postre if (i, j, d) in Q_extra) >= 150)
-
-# Restricciones para no repetir alimentos por día
-for i in data:
+            # Restriccion al menos 150g de frutas
+            filas["frutas", j, d] = model.addConstr(suma_grupo("frutas", j, d) >= 150 * F[j, d])
+            # Restriccion al menos 80g de verduras y máximo 250g
+            expr_verduras = suma_grupo("verduras", j, d)
+            filas["verduras_min", j, d] = model.addConstr(expr_verduras >= 80 * V[j, d])
+            filas["verduras_max", j, d] = model.addConstr(expr_verduras <= 250 * V[j, d])
+            # Restriccion máximo 100g de legumbres
+            filas["legumbres", j, d] = model.addConstr(suma_grupo("legumbres", j, d) <= 100 * L[j, d])
+            # Restriccion máximo 250g de carne
+            filas["carnes", j, d] = model.addConstr(suma_grupo("carnes", j, d) <= 250 * C[j, d])
+            # Restriccion máximo 200g de pescado
+            filas["pescados", j, d] = model.addConstr(suma_grupo("pescados", j, d) <= 200 * P[j, d])
+            # Restriccion en una misma franja solo puede haber carne o pescado, no ambos
+            model.addConstr(C[j, d] + P[j, d] <= 1)
+            # Restriccion máximo 200g de leche o lácteos
+            filas["lacteos", j, d] = model.addConstr(suma_grupo("lacteos", j, d) <= 200 * LC[j, d])
+            # Restriccion máximo 35g de azúcares o dulces
+            filas["azúcares", j, d] = model.addConstr(suma_grupo("azúcares", j, d) <= 35 * A[j, d])
+
+    # Restricciones adicionales (frutas en 3 franjas al menos, verduras en 2 franjas al menos, legumbres como mucho en 1 franja)
+    for d in dias:
+        model.addConstr(gp.quicksum(F[j, d] for j in recetas) >= 3)
+        model.addConstr(gp.quicksum(V[j, d] for j in recetas) >= 2)
+        model.addConstr(gp.quicksum(L[j, d] for j in recetas) <= 1)
+        model.addConstr(gp.quicksum(A[j, d] for j in recetas) <= 1)
+
+    # Restricción al menos una receta por franja
     for d in dias:
-        usos_alimento = []
-        # Si el alimento se usa como extra
-        for j in recetas:
-            usos_alimento.append(Y[i, j, d])
-        # Si el alimento se usa dentro de alguna receta
         for j in recetas:
-            for r, receta in enumerate(recetas[j]):
-                if i in receta["ingredientes"]:
-                    usos_alimento.append(X[j, r, d])
-        for uso in usos_alimento:
-            model.addConstr(uso <= Z[i, d])
-        model.addConstr(Z[i, d] <= gp.quicksum(usos_alimento))
+            filas["recetas", j, d] = model.addConstr(gp.quicksum(X[j, r, d] for r in range(len(recetas[j]))) >= 1)
 
-# Categorías de alimentos que no pueden repetirse más de 2 veces a la semana
-categorias_permitida= {6,7,8,10,12}   # verduras, legumbres, frutas, carne, pescado
-# Alimentos que sí se pueden repetir sin límite
-alimentos_repetir = {"leche desnatada", "pasta", "huevo", "yogur", "pan blanco", "pan integral"}
 
-# Restricción para controlar la repetición de alimentos
-for i in data:
-    if categorias[i] in categorias_permitida:
-        model.addConstr(gp.quicksum(Z[i, d] for d in dias) <= 2)
-    elif i not in alimentos_repetir:
-        model.addConstr(gp.quicksum(Z[i, d] for d in dias) <=4)
-
-# Restricciones adicionales: no repetir legumbres más de 3 días, no tomar azúcares más de 2 días 
-model.addConstr(gp.quicksum(Z[i, d] for i in legumbres for d in dias) <=3)
-model.addConstr(gp.quicksum(Z[i, d] for i in azúcares for d in dias) <=2)
-
-# Restricciones para repetir alimentos en días separados
-for i in data:
-    # Debe de haber 2 días entre consumir el mismo tipo de carne, pescado , verdura , legumbre o fruta
-    if categorias[i]  in categorias_permitida:
-        for idx in range(len(dias) - 2):
-            d1 = dias[idx]
-            d2 = dias[idx + 1]
-            d3 = dias[idx + 2]
-            model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 1)
-    # El resto de alimentos pueden aparecer como máximo en 2 días consecutivos       
-    if i not in alimentos_repetir:
-        for idx in range(len(dias) - 2):
-            d1 = dias[idx]
-            d2 = dias[idx + 1]
-            d3 = dias[idx + 2]
-            model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 2)
-
-# Restricción no repetir la misma receta más de dos veces a la semana
-for j, lista in recetas.items():
-    for r, receta in enumerate(lista):
-        model.addConstr(gp.quicksum(X[j, r, d] for d in dias) <= 2)
-        
-#Restricción para dejar al menos 2 días entre en el consumo de la misma receta
-for j, lista in recetas.items():
-    for r, receta in enumerate(lista):
-        for idx in range(len(dias) - 2):
-            d1 = dias[idx]
-            d2 = dias[idx + 1]
-            d3 = dias[idx + 2]
-            model.addConstr(X[j, r, d1] + X[j, r, d2] + X[j, r, d3] <=1)
-
-
-# Parámetro para el valor de tolerancia de optimalidad   
-model.setParam('MIPGap', 0.03)
-
-# Resolver el modelo
-model.optimize()
-
-# Mostrar los resultados y escribir en fichero
-if model.status == GRB.OPTIMAL:
-    with open("Resultados/dieta_optima_Modelo3_recetas", "w", encoding="utf-8") as f:
-        def escribir(linea):
-            print(linea)
-            f.write(linea + "\n")
-
-        escribir("\nDieta óptima encontrada:")
+    # Restricción si un alimento está en una receta seleccionada, no puede usarse como extra en ninguna franja
+    for d in dias:
+        for i, usos in recetas_con.items():
+            if franjas_extra[i]:
+                recetas_con_ingrediente = gp.quicksum(X[j, r, d] for j, r in usos)
+                for franja in franjas_extra[i]:
+                    filas["exclusion", i, franja, d] = model.addConstr(
+                        Q_extra[i, franja, d] <= maximo[i] * (1.0 - recetas_con_ingrediente))
+
+    # Restricción se selecciona alimento extra como mucho en una franja
+    for d in dias:
+        for i in data:
+            if franjas_extra[i]:
+                model.addConstr(gp.quicksum(Y[i, j, d] for j in franjas_extra[i]) <= 1)
+
+    # Restricción de incluir 200g de leche o café en el desayuno
+    for d in dias:
+        filas["leche_cafe", "desayuno", d] = model.addConstr(suma_grupo("leche_cafe", "desayuno", d) >= 200)
+
+    # Restricción de incluir postres en comida y cena
+    for d in dias:
+        for j in ["comida", "cena"]:
+            filas["postres", j, d] = model.addConstr(suma_grupo("postres", j, d) >= 150)
+
+    # Restricciones para no repetir alimentos por día
+    for i in data:
         for d in dias:
-            escribir(f"\nDía: {d.capitalize()}")
-
-            for j in recetas:
-                for r, receta in enumerate(recetas[j]):
-                    if X[j, r, d].X > 0.5:
-                        escribir(f"\n{j.capitalize()}: {receta.get('receta', 'Receta sin nombre')}")
-                        for i, (qmin, qmax) in receta["ingredientes"].items():
-                            cantidad = Q[i, j, r, d].X
-                            if cantidad > 0.1:
-                                escribir(f"  - {i}: {cantidad:.2f}g")
-            # Ingredientes fuera de recetas (extras)
-            for j in recetas:
-                impresos = False
-                for i in data:
-                    cantidad = Q_extra[i, j, d].X
-                    if cantidad > 0.1:
-                        if not impresos:
-                            escribir(f"\n{j.capitalize()} extra:")
-                            impresos = True
-                        escribir(f"  - {i}: {cantidad:.2f}g")
-
-        escribir(f"\nCoste total: {model.objVal:.2f} €")
-    print("\nDieta óptima guardada en 'Resultados/dieta_optima_Modelo3_recetas'.")
-else:
-    print("No se encontró solución óptima.")
+            # Si el alimento se usa como extra o dentro de alguna receta
+            usos_alimento = [Y[i, j, d] for j in franjas_extra[i]] + [X[j, r, d] for j, r in recetas_con.get(i, [])]
+            for uso in usos_alimento:
+                model.addConstr(uso <= Z[i, d])
+            filas["uso", i, d] = model.addConstr(Z[i, d] <= gp.quicksum(usos_alimento))
+
+    # Restricción para controlar la repetición de alimentos (en cada semana del horizonte)
+    for semana in bloques_semanales(dias):
+        for i in data:
+            if categorias[i] in categorias_permitida:
+                model.addConstr(gp.quicksum(Z[i, d] for d in semana) <= 2)
+            elif i not in alimentos_repetir:
+                model.addConstr(gp.quicksum(Z[i, d] for d in semana) <=4)
+
+        # Restricciones adicionales: no repetir legumbres más de 3 días, no tomar azúcares más de 2 días
+        model.addConstr(gp.quicksum(Z[i, d] for i in legumbres for d in semana) <=3)
+        model.addConstr(gp.quicksum(Z[i, d] for i in azúcares for d in semana) <=2)
+
+    # Restricciones para repetir alimentos en días separados
+    for i in data:
+        # Debe de haber 2 días entre consumir el mismo tipo de carne, pescado , verdura , legumbre o fruta
+        if categorias[i]  in categorias_permitida:
+            for idx in range(len(dias) - 2):
+                d1 = dias[idx]
+                d2 = dias[idx + 1]
+                d3 = dias[idx + 2]
+                model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 1)
+        # El resto de alimentos pueden aparecer como máximo en 2 días consecutivos       
+        if i not in alimentos_repetir:
+            for idx in range(len(dias) - 2):
+                d1 = dias[idx]
+                d2 = dias[idx + 1]
+                d3 = dias[idx + 2]
+                model.addConstr(Z[i, d1] + Z[i, d2] + Z[i, d3]<= 2)
+
+    # Restricción no repetir la misma receta más de dos veces a la semana
+    for semana in bloques_semanales(dias):
+        for j, lista in recetas.items():
+            for r, receta in enumerate(lista):
+                model.addConstr(gp.quicksum(X[j, r, d] for d in semana) <= 2)
 
+    #Restricción para dejar al menos 2 días entre en el consumo de la misma receta
+    for j, lista in recetas.items():
+        for r, receta in enumerate(lista):
+            for idx in range(len(dias) - 2):
+                d1 = dias[idx]
+                d2 = dias[idx + 1]
+                d3 = dias[idx + 2]
+                model.addConstr(X[j, r, d1] + X[j, r, d2] + X[j, r, d3] <=1)
+
+
+    # Parámetro para el valor de tolerancia de optimalidad
+    model.setParam('MIPGap', MIP_GAP)
+
+    variables = {"X": X, "Q": Q, "Y": Y, "Q_extra": Q_extra, "Z": Z,
+                 "F": F, "V": V, "L": L, "C": C, "P": P, "LC": LC, "A": A, "filas": filas}
+    hito("restricciones")
+    return model, variables
+
+
+def extraer_resultado(variables, valor, dias=dias, recetas=recetas, metadatos=None):
+    """
+    Extrae la solución como Resultado (ver resultados.py): los ingredientes de las recetas
+    seleccionadas y los alimentos extra de cada franja y día. 'valor' lee en bloque los
+    valores de las variables (resultados.lector_gurobi o Solucion.valor) y 'recetas' es el
+    catálogo con el que se construyó el modelo.
+    """
+    metadatos = dict(metadatos or {}, dias=list(dias))
+    X, Q, Q_extra = (valor(variables[v]) for v in ("X", "Q", "Q_extra"))
+    registros = []
+    for d in dias:
+        for j, lista in recetas.items():
+            for r, receta in enumerate(lista):
+                if X[j, r, d] > 0.5:
+                    nombre = receta.get("receta", "Receta sin nombre")
+                    registros += [(d, j, nombre, i, Q[i, j, r, d]) for i in receta["ingredientes"]
+                                  if Q[i, j, r, d] > 0.1]
+            registros += [(d, j, None, i, Q_extra[i, j, d]) for i in data if Q_extra.get((i, j, d), 0) > 0.1]
+    return Resultado.desde_registros(registros, metadatos)
+
+
+def escribir_resultados(model, variables, dias=dias, ruta=RUTA_RESULTADOS):
+    """
+    Muestra los resultados y los guarda en ruta (.json, .npz y el informe en .txt).
+    Devuelve el Resultado (None si no hay solución óptima).
+    """
+    if model.status == GRB.OPTIMAL:
+        metadatos = metadatos_gurobi(model, "Modelo3_recetas", PERFIL_BASE)
+        resultado = extraer_resultado(variables, lector_gurobi(model), dias, metadatos=metadatos)
+        publicar(resultado, ruta)
+        return resultado
+    print("No se encontró solución óptima.")
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve el Modelo 3 con recetas con Gurobi.")
+    parser.add_argument("--dias", type=int, default=7,
+                        help="número de días del horizonte (los límites semanales se aplican cada 7 días)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="resuelve el modelo aunque la solución esté en la caché (ver cache_soluciones.py)")
+    parser.add_argument("--incumbentes", metavar="RUTA",
+                        help="escribe cada nueva solución entera en RUTA como JSONL ('-' para la salida estándar)")
+    args = parser.parse_args()
+    dias = generar_dias(args.dias)
+
+    # Flujo de incumbentes (antes de crear ningún modelo: con '-' reserva la salida estándar)
+    flujo = FlujoIncumbentes(args.incumbentes, "Modelo3_recetas") if args.incumbentes else None
+
+    # Buscar la solución en la caché
+    cache = CacheSoluciones()
+    clave = cache.clave("Modelo3_recetas", PERFIL_BASE, {"dias": len(dias), "MIPGap": MIP_GAP, "resolutor": "gurobi"},
+                        ficheros=[RUTA_ALIMENTOS, "recetas.json"], fuentes=["Modelo3_recetas.py"])
+    resultado = None if args.sin_cache else cache.obtener(clave)
+    if resultado is not None:
+        print("Solución recuperada de la caché de soluciones.")
+        publicar(resultado, RUTA_RESULTADOS)
+        if flujo is not None:
+            flujo.publicar_resultado(resultado)
+    else:
+        # Crear modelo
+        model, variables = construir_modelo(dias)
+
+        # Resolver el modelo (publicando las soluciones enteras si se pide)
+        if flujo is not None:
+            flujo.optimizar(model, lambda valor: extraer_resultado(variables, valor, dias))
+        else:
+            model.optimize()
+
+        # Mostrar los resultados, escribir en fichero y guardar en la caché
+        resultado = escribir_resultados(model, variables, dias)
+        if resultado is not None:
+            cache.guardar(clave, resultado)
@@ -7,66 +7,93 @@ Autor: Ana Llorente García
 
 
 Este script determina la dieta óptima semanal para una escaladora de competición
-usando la API de Google Gemini para generar menús diarios a partir de una dieta semanal.    
+usando la API de Google Gemini para generar menús diarios a partir de una dieta semanal.
 Utilizando los resultados del Modelo 3 con alimentos.
+
+En lugar de una única petición con toda la semana, los menús se generan con una petición
+por día (o por franja horaria) lanzadas a la vez con asyncio, con un número máximo de
+peticiones simultáneas, un tiempo límite por petición y reintentos con espera exponencial.
+Los menús se escriben en orden en Resultados/dieta_óptima_IA.txt; si un día falla tras
+los reintentos, se indica en su lugar y el resto del menú se conserva.
+
+El cliente es intercambiable: ClienteGemini usa la API de Gemini y ClienteHTTP un servidor
+local que recibe {"prompt": ...} y devuelve {"texto": ...} (por ejemplo, el servidor de
+prueba con latencia simulada de benchmarks/ia_concurrente.py).
+
+Con --unidad bloque los prompts usan una codificación tabular compacta (una línea
+"día|franja|alimento gramos, ..." por franja, con las instrucciones comunes al principio) y
+se reparten en bloques de días enteros que no superan un presupuesto de tokens
+(--presupuesto), lo que reduce el volumen de tokens en los planes de varias semanas.
+
+Las respuestas se guardan en la caché en disco de cache_ia.py, con clave el prompt de cada
+día (o franja), el modelo y los parámetros de generación: al volver a generar una semana en
+la que solo ha cambiado un día se hace una sola petición (--sin-cache para no usarla).
+
+Uso: python ModeloIA.py [--unidad semana|dia|franja|bloque] [--presupuesto 1000]
+                        [--concurrencia 7] [--reintentos 3] [--timeout 120]
+                        [--url http://127.0.0.1:8766] [--sin-cache]
 """
 
-import re
-import google.generativeai as genai
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from urllib.parse import urlsplit
+
+from cache_ia import CacheIA
+from resultados import Resultado
+
+# Clave de la API de Google Gemini (a rellenar por el usario)
+API_KEY = ""
+MODELO_GEMINI = "gemini-1.5-pro"
+
+UNIDADES = ["semana", "dia", "franja", "bloque"]
 
-# Configurar la API de Google Gemini (a rellenar por el usario)
-genai.configure(api_key="")
+# Presupuesto de tokens por defecto de cada prompt compacto y caracteres por token con los
+# que se estima su número (aproximación habitual; se puede pasar otra función de recuento)
+PRESUPUESTO_TOKENS = 1000
+CARACTERES_POR_TOKEN = 4
 
-# Inicializar el modelo de Gemini (asegúrate de haber configurado las credenciales antes)
-model = genai.GenerativeModel(model_name="gemini-1.5-pro")
+INSTRUCCIONES = (
+    "Eres un chef profesional. A partir de los siguientes ingredientes por franja horaria y día,"
+    "crea un menú completo diario elaborado con nombres de platos y descripciones que sea apetitoso."
+    "No añadas ningún ingrediente extra  e incluye todos los alimentos disponibles en cada franja."
+    "En la descripción indica los gramos de cada ingrediente."
+    "En la comida y la cena siempre debe haber primer plato, segundo plato y postre. "
+    "Da sugerencias de diferentes platos para cada día aunque los ingredientes sean los mismos"
+)
 
-# Función para cargar la dieta desde un archivo .txt 
-def cargar_dieta_desde_txt(ruta_txt):
+# Función para cargar la dieta guardada por los modelos
+def cargar_dieta(ruta):
     """
-    Carga una dieta semanal desde un archivo de texto con formato específico. (Facilita el análisis a la IA)
-    El archivo debe contener días, franjas horarias y alimentos con cantidades.
-    Devuelve un diccionario estructurado por día y franja horaria.
+    Carga una dieta guardada por los modelos (ver resultados.py, ruta sin extensión).
+    Devuelve un diccionario estructurado por día y franja horaria con los gramos de cada
+    alimento y el coste total.
     """
+    resultado = Resultado.cargar(ruta)
     dieta = {}
-    dia_actual = None
-    franja_actual = None
-
-    with open(ruta_txt, "r", encoding="utf-8") as f:
-        for linea in f:
-            linea = linea.strip()
-
-            # Ignora líneas vacías o de encabezado
-            if not linea or "Dieta óptima encontrada" in linea:
-                continue
-
-            # Detecta el inicio de un nuevo día
-            match_dia = re.match(r"Día:\s*(\d+)", linea)
-            if match_dia:
-                dia_actual = f"Día {match_dia.group(1)}"
-                dieta[dia_actual] = {}
-                continue
-
-            # Detecta la franja horaria (Desayuno, Comida, Merienda, Cena)
-            if linea.endswith(":") and linea[:-1] in ["Desayuno", "Comida", "Merienda", "Cena"]:
-                franja_actual = linea[:-1]
-                dieta[dia_actual][franja_actual] = {}
-                continue
-
-            # Detecta alimentos y cantidades en gramos
-            match_alimento = re.match(r"(.+?):\s*([\d.]+)\s*g", linea)
-            if match_alimento and dia_actual and franja_actual:
-                alimento = match_alimento.group(1).strip()
-                cantidad = float(match_alimento.group(2))
-                dieta[dia_actual][franja_actual][alimento] = cantidad
-                continue
-
-            # Detecta el coste total de la dieta
-            match_coste = re.match(r"Coste total:\s*([\d.]+)\s*€", linea)
-            if match_coste:
-                dieta["Coste total"] = float(match_coste.group(1))
-
+    for dia, franjas in resultado.por_dia().items():
+        dieta[f"Día {dia}"] = {franja.capitalize(): alimentos for franja, alimentos in franjas.items()}
+    if resultado.metadatos.get("coste") is not None:
+        dieta["Coste total"] = round(resultado.metadatos["coste"], 2)
     return dieta
 
+INSTRUCCIONES_COMPACTAS = (
+    "Eres un chef profesional. Crea un menú apetitoso para cada día con nombres de platos y "
+    "descripciones, usando solo y todos los alimentos de cada franja, e indica los gramos en la "
+    "descripción. En la comida y la cena: primer plato, segundo plato y postre. Varía los platos "
+    "entre días aunque se repitan los ingredientes.\n"
+    "Datos (una línea por día y franja): día|franja|alimento gramos, alimento gramos, ...\n"
+)
+
+def _bloque_franja(franja, alimentos):
+    lineas = [f"{franja}:\n"]
+    lineas.extend(f"  - {alimento}: {cantidad:.2f} g\n" for alimento, cantidad in alimentos.items())
+    lineas.append("\n")
+    return "".join(lineas)
+
 # Función para generar el prompt para Gemini
 def generar_prompt_semanal(dieta_semanal):
     """
@@ -74,48 +101,282 @@ def generar_prompt_semanal(dieta_semanal):
     El prompt solicita la creación de menús diarios con nombres de platos y descripciones,
     usando únicamente los ingredientes y cantidades especificados.
     """
-    prompt = (
-        "Eres un chef profesional. A partir de los siguientes ingredientes por franja horaria y día,"
-        "crea un menú completo diario elaborado con nombres de platos y descripciones que sea apetitoso."
-        "No añadas ningún ingrediente extra  e incluye todos los alimentos disponibles en cada franja."
-        "En la descripción indica los gramos de cada ingrediente."
-        "En la comida y la cena siempre debe haber primer plato, segundo plato y postre. "
-        "Da sugerencias de diferentes platos para cada día aunque los ingredientes sean los mismos"
-    )
+    partes = [INSTRUCCIONES]
 
     for dia, dieta_diaria in dieta_semanal.items():
         if dia == "Coste total":
             continue
-        prompt += f"--- {dia} ---\n"
-        for franja, alimentos in dieta_diaria.items():
-            prompt += f"{franja}:\n"
-            for alimento, cantidad in alimentos.items():
-                prompt += f"  - {alimento}: {cantidad:.2f} g\n"
-            prompt += "\n"
+        partes.append(f"--- {dia} ---\n")
+        partes.extend(_bloque_franja(franja, alimentos) for franja, alimentos in dieta_diaria.items())
 
     if "Coste total" in dieta_semanal:
-        prompt += f"Coste total semanal: {dieta_semanal['Coste total']} €\n"
+        partes.append(f"Coste total semanal: {dieta_semanal['Coste total']} €\n")
+
+    return "".join(partes)
+
+def generar_prompt_dia(dia, dieta_diaria):
+    """
+    Prompt con las mismas instrucciones que el semanal pero solo con los alimentos de un día.
+    """
+    partes = [INSTRUCCIONES, f"--- {dia} ---\n"]
+    partes.extend(_bloque_franja(franja, alimentos) for franja, alimentos in dieta_diaria.items())
+    return "".join(partes)
+
+def generar_prompt_franja(dia, franja, alimentos):
+    """
+    Prompt para una sola franja horaria de un día.
+    """
+    return INSTRUCCIONES + f"--- {dia} ---\n" + _bloque_franja(franja, alimentos)
+
+def estimar_tokens(texto):
+    """
+    Estimación del número de tokens de un texto (CARACTERES_POR_TOKEN caracteres por token).
+    """
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+def _fila_compacta(dia, franja, alimentos):
+    numero = dia.removeprefix("Día ")
+    comida = ", ".join(f"{alimento} {cantidad:.0f}" for alimento, cantidad in alimentos.items())
+    return f"{numero}|{franja.lower()}|{comida}\n"
+
+def _partir_franja(dia, franja, alimentos, disponible, contar):
+    """
+    Filas (fila, tokens) de una franja que no superan 'disponible' tokens: la franja entera
+    si cabe y, si no, repartida por alimentos en varias filas del mismo día y franja.
+    """
+    filas = []
+    actual = {}
+    for alimento, cantidad in alimentos.items():
+        if actual and contar(_fila_compacta(dia, franja, {**actual, alimento: cantidad})) > disponible:
+            filas.append(_fila_compacta(dia, franja, actual))
+            actual = {}
+        actual[alimento] = cantidad
+    if actual:
+        filas.append(_fila_compacta(dia, franja, actual))
+    tokens = [contar(fila) for fila in filas]
+    if max(tokens, default=0) > disponible:
+        raise ValueError(f"El presupuesto de tokens no alcanza para un solo alimento de {dia} ({franja}).")
+    return list(zip(filas, tokens))
+
+def generar_prompts_compactos(dieta, presupuesto_tokens=PRESUPUESTO_TOKENS, contar=estimar_tokens):
+    """
+    Codifica la dieta en formato tabular compacto (una línea por día y franja, gramos
+    redondeados) y la reparte en prompts de como mucho presupuesto_tokens tokens (según
+    'contar'), cada uno con las instrucciones comunes al principio. Los bloques tienen días
+    enteros; un día que no cabe solo en el presupuesto se reparte por franjas y una franja
+    que tampoco cabe, por alimentos (ValueError si no cabe ni un alimento).
+    Devuelve una lista de (título, prompt) en el orden de la dieta.
+    """
+    disponible = presupuesto_tokens - contar(INSTRUCCIONES_COMPACTAS)
+    if disponible <= 0:
+        raise ValueError(f"El presupuesto de {presupuesto_tokens} tokens no alcanza para las instrucciones.")
+
+    # Piezas indivisibles: (días, filas, tokens)
+    piezas = []
+    for dia, dieta_diaria in dieta.items():
+        if dia == "Coste total":
+            continue
+        filas = [_fila_compacta(dia, franja, alimentos) for franja, alimentos in dieta_diaria.items()]
+        tokens = [contar(fila) for fila in filas]
+        if sum(tokens) <= disponible:
+            piezas.append(([dia], filas, sum(tokens)))
+        else:
+            for franja, alimentos in dieta_diaria.items():
+                filas = _partir_franja(dia, franja, alimentos, disponible, contar)
+                piezas.extend(([dia], [fila], n) for fila, n in filas)
 
-    return prompt
+    bloques = []
+    for dias, filas, tokens in piezas:
+        if bloques and bloques[-1][2] + tokens <= disponible:
+            bloques[-1][0].extend(d for d in dias if d != bloques[-1][0][-1])
+            bloques[-1][1].extend(filas)
+            bloques[-1][2] += tokens
+        else:
+            bloques.append([list(dias), list(filas), tokens])
+
+    prompts = []
+    for dias, filas, _ in bloques:
+        titulo = dias[0] if len(dias) == 1 else f"Días {dias[0].removeprefix('Día ')} a {dias[-1].removeprefix('Día ')}"
+        prompts.append((titulo, INSTRUCCIONES_COMPACTAS + "".join(filas)))
+    return prompts
+
+def unidades(dieta, unidad="dia", presupuesto_tokens=PRESUPUESTO_TOKENS):
+    """
+    Divide la dieta en las peticiones que se van a hacer: lista de (título, prompt) en el
+    orden en que se escribirá el menú. unidad es "semana" (una sola petición, como antes),
+    "dia", "franja" o "bloque" (prompts compactos de varios días que no superan
+    presupuesto_tokens, ver generar_prompts_compactos).
+    """
+    if unidad == "semana":
+        return [("Semana", generar_prompt_semanal(dieta))]
+    if unidad == "bloque":
+        return generar_prompts_compactos(dieta, presupuesto_tokens)
+    partes = []
+    for dia, dieta_diaria in dieta.items():
+        if dia == "Coste total":
+            continue
+        if unidad == "dia":
+            partes.append((dia, generar_prompt_dia(dia, dieta_diaria)))
+        else:
+            partes.extend((f"{dia} - {franja}", generar_prompt_franja(dia, franja, alimentos))
+                          for franja, alimentos in dieta_diaria.items())
+    return partes
+
+
+class ClienteGemini:
+    """
+    Cliente asíncrono de la API de Google Gemini. configuracion son los parámetros de
+    generación (generation_config: temperature, max_output_tokens...).
+    """
+
+    def __init__(self, api_key=API_KEY, nombre_modelo=MODELO_GEMINI, configuracion=None):
+        import google.generativeai as genai
+
+        # Configurar la API de Google Gemini (asegúrate de haber configurado las credenciales antes)
+        genai.configure(api_key=api_key)
+        self.nombre = nombre_modelo
+        self.configuracion = configuracion or {}
+        self.model = genai.GenerativeModel(model_name=nombre_modelo, generation_config=configuracion)
+
+    async def generar(self, prompt):
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+
+class ClienteHTTP:
+    """
+    Cliente asíncrono de un servidor local que recibe un POST con {"prompt": ...} y responde
+    {"texto": ...}. Usa directamente los flujos de asyncio, de modo que cada petición en
+    curso no ocupa un hilo y se puede cancelar al agotar el tiempo límite.
+    """
+
+    def __init__(self, url):
+        self.nombre = url
+        self.configuracion = {}
+        partes = urlsplit(url)
+        self.host = partes.hostname
+        self.puerto = partes.port or 80
+        self.ruta = partes.path or "/generar"
+
+    async def generar(self, prompt):
+        cuerpo = json.dumps({"prompt": prompt}).encode("utf-8")
+        lector, escritor = await asyncio.open_connection(self.host, self.puerto)
+        try:
+            escritor.write(
+                f"POST {self.ruta} HTTP/1.0\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("ascii") + cuerpo)
+            await escritor.drain()
+            respuesta = await lector.read()
+        finally:
+            escritor.close()
+        cabecera, _, datos = respuesta.partition(b"\r\n\r\n")
+        codigo = int(cabecera.split(b" ", 2)[1])
+        if codigo != 200:
+            raise ConnectionError(f"El servidor respondió {codigo}: {datos.decode('utf-8', 'replace')}")
+        return json.loads(datos)["texto"]
+
+
+async def generar_menus(dieta, cliente, unidad="dia", concurrencia=7, reintentos=3, timeout=120.0,
+                        espera_base=1.0, cache=None, presupuesto_tokens=PRESUPUESTO_TOKENS):
+    """
+    Genera a la vez el menú de cada unidad (día, franja o bloque) con como mucho 'concurrencia'
+    peticiones simultáneas. Cada petición tiene un tiempo límite y, si falla, se repite
+    hasta 'reintentos' veces con espera exponencial con ruido (espera_base * 2^intento *
+    U[1, 2]); mientras se espera no se ocupa ninguna plaza de concurrencia.
+    Si se da una caché (CacheIA), las unidades que ya están en ella no se piden y las
+    respuestas nuevas se guardan.
+    Devuelve, en el orden de la dieta, una lista de diccionarios con el título, el texto
+    (None si falló), el error, el número de intentos, el tiempo de las peticiones (sin
+    contar las esperas) y si el texto viene de la caché.
+    """
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def generar(titulo, prompt):
+        menu = {"titulo": titulo, "texto": None, "error": None, "intentos": 0, "tiempo": 0.0, "cache": False}
+        if cache is not None:
+            clave = cache.clave(prompt, cliente.nombre, cliente.configuracion)
+            menu["texto"] = cache.obtener(clave)
+            if menu["texto"] is not None:
+                menu["cache"] = True
+                return menu
+        for intento in range(reintentos + 1):
+            async with semaforo:
+                menu["intentos"] += 1
+                inicio = time.perf_counter()
+                try:
+                    menu["texto"] = await asyncio.wait_for(cliente.generar(prompt), timeout)
+                    menu["error"] = None
+                except asyncio.TimeoutError:
+                    menu["error"] = f"sin respuesta en {timeout} s"
+                except Exception as e:
+                    menu["error"] = f"{type(e).__name__}: {e}"
+                menu["tiempo"] += time.perf_counter() - inicio
+            if menu["error"] is None:
+                if cache is not None:
+                    cache.guardar(clave, menu["texto"], cliente.nombre)
+                break
+            if intento < reintentos:
+                await asyncio.sleep(espera_base * 2 ** intento * (1 + random.random()))
+        return menu
+
+    return await asyncio.gather(*(generar(titulo, prompt)
+                                  for titulo, prompt in unidades(dieta, unidad, presupuesto_tokens)))
+
+def ensamblar(menus):
+    """
+    Une los menús generados en el orden de la dieta. Las unidades que no se pudieron
+    generar se indican con el error en su lugar.
+    """
+    partes = []
+    for menu in menus:
+        if menu["texto"] is not None:
+            partes.append(menu["texto"].rstrip() + "\n")
+        else:
+            partes.append(f"--- {menu['titulo']} ---\nNo se pudo generar el menú ({menu['error']}).\n")
+    return "\n".join(partes)
 
 # Función que llama a Gemini
-def generar_menu_con_gemini(dieta):
+def generar_menu_con_gemini(dieta, cliente=None, unidad="dia", cache=None, **opciones):
     """
-    Llama al modelo Gemini con el prompt generado a partir de la dieta y devuelve el menú generado.
+    Genera el menú de la dieta (por defecto con una petición concurrente por día a Gemini,
+    salvo los días que estén en la caché) y devuelve (texto, menus) con el texto completo y
+    el detalle de cada petición.
     """
-    prompt = generar_prompt_semanal(dieta)
-    response = model.generate_content(prompt)
-    return response.text
+    cliente = cliente or ClienteGemini()
+    menus = asyncio.run(generar_menus(dieta, cliente, unidad, cache=cache, **opciones))
+    return ensamblar(menus), menus
 
 # Función principal para ejecutar el script
 if __name__ == "__main__":
-    # Cargar la dieta desde el archivo .txt
-    dieta_modelo = cargar_dieta_desde_txt("Resultados/dieta_optima_Modelo3_alimentos.txt")
+    parser = argparse.ArgumentParser(description="Genera los menús de la dieta del Modelo 3 con Gemini.")
+    parser.add_argument("--dieta", default="Resultados/dieta_optima_Modelo3_alimentos")
+    parser.add_argument("--unidad", choices=UNIDADES, default="dia",
+                        help="una petición por semana, día, franja o bloque compacto de días")
+    parser.add_argument("--presupuesto", type=int, default=PRESUPUESTO_TOKENS,
+                        help="tokens máximos de cada prompt con --unidad bloque")
+    parser.add_argument("--concurrencia", type=int, default=7, help="peticiones simultáneas como máximo")
+    parser.add_argument("--reintentos", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0, help="tiempo límite de cada petición (s)")
+    parser.add_argument("--url", default=None, help="servidor local compatible en lugar de Gemini")
+    parser.add_argument("--sin-cache", action="store_true", help="pide todos los menús sin usar la caché")
+    args = parser.parse_args()
+
+    # Cargar la dieta guardada por el Modelo 3 con alimentos
+    dieta_modelo = cargar_dieta(args.dieta)
 
-    # Generar el menú con Gemini
-    menu_generado = generar_menu_con_gemini(dieta_modelo)
+    # Generar el menú con Gemini (o con el servidor local)
+    cliente = ClienteHTTP(args.url) if args.url else ClienteGemini()
+    inicio = time.perf_counter()
+    cache = None if args.sin_cache else CacheIA()
+    menu_generado, menus = generar_menu_con_gemini(dieta_modelo, cliente, args.unidad, cache,
+                                                   concurrencia=args.concurrencia, reintentos=args.reintentos,
+                                                   timeout=args.timeout, presupuesto_tokens=args.presupuesto)
+    fallidos = [m["titulo"] for m in menus if m["error"]]
+    en_cache = sum(m["cache"] for m in menus)
+    print(f"{len(menus) - en_cache} peticiones ({en_cache} menús de la caché) "
+          f"en {time.perf_counter() - inicio:.1f} s"
+          + (f"; fallidas: {', '.join(fallidos)}" if fallidos else ""))
 
     # Guardar el resultado en un archivo
     with open("Resultados/dieta_óptima_IA.txt", "w", encoding="utf-8") as f:
         f.write(menu_generado)
-
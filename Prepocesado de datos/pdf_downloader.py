@@ -5,17 +5,40 @@ Título: El problema de la dieta y su aplicación en escaladores de competición
 Autor: Ana Llorente García
 
 
-Este script 
+Este script
     1. Obtiene los enlaces de las subpáginas de productos.
     2. Extrae los enlaces de los PDFs.
     3. Descarga los PDFs.
+
+Todas las peticiones usan una misma sesión de requests, que reutiliza las conexiones, con
+un número máximo de peticiones simultáneas y un límite de peticiones por segundo a cada
+servidor.
+
+El manifiesto (PDFS_PATH/manifest.json) guarda, por cada PDF, el enlace, el ETag, la fecha
+Last-Modified, el tamaño y el hash SHA-256 del fichero descargado. En la siguiente
+ejecución se hace una petición condicional (If-None-Match / If-Modified-Since) y los PDFs
+que no han cambiado no se vuelven a descargar. Cada descarga se escribe en un fichero
+.part; si el script se interrumpe, la descarga se reanuda donde se quedó con una petición
+Range (con If-Range, para empezar de cero si el PDF ha cambiado entretanto).
+
+Uso: python pdf_downloader.py [--web URL] [--destino ./pdfs] [--trabajadores 8]
+                              [--por-segundo 5] [--forzar]
 """
 
-from time import sleep
-import random
-from bs4 import BeautifulSoup
-import requests
+import argparse
 import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter, Retry
 
 # Data incial
 DATA_PATH = "./data"
@@ -23,88 +46,303 @@ PDFS_PATH = "./pdfs"
 DOMAIN_WEB = "https://www.mapa.gob.es"
 MAIN_WEB = "https://www.mapa.gob.es/es/ministerio/servicios/informacion/plataforma-de-conocimiento-para-el-medio-rural-y-pesquero/observatorio-de-buenas-practicas/buenas-practicas-sobre-alimentacion/caract-nutricionales.aspx"
 
+MANIFEST = "manifest.json"
+WORKERS = 8            # Peticiones simultáneas
+PER_SECOND = 5.0       # Peticiones por segundo a cada servidor
+TIMEOUT = 30           # Segundos
+CHUNK_SIZE = 64 * 1024
 
-def get_urls():
+
+class RateLimiter:
+    """
+    Limita las peticiones por segundo a cada servidor (host): reparte los turnos entre los
+    hilos con una separación mínima de 1 / per_second segundos.
+    """
+
+    def __init__(self, per_second=PER_SECOND):
+        self.interval = 1 / per_second if per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_time = {}
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            turn = max(now, self.next_time.get(host, now))
+            self.next_time[host] = turn + self.interval
+        time.sleep(max(0.0, turn - now))
+
+
+def create_session(workers=WORKERS):
+    """
+    Sesión de requests con un pool de conexiones del tamaño del número de trabajadores y
+    reintentos con espera exponencial ante errores temporales del servidor.
+    """
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch(session, limiter, url, **kwargs):
+    """
+    Petición GET respetando el límite de peticiones por segundo del servidor.
+    """
+    limiter.wait(url)
+    return session.get(url, timeout=TIMEOUT, **kwargs)
+
+
+def get_urls(session, limiter, main_web=MAIN_WEB):
     """
     Extrae los enlaces de las subpáginas de productos desde la página principal.
     Guarda los enlaces en un archivo CSV y los retorna como lista.
     """
     urlLinks = []
-    response = requests.get(MAIN_WEB)
+    response = fetch(session, limiter, main_web)
     if response.status_code == 200:
         soup = BeautifulSoup(response.text, "html.parser")
         div = soup.find("div", class_="panel-info") # Extraer la etiqueta <div> que contiene el listado de links de los PDFs
         li = div.find_all("li")[:-1] # Extraer las etiquetas <li> que contienen los links de interés
-        
+
         for i in li:
-            link = DOMAIN_WEB + i.find("a")["href"] # Extraer los links de las etiquetas <a>
+            link = urljoin(main_web, i.find("a")["href"]) # Extraer los links de las etiquetas <a>
             if link not in urlLinks:
                 urlLinks.append(link)
-            
-        
-    with open("./data/urls.csv", "w", newline="") as file: # Guardar los links en un archivo CSV
+
+    os.makedirs(DATA_PATH, exist_ok=True)
+    with open(f"{DATA_PATH}/urls.csv", "w", newline="") as file: # Guardar los links en un archivo CSV
         writer = csv.writer(file)
         writer.writerow(["URL"])
         for url in urlLinks:
             writer.writerow([url])
-            
+
     return urlLinks
-    
-def get_pdfs_links(urlLinks: list):
+
+def get_pdfs_links(urlLinks: list, session, limiter, workers=WORKERS):
     """
-    Extrae los enlaces directos a los PDFs desde las subpáginas de productos.
+    Extrae los enlaces directos a los PDFs desde las subpáginas de productos (varias a la vez).
     Guarda los enlaces y nombres de los alimentos en un archivo CSV.
-    Retorna una lista de diccionarios con 'food' y 'link'.
+    Retorna una lista de diccionarios con 'food' y 'link', en el orden de las subpáginas.
     """
-    pdfLinks = []
-    for url in urlLinks:
-        response = requests.get(url)
+    def links_subpage(url):
+        links = []
+        response = fetch(session, limiter, url)
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, "html.parser")
             div = soup.find("div", class_="panel-info") # Extraer la etiqueta <div> que contiene el listado de links de los PDFs
             li = div.find_all("li") # Extraer las etiquetas <li> que contienen los links de los PDFs
-            
+
             for i in li:
-                link = DOMAIN_WEB + i.find("a")["href"]
+                link = urljoin(url, i.find("a")["href"])
                 food = i.find("a").text
-                pdfLinks.append({"food": food, "link": link})
-                
-    with open("./data/pdfLinks.csv", "w", newline="") as file: # Guardar los links en un archivo CSV
+                links.append({"food": food, "link": link})
+        return links
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pdfLinks = [pdf for links in executor.map(links_subpage, urlLinks) for pdf in links]
+
+    os.makedirs(DATA_PATH, exist_ok=True)
+    with open(f"{DATA_PATH}/pdfLinks.csv", "w", newline="") as file: # Guardar los links en un archivo CSV
         writer = csv.writer(file)
         writer.writerow(["PDF URL"])
         for pdf in pdfLinks:
             writer.writerow([pdf])
-    
+
     return pdfLinks
-            
-def download_pdfs(pdfLinks: list):
+
+
+def load_manifest(dest=PDFS_PATH):
     """
-    Descarga los archivos PDF desde los enlaces proporcionados.
-    Guarda cada PDF en la carpeta especificada con el nombre del alimento.
+    Lee el manifiesto de descargas ({enlace: entrada}); vacío si no existe.
     """
-    for pdf in pdfLinks:
-        food = pdf["food"]
-        link = pdf["link"]
-        response = requests.get(link, stream=True)
-        if response.status_code == 200:
-            with open(f"{PDFS_PATH}/{food}.pdf", "wb") as f:
-                for chunk in response.iter_content(chunk_size=1024):
-                    f.write(chunk)
-            print(f"PDF descargado correctamente como '{food}.pdf'")
+    try:
+        with open(os.path.join(dest, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, dest=PDFS_PATH):
+    """
+    Escribe el manifiesto en un fichero temporal y lo renombra, para no dejarlo a medias.
+    """
+    tmp = os.path.join(dest, f".{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, os.path.join(dest, MANIFEST))
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def download_pdf(session, limiter, pdf, entry, dest=PDFS_PATH, force=False, on_start=None):
+    """
+    Descarga un PDF y devuelve (estado, entrada del manifiesto). estado es "descargado",
+    "reanudado", "sin cambios", "incompleto" o "error <código>".
+    Si el PDF ya se descargó, se pide solo si ha cambiado (petición condicional); si hay
+    una descarga a medias (.part) de la que se conoce el ETag o la fecha, se reanuda. Si el
+    servidor responde 416 al reanudar, el .part ya estaba completo y se da por terminado
+    (o, si no coincide con el tamaño del PDF, se descarta y se descarga de cero).
+    on_start(entrada) se llama al empezar a escribir una descarga nueva, para guardar en el
+    manifiesto con qué versión del PDF se corresponde el .part.
+    """
+    food, link = pdf["food"], pdf["link"]
+    path = os.path.join(dest, pdf.get("file", f"{food}.pdf"))
+    part = path + ".part"
+    entry = dict(entry or {}, food=food, link=link, file=os.path.basename(path))
+
+    headers = {}
+    if not force and os.path.exists(path) and entry.get("sha256"):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    partial = entry.get("partial") or {}
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    validator = partial.get("etag") or partial.get("last_modified")
+    if offset and validator and not force:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    else:
+        offset = 0
+
+    with fetch(session, limiter, link, headers=headers, stream=True) as response:
+        if response.status_code == 304:
+            response.content  # Leer el cuerpo (vacío) para devolver la conexión al pool
+            if os.path.exists(part):
+                os.remove(part)
+            entry.pop("partial", None)
+            return "sin cambios", entry
+        if response.status_code == 206:
+            content_range = response.headers.get("Content-Range", "")
+            if not content_range.startswith(f"bytes {offset}-"):
+                # El servidor no continúa donde se quedó el .part: se descarta y se empieza de cero
+                response.close()
+                os.remove(part)
+                return download_pdf(session, limiter, pdf, dict(entry, partial=None), dest, force, on_start)
+            total = int(content_range.rsplit("/", 1)[1])
+            mode, status = "ab", "reanudado"
+        elif response.status_code == 416 and offset:
+            response.content
+            if response.headers.get("Content-Range") != f"bytes */{offset}":
+                # El .part no se corresponde con el PDF: se descarta y se empieza de cero
+                os.remove(part)
+                return download_pdf(session, limiter, pdf, dict(entry, partial=None), dest, force, on_start)
+            # El .part ya estaba completo (el proceso se detuvo antes de renombrarlo)
+            total, mode, status = offset, None, "reanudado"
+        elif response.status_code == 200:
+            total = int(response.headers["Content-Length"]) if "Content-Length" in response.headers else None
+            mode, status = "wb", "descargado"
+            entry["partial"] = {"etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified")}
+            if on_start is not None:
+                on_start(entry)
         else:
-            print(f"Error al descargar el PDF. Código de estado: {response.status_code}")
-        
-        
-def main():
+            return f"error {response.status_code}", entry
+
+        if mode is not None:
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+
+    size = os.path.getsize(part)
+    if total is not None and size != total:
+        return "incompleto", entry
+    os.replace(part, path)
+    validators = entry.pop("partial")
+    entry.update(etag=validators["etag"], last_modified=validators["last_modified"], size=size,
+                 sha256=_sha256(path), fetched=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    return status, entry
+
+def unique_files(pdfLinks: list):
+    """
+    Asigna a cada PDF un nombre de fichero distinto ('file'): el nombre del alimento y, si
+    ya lo usa un PDF anterior de la lista, un número entre paréntesis. Los enlaces
+    repetidos se descargan una sola vez. Así dos descargas simultáneas nunca escriben en
+    el mismo fichero.
+    """
+    pdfs, links, used = [], set(), set()
+    for pdf in pdfLinks:
+        if pdf["link"] in links:
+            continue
+        links.add(pdf["link"])
+        file, k = f"{pdf['food']}.pdf", 1
+        while file.casefold() in used:
+            k += 1
+            file = f"{pdf['food']} ({k}).pdf"
+        used.add(file.casefold())
+        pdfs.append(dict(pdf, file=file))
+    return pdfs
+
+def download_pdfs(pdfLinks: list, session=None, limiter=None, workers=WORKERS, dest=PDFS_PATH, force=False):
+    """
+    Descarga los archivos PDF desde los enlaces proporcionados, varios a la vez.
+    Guarda cada PDF en la carpeta especificada con el nombre del alimento (ver
+    unique_files) y actualiza el
+    manifiesto tras cada PDF, de modo que una ejecución interrumpida se puede continuar.
+    Devuelve el número de PDFs en cada estado.
+    """
+    session = session or create_session(workers)
+    limiter = limiter or RateLimiter()
+    os.makedirs(dest, exist_ok=True)
+    manifest = load_manifest(dest)
+    lock = threading.Lock()
+    counts = {}
+
+    def update(entry):
+        with lock:
+            manifest[entry["link"]] = entry
+            save_manifest(manifest, dest)
+
+    def download(pdf):
+        try:
+            status, entry = download_pdf(session, limiter, pdf, manifest.get(pdf["link"]), dest, force, update)
+        except (requests.RequestException, OSError) as e:
+            status, entry = f"error {type(e).__name__}", None
+        if entry is not None:
+            update(entry)
+        with lock:
+            counts[status] = counts.get(status, 0) + 1
+        if status in ("descargado", "reanudado"):
+            print(f"PDF {status} correctamente como '{pdf['file']}'")
+        elif status != "sin cambios":
+            print(f"Error al descargar '{pdf['file']}': {status}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(download, unique_files(pdfLinks)))
+    return counts
+
+
+def main(main_web=MAIN_WEB, dest=PDFS_PATH, workers=WORKERS, per_second=PER_SECOND, force=False):
     '''
     Función principal que ejecuta el flujo completo:
     1. Obtiene los enlaces de las subpáginas de productos.
     2. Extrae los enlaces de los PDFs.
     3. Descarga los PDFs.
     '''
-    urlLinks = get_urls()
-    pdfLinks = get_pdfs_links(urlLinks)
-    download_pdfs(pdfLinks)
+    session = create_session(workers)
+    limiter = RateLimiter(per_second)
+    urlLinks = get_urls(session, limiter, main_web)
+    pdfLinks = get_pdfs_links(urlLinks, session, limiter, workers)
+    counts = download_pdfs(pdfLinks, session, limiter, workers, dest, force)
+    print(", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+    return counts
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Descarga los PDFs de datos de alimentos.")
+    parser.add_argument("--web", default=MAIN_WEB, help="página principal con el listado de productos")
+    parser.add_argument("--destino", default=PDFS_PATH)
+    parser.add_argument("--trabajadores", type=int, default=WORKERS, help="peticiones simultáneas")
+    parser.add_argument("--por-segundo", type=float, default=PER_SECOND,
+                        help="peticiones por segundo a cada servidor (0 sin límite)")
+    parser.add_argument("--forzar", action="store_true", help="descarga todos los PDFs aunque no hayan cambiado")
+    args = parser.parse_args()
+
+    main(args.web, args.destino, args.trabajadores, args.por_segundo, args.forzar)
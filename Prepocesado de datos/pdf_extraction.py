@@ -6,31 +6,61 @@ Autor: Ana Llorente García
 
 
 Este script crea un archivo JSON (food_data.json) con los datos nutricionales de alimentos extraídos de PDFs.
+
+Los PDFs se reparten entre varios procesos (uno por núcleo por defecto); cada proceso
+devuelve solo las filas (nutriente, valor) de su alimento. La extracción de tablas, que es
+la parte más costosa, solo se hace en las páginas cuyo texto contiene alguno de los
+nutrientes buscados (las demás páginas no tienen la tabla nutricional).
+
+La extracción es incremental: el manifiesto (DATA_PATH/extraction_manifest.json) guarda,
+por cada PDF, el tamaño, la fecha de modificación, el hash SHA-256 del contenido y los
+datos extraídos. Al volver a ejecutar el script solo se extraen los PDFs nuevos o cuyo
+contenido ha cambiado; los eliminados se quitan de food_data.json y el resto se toma del
+manifiesto. Los cambios respecto al food_data.json anterior (alimentos nuevos, eliminados
+y valores de nutrientes cambiados) se muestran y se guardan en DATA_PATH/extraction_diff.json.
+
+Los valores de nutrientes que cambian se trasladan también a alimentos.json, pero solo
+si el valor de alimentos.json sigue siendo el extraído anteriormente (con "Tr" como "0"):
+los valores corregidos a mano no se sobrescriben y se indican como conflictos. Los
+alimentos nuevos no se añaden a alimentos.json (les faltan el precio y el máximo) y los
+eliminados no se quitan, solo se indican.
+
+Uso: python pdf_extraction.py [--pdfs ./pdfs] [--data ./data] [--alimentos ../alimentos.json]
+                              [--trabajadores N] [--sin-precomprobacion] [--completa]
 """
 
-import pdfplumber
-import pandas as pd
-from os import listdir
-import unicodedata
+import argparse
+import hashlib
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-# Rutas de los directorios donde se encuentran los archivos CSV, PDF y donde se guardarán los datos extraídos
-CSVS_PATH = "./csvs"
+# Rutas de los directorios donde se encuentran los archivos PDF y donde se guardarán los datos extraídos
 PDFS_PATH = "./pdfs"
 DATA_PATH = "./data"
+# alimentos.json de la raíz del repositorio (independiente del directorio de trabajo)
+ALIMENTOS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alimentos.json")
+
+MANIFEST = "extraction_manifest.json"
+DIFF_REPORT = "extraction_diff.json"
+
+# Versión de la extracción (cambiarla obliga a volver a extraer todos los PDFs)
+EXTRACTION_VERSION = 1
 
 # Lista de categorías de alimentos que se buscarán en los PDFs
 CATEGORIES = [
-    "Cereales y derivados", "Leche y productos lácteos", "Huevos", "Azúcares y dulces", 
-    "Aceites y grasas", "Carnes y productos cárnicos", "Pescados", "Verduras y hortalizas", 
+    "Cereales y derivados", "Leche y productos lácteos", "Huevos", "Azúcares y dulces",
+    "Aceites y grasas", "Carnes y productos cárnicos", "Pescados", "Verduras y hortalizas",
     "Frutas", "Legumbres", "Frutos secos", "Condimentos y aperitivos", "Bebidas", "Crustáceos y moluscos"
 ]
 
-# Obtiene la lista de todos los archivos PDF en el directorio especificado
-allFiles = listdir(PDFS_PATH)
+# Nutrientes que se extraen de la tabla nutricional
+NUTRIENTS = ["Energía (Kcal)", "Proteínas (g)", "Hidratos de carbono (g)", "Lípidos totales (g)"]
 
-# Diccionario final donde se almacenarán los datos extraídos de todos los alimentos
-finalJson = {}
+# Palabras que aparecen en el texto de las páginas que tienen la tabla nutricional
+TABLE_MARKERS = [nutrient.split(" ")[0] for nutrient in NUTRIENTS]
 
 def clean_text(text):
     """
@@ -44,48 +74,244 @@ def clean_text(text):
     text = text.replace("\u2013", "-")  # Reemplaza otro tipo de guion
     return text
 
-# Itera sobre cada archivo PDF encontrado en el directorio
-for doc in allFiles:
-    pdfPath = f"{PDFS_PATH}/{doc}"
+def extract_pdf(pdfPath, precheck=True):
+    """
+    Extrae la categoría y los nutrientes de un PDF. Devuelve (alimento, filas), con filas
+    una lista de [nutriente, valor por 100 g] sin repetidos (si un dato aparece varias
+    veces se queda el último, en la posición de la primera aparición).
+    Con precheck=True solo se extraen las tablas de las páginas cuyo texto contiene alguno
+    de los nutrientes buscados.
+    """
+    # Importación local: el resto del script (diferencias, alimentos.json) no necesita pdfplumber
+    import pdfplumber
 
-    nutritionalData = []
+    nutritionalData = {}
 
     # Apertura del archivo PDF y extracción de los datos
     with pdfplumber.open(pdfPath) as pdf:
-        for nPage, page in enumerate(pdf.pages):
-            # Extracción de las tablas de la página (se asume que solo hay una tabla por página)
-            tables = page.extract_tables()
+        for page in pdf.pages:
             # Extracción del texto de la página
-            text = page.extract_text()
+            text = page.extract_text() or ""
             # Busca la categoría del alimento en el texto de la página
             for word in CATEGORIES:
                 if word.title() in text.title():
-                    nutritionalData.append(["Categoría", word])
+                    nutritionalData["Categoría"] = word
                     break
-            # Procesa cada tabla encontrada en la página
-            for table in tables:
+            # Comprobación rápida: las páginas sin ningún nutriente no tienen la tabla
+            if precheck and not any(marker in text for marker in TABLE_MARKERS):
+                continue
+            # Extracción de las tablas de la página y procesado de cada tabla encontrada
+            for table in page.extract_tables():
                 for row in table:
                     # Filtra filas con al menos dos columnas y datos válidos
                     if row and len(row) >= 2 and row[0] is not None and row[1] is not None:
                         nutrient = clean_text(row[0])
-                        value100g = clean_text(row[1])
-                        value100g = str(value100g).replace(",", ".")
                         # Solo extrae los nutrientes de interés
-                        if nutrient in ["Energía (Kcal)", "Proteínas (g)", "Hidratos de carbono (g)", "Lípidos totales (g)"]:
-                            nutritionalData.append([nutrient, value100g])
-
-    # Crea un DataFrame con los datos nutricionales extraídos
-    df = pd.DataFrame(nutritionalData, columns=["Nutriente", "Valor por 100g"])
-
-    # Extrae el nombre del alimento a partir del nombre del archivo PDF
-    foodName = doc.split('.')[0]  # Se toma el nombre del archivo como nombre del alimento
-    
-    # Crea un diccionario con los nutrientes de este alimento
-    nutrientsDic = dict(zip(df['Nutriente'], df['Valor por 100g']))
-    
-    # Añade el alimento y sus nutrientes al diccionario principal
-    finalJson[foodName] = nutrientsDic
-
-# Guarda el diccionario final en un archivo JSON codificado en ISO-8859-1
-with open(f"{DATA_PATH}/food_data.json", "w", encoding="ISO-8859-1") as f:
-    json.dump(finalJson, f, ensure_ascii=False, indent
\ No newline at end of file
+                        if nutrient in NUTRIENTS:
+                            nutritionalData[nutrient] = clean_text(row[1]).replace(",", ".")
+
+    # Se toma el nombre del archivo como nombre del alimento
+    foodName = os.path.basename(pdfPath).split('.')[0]
+    return foodName, [[nutrient, value] for nutrient, value in nutritionalData.items()]
+
+def extract_all(pdfsPath=PDFS_PATH, workers=None, precheck=True, files=None):
+    """
+    Extrae los datos de todos los PDFs del directorio (o de la lista 'files') repartiéndolos
+    entre 'workers' procesos (todos los núcleos por defecto; con workers=1 se extraen en
+    este proceso). Devuelve el diccionario {alimento: {nutriente: valor}} en el orden de
+    los ficheros.
+    """
+    files = files if files is not None else sorted(f for f in os.listdir(pdfsPath) if f.lower().endswith(".pdf"))
+    paths = [os.path.join(pdfsPath, doc) for doc in files]
+    extract = partial(extract_pdf, precheck=precheck)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = map(extract, paths)
+        return {foodName: dict(nutrients) for foodName, nutrients in rows}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = executor.map(extract, paths, chunksize=max(1, len(paths) // (4 * workers)))
+        return {foodName: dict(nutrients) for foodName, nutrients in rows}
+
+def save_json(finalJson, dataPath=DATA_PATH):
+    """
+    Guarda el diccionario final en un archivo JSON codificado en ISO-8859-1.
+    """
+    os.makedirs(dataPath, exist_ok=True)
+    with open(f"{dataPath}/food_data.json", "w", encoding="ISO-8859-1") as f:
+        json.dump(finalJson, f, ensure_ascii=False, indent=4)
+
+def file_hash(path):
+    """
+    Hash SHA-256 del contenido de un fichero.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_json(path, encoding="utf-8"):
+    """
+    Lee un JSON; diccionario vacío si no existe o no se puede leer.
+    """
+    try:
+        with open(path, "r", encoding=encoding) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, dataPath=DATA_PATH):
+    """
+    Escribe el manifiesto en un fichero temporal y lo renombra, para no dejarlo a medias.
+    """
+    tmp = os.path.join(dataPath, f".{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, os.path.join(dataPath, MANIFEST))
+
+def diff_records(before, after):
+    """
+    Diferencias entre dos versiones de food_data.json: alimentos nuevos, eliminados y
+    valores cambiados ({"alimento", "nutriente", "antes", "despues"}).
+    """
+    changes = []
+    for foodName, nutrients in after.items():
+        previous = before.get(foodName)
+        if previous is None:
+            continue
+        for nutrient in dict.fromkeys(list(previous) + list(nutrients)):
+            if previous.get(nutrient) != nutrients.get(nutrient):
+                changes.append({"alimento": foodName, "nutriente": nutrient,
+                                "antes": previous.get(nutrient), "despues": nutrients.get(nutrient)})
+    return {
+        "nuevos": [foodName for foodName in after if foodName not in before],
+        "eliminados": [foodName for foodName in before if foodName not in after],
+        "cambios": changes,
+    }
+
+def _curated(value):
+    """
+    Valor de un nutriente extraído tal y como se escribe en alimentos.json ("Tr" es 0).
+    """
+    return "0" if value == "Tr" else value
+
+def merge_alimentos(changes, alimentosPath=ALIMENTOS_PATH):
+    """
+    Traslada a alimentos.json los valores de nutrientes cambiados cuyo valor en
+    alimentos.json es todavía el extraído anteriormente. Los valores se sustituyen en el
+    texto del fichero, para no alterar su formato. Devuelve (actualizados, conflictos).
+    """
+    if not os.path.exists(alimentosPath):
+        print(f"Aviso: no existe '{alimentosPath}'; los cambios no se trasladan a alimentos.json")
+        return [], []
+    with open(alimentosPath, "r", encoding="utf-8") as f:
+        text = f.read()
+    alimentos = json.loads(text)
+    updated, conflicts = [], []
+    for change in changes:
+        foodName, nutrient = change["alimento"], change["nutriente"]
+        if nutrient not in NUTRIENTS or foodName not in alimentos or change["despues"] is None:
+            continue
+        current = alimentos[foodName].get(nutrient)
+        if current == _curated(change["despues"]):
+            continue
+        if current != _curated(change["antes"]):
+            conflicts.append(dict(change, alimentos=current))
+            continue
+        # Sustitución dentro del bloque del alimento (si el bloque tiene otro formato, se
+        # escribe el fichero completo al final)
+        try:
+            start = text.index(json.dumps(foodName, ensure_ascii=False) + ": {")
+            end = text.index("}", start)
+        except ValueError:
+            pass
+        else:
+            key = json.dumps(nutrient, ensure_ascii=False)
+            old = f"{key}: {json.dumps(current, ensure_ascii=False)}"
+            new = f"{key}: {json.dumps(_curated(change['despues']), ensure_ascii=False)}"
+            text = text[:start] + text[start:end].replace(old, new) + text[end:]
+        alimentos[foodName][nutrient] = _curated(change["despues"])
+        updated.append(change)
+    if updated:
+        with open(alimentosPath, "w", encoding="utf-8") as f:
+            if json.loads(text) == alimentos:
+                f.write(text)
+            else:
+                # No se pudo sustituir en el texto: se escribe el fichero completo
+                json.dump(alimentos, f, ensure_ascii=False, indent=4)
+    return updated, conflicts
+
+def update_all(pdfsPath=PDFS_PATH, dataPath=DATA_PATH, alimentosPath=ALIMENTOS_PATH, workers=None, precheck=True,
+               full=False):
+    """
+    Actualiza food_data.json extrayendo solo los PDFs nuevos o cambiados (todos con
+    full=True), traslada los cambios a alimentos.json y guarda el informe de diferencias.
+    Un PDF se da por no cambiado si su tamaño y su fecha coinciden con los del manifiesto
+    o, si no, si coincide el hash de su contenido. Devuelve el informe.
+    """
+    os.makedirs(dataPath, exist_ok=True)
+    manifest = load_json(os.path.join(dataPath, MANIFEST))
+    known = manifest.get("files", {}) if manifest.get("version") == EXTRACTION_VERSION and not full else {}
+    previous = load_json(f"{dataPath}/food_data.json", encoding="ISO-8859-1")
+
+    files = sorted(f for f in os.listdir(pdfsPath) if f.lower().endswith(".pdf"))
+    entries, pending = {}, []
+    for doc in files:
+        info = os.stat(os.path.join(pdfsPath, doc))
+        entry = known.get(doc)
+        if entry and entry["size"] == info.st_size and entry["mtime_ns"] == info.st_mtime_ns:
+            entries[doc] = entry
+            continue
+        digest = file_hash(os.path.join(pdfsPath, doc))
+        if entry and entry["sha256"] == digest:
+            entries[doc] = dict(entry, mtime_ns=info.st_mtime_ns)
+            continue
+        entries[doc] = {"sha256": digest, "size": info.st_size, "mtime_ns": info.st_mtime_ns}
+        pending.append(doc)
+
+    if pending:
+        # Con pocos PDFs no compensa arrancar más procesos que PDFs
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        extracted = extract_all(pdfsPath, workers, precheck, pending)
+        for doc in pending:
+            foodName = os.path.basename(doc).split('.')[0]
+            entries[doc].update(food=foodName, record=extracted[foodName])
+
+    finalJson = {entries[doc]["food"]: entries[doc]["record"] for doc in files}
+    report = diff_records(previous, finalJson)
+    report["extraidos"] = pending
+    report["sin_cambios"] = len(files) - len(pending)
+    report["alimentos_actualizados"], report["conflictos"] = merge_alimentos(report["cambios"], alimentosPath)
+
+    save_json(finalJson, dataPath)
+    save_manifest({"version": EXTRACTION_VERSION, "files": entries}, dataPath)
+    with open(os.path.join(dataPath, DIFF_REPORT), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrae los datos nutricionales de los PDFs de alimentos.")
+    parser.add_argument("--pdfs", default=PDFS_PATH)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--alimentos", default=ALIMENTOS_PATH, help="alimentos.json al que se trasladan los cambios")
+    parser.add_argument("--trabajadores", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--sin-precomprobacion", action="store_true",
+                        help="extrae las tablas de todas las páginas, aunque no tengan nutrientes")
+    parser.add_argument("--completa", action="store_true", help="vuelve a extraer todos los PDFs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = update_all(args.pdfs, args.data, args.alimentos, args.trabajadores, not args.sin_precomprobacion,
+                        args.completa)
+    print(f"{len(report['extraidos'])} PDFs extraídos, {report['sin_cambios']} sin cambios "
+          f"({time.perf_counter() - start:.2f} s)")
+    print(f"Alimentos nuevos: {', '.join(report['nuevos']) or '-'}")
+    print(f"Alimentos eliminados: {', '.join(report['eliminados']) or '-'}")
+    print(f"Valores cambiados: {len(report['cambios'])}")
+    for change in report["cambios"]:
+        print(f"    {change['alimento']:<30}{change['nutriente']:<26}{str(change['antes']):>8} -> {change['despues']}")
+    print(f"Actualizados en '{args.alimentos}': {len(report['alimentos_actualizados'])}")
+    for change in report["conflictos"]:
+        print(f"    Conflicto: {change['alimento']}, {change['nutriente']} = {change['alimentos']} en alimentos.json "
+              f"(extraído {change['antes']} -> {change['despues']})")
+    print(f"Informe guardado en '{args.data}/{DIFF_REPORT}'")
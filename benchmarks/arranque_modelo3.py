@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara la resolución del Modelo 3 con alimentos sin solución inicial y con
+una solución inicial (MIP start) construida a partir del plan del Modelo 2 o de un
+resultado semanal anterior.
+
+Para cada caso muestra el tiempo hasta la primera solución entera, el tiempo hasta
+alcanzar el MIPGap de 0.028 y el coste obtenido.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.arranque_modelo3 --arranque modelo2
+"""
+
+import argparse
+
+import Modelo3_alimentos as m3
+
+
+def ejecutar(plan=None, desplazamiento=0, limite=None):
+    """
+    Construye y resuelve el modelo, con solución inicial si se indica un plan.
+    """
+    model, variables = m3.construir_modelo_matricial()
+    model.setParam("OutputFlag", 0)
+    if limite is not None:
+        model.setParam("TimeLimit", limite)
+    if plan is not None:
+        cantidades, completos = m3.repartir_arranque(plan, m3.dias, desplazamiento)
+        m3.fijar_arranque(model, variables, cantidades, completos)
+    primera, total = m3.resolver(model)
+    return {
+        "primera_solucion_s": primera,
+        "total_s": total,
+        "coste": model.ObjVal if model.SolCount > 0 else None,
+        "gap": model.MIPGap if model.SolCount > 0 else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modelo 3 con y sin solución inicial.")
+    parser.add_argument("--arranque", choices=["modelo2", "anterior"], default="modelo2")
+    parser.add_argument("--desplazamiento", type=int, default=0)
+    parser.add_argument("--limite", type=float, default=None, help="límite de tiempo de cada resolución (s)")
+    args = parser.parse_args()
+
+    plan = m3.plan_modelo2() if args.arranque == "modelo2" else m3.leer_resultados()
+    resultados = {
+        "sin arranque": ejecutar(limite=args.limite),
+        f"arranque {args.arranque}": ejecutar(plan, args.desplazamiento, args.limite),
+    }
+
+    print(f"\n{'Caso':<22}{'1ª solución (s)':>17}{'Total (s)':>11}{'Coste (€)':>11}{'Gap':>8}")
+    for caso, r in resultados.items():
+        primera = f"{r['primera_solucion_s']:.2f}" if r["primera_solucion_s"] is not None else "-"
+        coste = f"{r['coste']:.2f}" if r["coste"] is not None else "-"
+        gap = f"{r['gap']:.2%}" if r["gap"] is not None else "-"
+        print(f"{caso:<22}{primera:>17}{r['total_s']:>11.2f}{coste:>11}{gap:>8}")
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara los dos constructores del Modelo 3 con alimentos: el original
+(variable a variable con gp.quicksum) y el matricial (MVar y addMConstr).
+
+Para cada constructor mide, en un proceso independiente, el tiempo de construcción y
+el pico de memoria, y después comprueba que ambos modelos son idénticos (mismas
+variables, mismo objetivo y mismo conjunto de restricciones).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.constructores_modelo3
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+CONSTRUCTORES = ["construir_modelo", "construir_modelo_matricial"]
+
+
+def forma_canonica(model):
+    """
+    Devuelve una representación del modelo independiente del orden de las filas:
+    datos de las variables y la lista ordenada de restricciones (coeficientes, sentido, rhs).
+    """
+    model.update()
+    A = model.getA().tocsr()
+    A.sort_indices()
+    sentidos = model.getAttr("Sense", model.getConstrs())
+    rhs = model.getAttr("RHS", model.getConstrs())
+    filas = []
+    for k in range(A.shape[0]):
+        inicio, fin = A.indptr[k], A.indptr[k + 1]
+        filas.append((tuple(A.indices[inicio:fin].tolist()), tuple(A.data[inicio:fin].tolist()), sentidos[k], rhs[k]))
+    filas.sort()
+    variables = {
+        atributo: np.array(model.getAttr(atributo, model.getVars()))
+        for atributo in ["LB", "UB", "Obj", "VType"]
+    }
+    return variables, filas, model.ModelSense
+
+
+def medir(nombre):
+    """
+    Construye el modelo con el constructor indicado y devuelve tiempo y memoria.
+    El tiempo se mide sin tracemalloc activo (que ralentiza la construcción); el pico de
+    memoria de Python se mide en una segunda construcción.
+    """
+    import Modelo3_alimentos
+
+    constructor = getattr(Modelo3_alimentos, nombre)
+    inicio = time.perf_counter()
+    model, _ = constructor()
+    model.update()
+    tiempo = time.perf_counter() - inicio
+    pico_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    constructor()[0].update()
+    _, pico_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "constructor": nombre,
+        "tiempo_s": round(tiempo, 4),
+        "pico_python_mb": round(pico_python / 2**20, 2),
+        "pico_rss_mb": round(pico_rss / 1024, 2),
+        "variables": model.NumVars,
+        "restricciones": model.NumConstrs,
+        "no_ceros": model.NumNZs,
+    }
+
+
+def comparar():
+    """
+    Comprueba que los dos constructores generan el mismo modelo.
+    """
+    import Modelo3_alimentos
+
+    canonicas = [forma_canonica(getattr(Modelo3_alimentos, nombre)()[0]) for nombre in CONSTRUCTORES]
+    (var_a, filas_a, sentido_a), (var_b, filas_b, sentido_b) = canonicas
+    iguales = sentido_a == sentido_b and filas_a == filas_b
+    iguales = iguales and all(np.array_equal(var_a[k], var_b[k]) for k in var_a)
+    return iguales
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Modo interno: medir un único constructor en este proceso
+        print(json.dumps(medir(sys.argv[1])))
+        sys.exit(0)
+
+    resultados = []
+    for nombre in CONSTRUCTORES:
+        salida = subprocess.run([sys.executable, "-m", "benchmarks.constructores_modelo3", nombre],
+                                capture_output=True, text=True, check=True).stdout
+        resultados.append(json.loads(salida.strip().splitlines()[-1]))
+
+    print(f"{'Constructor':<28}{'Tiempo (s)':>12}{'Pico Python (MB)':>18}{'Pico RSS (MB)':>15}"
+          f"{'Variables':>11}{'Restricciones':>15}{'No ceros':>10}")
+    for r in resultados:
+        print(f"{r['constructor']:<28}{r['tiempo_s']:>12.3f}{r['pico_python_mb']:>18.2f}{r['pico_rss_mb']:>15.2f}"
+              f"{r['variables']:>11}{r['restricciones']:>15}{r['no_ceros']:>10}")
+
+    print("\nModelos idénticos:", "sí" if comparar() else "NO")
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara la descarga de los PDFs de datos de alimentos en serie, como la hacía
+pdf_downloader.py (una conexión nueva por petición), con la descarga actual (sesión con
+conexiones reutilizadas, peticiones simultáneas, peticiones condicionales y reanudación).
+
+En lugar de la web del ministerio se usa un servidor local (ServidorPdfs) con la misma
+estructura de páginas: una página principal con el listado de subpáginas de productos
+(div.panel-info, con un último enlace que no es de productos), subpáginas con los enlaces
+a los PDFs y los PDFs de la carpeta 'pdfs datos de alimentos', con ETag, Last-Modified,
+peticiones condicionales, Range/If-Range (416 si el rango empieza al final del PDF) y una
+latencia simulada por petición. Con cortar=True envía solo la mitad de cada PDF la primera
+vez, para simular interrupciones.
+
+Fases:
+    - original:     descarga en serie con requests.get, como el script inicial,
+    - concurrente:  descarga actual en una carpeta vacía,
+    - repetida:     segunda ejecución, con todos los PDFs sin cambios (304),
+    - interrumpida: descarga actual con el servidor cortando cada PDF a la mitad,
+    - reanudada:    ejecución siguiente, que continúa los .part con Range (206).
+Para cada fase se muestran el tiempo, las peticiones, las conexiones abiertas, las
+respuestas 200, 206 y 304 y los MB enviados por el servidor.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.descarga_pdfs --latencia 0.02 --trabajadores 8
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Prepocesado de datos"))
+import pdf_downloader  # noqa: E402
+
+PDFS_DIR = "pdfs datos de alimentos"
+PDFS_POR_PAGINA = 20
+
+
+class ServidorPdfs:
+    """
+    Servidor HTTP local con la estructura de páginas de la web de datos de alimentos.
+    """
+
+    def __init__(self, directorio=PDFS_DIR, latencia=0.02, cortar=False):
+        self.directorio = directorio
+        self.latencia = latencia
+        self.cortar = cortar
+        self.cortados = set()
+        self.nombres = sorted(f[:-4] for f in os.listdir(directorio) if f.endswith(".pdf"))
+        self.paginas = [self.nombres[k:k + PDFS_POR_PAGINA] for k in range(0, len(self.nombres), PDFS_POR_PAGINA)]
+        self.cerrojo = threading.Lock()
+        self.reiniciar()
+        servicio = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                servicio._contar("conexiones")
+
+            def do_GET(self):
+                time.sleep(servicio.latencia)
+                servicio._contar("peticiones")
+                ruta = unquote(self.path)
+                if ruta == "/index.aspx":
+                    enlaces = [(f"/productos/{k}.aspx", f"Productos {k}") for k in range(len(servicio.paginas))]
+                    self._html(enlaces + [("/index.aspx", "Volver")])
+                elif ruta.startswith("/productos/"):
+                    k = int(ruta[len("/productos/"):-len(".aspx")])
+                    self._html([(f"/pdfs/{quote(nombre)}.pdf", nombre) for nombre in servicio.paginas[k]])
+                elif ruta.startswith("/pdfs/") and ruta[len("/pdfs/"):-4] in servicio.nombres:
+                    self._pdf(ruta[len("/pdfs/"):-4])
+                else:
+                    self._responder(404, b"")
+
+            def _html(self, enlaces):
+                elementos = "".join(f'<li><a href="{href}">{html.escape(texto)}</a></li>' for href, texto in enlaces)
+                cuerpo = f'<html><body><div class="panel-info"><ul>{elementos}</ul></div></body></html>'
+                self._responder(200, cuerpo.encode("utf-8"), {"Content-Type": "text/html; charset=utf-8"})
+
+            def _pdf(self, nombre):
+                ruta = os.path.join(servicio.directorio, nombre + ".pdf")
+                estado = os.stat(ruta)
+                etag = '"' + hashlib.sha1(f"{estado.st_size}-{estado.st_mtime_ns}".encode()).hexdigest() + '"'
+                fecha = formatdate(int(estado.st_mtime), usegmt=True)
+                cabeceras = {"ETag": etag, "Last-Modified": fecha, "Accept-Ranges": "bytes",
+                             "Content-Type": "application/pdf"}
+                if "If-None-Match" in self.headers:
+                    if self.headers["If-None-Match"] == etag:
+                        return self._responder(304, b"", cabeceras)
+                elif "If-Modified-Since" in self.headers:
+                    if parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp() >= int(estado.st_mtime):
+                        return self._responder(304, b"", cabeceras)
+                with open(ruta, "rb") as f:
+                    datos = f.read()
+                rango = self.headers.get("Range", "")
+                if rango.startswith("bytes=") and self.headers.get("If-Range") in (etag, fecha):
+                    inicio = int(rango[len("bytes="):].split("-")[0])
+                    if inicio >= len(datos):
+                        cabeceras["Content-Range"] = f"bytes */{len(datos)}"
+                        return self._responder(416, b"", cabeceras)
+                    cabeceras["Content-Range"] = f"bytes {inicio}-{len(datos) - 1}/{len(datos)}"
+                    return self._responder(206, datos[inicio:], cabeceras)
+                with servicio.cerrojo:
+                    cortar = servicio.cortar and nombre not in servicio.cortados
+                    servicio.cortados.add(nombre)
+                if cortar:
+                    # Anuncia el PDF entero pero envía solo la mitad y cierra la conexión
+                    self._responder(200, datos[:len(datos) // 2], cabeceras, longitud=len(datos))
+                    self.close_connection = True
+                    return
+                self._responder(200, datos, cabeceras)
+
+            def _responder(self, codigo, cuerpo, cabeceras=None, longitud=None):
+                servicio._contar(codigo)
+                servicio._contar("bytes", len(cuerpo))
+                self.send_response(codigo)
+                for clave, valor in (cabeceras or {}).items():
+                    self.send_header(clave, valor)
+                self.send_header("Content-Length", str(len(cuerpo) if longitud is None else longitud))
+                self.end_headers()
+                try:
+                    self.wfile.write(cuerpo)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self.servidor.daemon_threads = True
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.web = f"http://127.0.0.1:{self.servidor.server_address[1]}/index.aspx"
+
+    def _contar(self, campo, n=1):
+        with self.cerrojo:
+            self.contadores[campo] = self.contadores.get(campo, 0) + n
+
+    def reiniciar(self):
+        self.contadores = {}
+
+    def cerrar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+def descarga_original(web, destino):
+    """
+    Descarga en serie con requests.get (una conexión por petición), como el script inicial.
+    """
+    respuesta = requests.get(web)
+    soup = BeautifulSoup(respuesta.text, "html.parser")
+    subpaginas = [requests.compat.urljoin(web, li.find("a")["href"])
+                  for li in soup.find("div", class_="panel-info").find_all("li")[:-1]]
+    pdfs = []
+    for url in subpaginas:
+        soup = BeautifulSoup(requests.get(url).text, "html.parser")
+        pdfs.extend((li.find("a").text, requests.compat.urljoin(url, li.find("a")["href"]))
+                    for li in soup.find("div", class_="panel-info").find_all("li"))
+    for nombre, enlace in pdfs:
+        respuesta = requests.get(enlace, stream=True)
+        with open(os.path.join(destino, f"{nombre}.pdf"), "wb") as f:
+            for chunk in respuesta.iter_content(chunk_size=1024):
+                f.write(chunk)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Descarga de PDFs: en serie frente a concurrente y reanudable.")
+    parser.add_argument("--latencia", type=float, default=0.02, help="latencia simulada de cada petición (s)")
+    parser.add_argument("--trabajadores", type=int, default=pdf_downloader.WORKERS)
+    parser.add_argument("--por-segundo", type=float, default=0, help="peticiones por segundo (0 sin límite)")
+    args = parser.parse_args()
+
+    servidor = ServidorPdfs(latencia=args.latencia)
+    servidor_cortes = ServidorPdfs(latencia=args.latencia, cortar=True)
+    temporal = tempfile.TemporaryDirectory()
+    pdf_downloader.DATA_PATH = os.path.join(temporal.name, "data")
+    destino = os.path.join(temporal.name, "pdfs")
+    destino_cortes = os.path.join(temporal.name, "pdfs_cortes")
+    os.makedirs(os.path.join(temporal.name, "original"))
+
+    def descarga_actual(servidor, destino):
+        return lambda: pdf_downloader.main(servidor.web, destino, args.trabajadores, args.por_segundo)
+
+    fases = [
+        ("original", servidor, lambda: descarga_original(servidor.web, os.path.join(temporal.name, "original"))),
+        ("concurrente", servidor, descarga_actual(servidor, destino)),
+        ("repetida", servidor, descarga_actual(servidor, destino)),
+        ("interrumpida", servidor_cortes, descarga_actual(servidor_cortes, destino_cortes)),
+        ("reanudada", servidor_cortes, descarga_actual(servidor_cortes, destino_cortes)),
+    ]
+    medidas = []
+    for nombre, servidor_fase, descarga in fases:
+        servidor_fase.reiniciar()
+        inicio = time.perf_counter()
+        descarga()
+        medidas.append((nombre, time.perf_counter() - inicio, dict(servidor_fase.contadores)))
+
+    print(f"\n{'Fase':<14}{'Tiempo (s)':>11}{'Peticiones':>12}{'Conexiones':>12}{'200':>6}{'206':>6}{'304':>6}"
+          f"{'MB':>9}")
+    for nombre, tiempo, c in medidas:
+        print(f"{nombre:<14}{tiempo:>11.2f}{c.get('peticiones', 0):>12}{c.get('conexiones', 0):>12}"
+              f"{c.get(200, 0):>6}{c.get(206, 0):>6}{c.get(304, 0):>6}{c.get('bytes', 0) / 2**20:>9.1f}")
+    servidor.cerrar()
+    servidor_cortes.cerrar()
+    temporal.cleanup()
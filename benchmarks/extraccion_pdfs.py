@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara la extracción de los datos nutricionales de los PDFs de alimentos
+(pdf_extraction.py) como se hacía inicialmente (un solo proceso, tablas y texto de todas
+las páginas) con la extracción actual y sus dos mejoras por separado:
+    - original:          1 proceso, sin comprobación previa,
+    - precomprobacion:   1 proceso, tablas solo en las páginas con nutrientes,
+    - procesos:          un proceso por núcleo, sin comprobación previa,
+    - actual:            un proceso por núcleo y comprobación previa.
+
+Cada configuración se ejecuta en un proceso independiente. Se muestran el tiempo, los
+PDFs por segundo, la aceleración respecto a la original, si el resultado coincide con el
+de la original y cuántos alimentos coinciden con el food_data.json guardado.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.extraccion_pdfs --pdfs "pdfs datos de alimentos" --trabajadores 8 --limite 229
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Prepocesado de datos")
+sys.path.insert(0, DIRECTORIO)
+
+# (nombre, varios procesos, comprobación previa)
+CONFIGURACIONES = [
+    ("original", False, False),
+    ("precomprobacion", False, True),
+    ("procesos", True, False),
+    ("actual", True, True),
+]
+
+
+def medir(pdfs, ficheros, trabajadores, precomprobacion):
+    """
+    Extrae los PDFs indicados y devuelve el tiempo y el resultado.
+    """
+    import pdf_extraction
+
+    inicio = time.perf_counter()
+    resultado = pdf_extraction.extract_all(pdfs, trabajadores, precomprobacion, ficheros)
+    return {"tiempo": time.perf_counter() - inicio, "resultado": resultado}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extracción de los PDFs: en serie frente a en paralelo.")
+    parser.add_argument("--pdfs", default="pdfs datos de alimentos")
+    parser.add_argument("--trabajadores", type=int, default=os.cpu_count())
+    parser.add_argument("--limite", type=int, default=None, help="número de PDFs (por defecto, todos)")
+    parser.add_argument("--interno", choices=[nombre for nombre, _, _ in CONFIGURACIONES], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    ficheros = sorted(f for f in os.listdir(args.pdfs) if f.lower().endswith(".pdf"))[:args.limite]
+
+    if args.interno:
+        # Modo interno: una única medida en este proceso
+        _, varios, precomprobacion = next(c for c in CONFIGURACIONES if c[0] == args.interno)
+        print(json.dumps(medir(args.pdfs, ficheros, args.trabajadores if varios else 1, precomprobacion),
+                         ensure_ascii=False))
+        sys.exit(0)
+
+    with open(os.path.join(DIRECTORIO, "food_data.json"), "r", encoding="ISO-8859-1") as f:
+        guardado = json.load(f)
+
+    print(f"{len(ficheros)} PDFs, {args.trabajadores} procesos\n")
+    print(f"{'Configuración':<17}{'Tiempo (s)':>11}{'PDFs/s':>9}{'Aceleración':>13}{'= original':>12}"
+          f"{'= food_data.json':>18}")
+    base = None
+    for nombre, _, _ in CONFIGURACIONES:
+        salida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.extraccion_pdfs", "--interno", nombre, "--pdfs", args.pdfs,
+             "--trabajadores", str(args.trabajadores)] + (["--limite", str(args.limite)] if args.limite else []),
+            capture_output=True, text=True, check=True).stdout
+        r = json.loads(salida.strip().splitlines()[-1])
+        base = base or r
+        coinciden = sum(guardado.get(alimento) == datos for alimento, datos in r["resultado"].items())
+        print(f"{nombre:<17}{r['tiempo']:>11.2f}{len(ficheros) / r['tiempo']:>9.1f}"
+              f"{base['tiempo'] / r['tiempo']:>12.2f}x{'sí' if r['resultado'] == base['resultado'] else 'no':>12}"
+              f"{coinciden:>11}/{len(r['resultado'])}")
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script mide cómo escalan los modelos semanales con el número de días del horizonte.
+
+Para cada horizonte (por defecto 7, 14, 28 y 56 días) construye y resuelve el modelo en un
+proceso independiente y muestra el tiempo de construcción, el pico de memoria, el tamaño
+del modelo y el tiempo de resolución (con un límite de tiempo configurable).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.horizonte --modelo alimentos --dias 7 14 28 56 --limite 600
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import gurobipy as gp
+
+from horizonte import generar_dias
+
+
+def medir(modelo, n_dias, limite):
+    """
+    Construye y resuelve el modelo indicado para n_dias días y devuelve las medidas.
+    """
+    if modelo == "alimentos":
+        import Modelo3_alimentos
+        constructor = Modelo3_alimentos.construir_modelo_matricial
+    else:
+        import Modelo3_recetas
+        constructor = Modelo3_recetas.construir_modelo
+
+    inicio = time.perf_counter()
+    model, _ = constructor(generar_dias(n_dias))
+    model.update()
+    construccion = time.perf_counter() - inicio
+    resultado = {
+        "modelo": modelo,
+        "dias": n_dias,
+        "construccion_s": round(construccion, 3),
+        "pico_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "variables": model.NumVars,
+        "restricciones": model.NumConstrs,
+        "no_ceros": model.NumNZs,
+    }
+
+    model.setParam("OutputFlag", 0)
+    model.setParam("TimeLimit", limite)
+    try:
+        inicio = time.perf_counter()
+        model.optimize()
+        resultado["resolucion_s"] = round(time.perf_counter() - inicio, 3)
+        resultado["estado"] = model.Status
+        if model.SolCount > 0:
+            resultado["objetivo"] = round(model.ObjVal, 2)
+            resultado["gap"] = round(model.MIPGap, 4)
+    except gp.GurobiError as e:
+        resultado["error"] = str(e)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escalado de los modelos semanales con el horizonte.")
+    parser.add_argument("--modelo", choices=["alimentos", "recetas"], default="alimentos")
+    parser.add_argument("--dias", type=int, nargs="+", default=[7, 14, 28, 56])
+    parser.add_argument("--limite", type=float, default=600, help="límite de tiempo de resolución (s)")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        # Modo interno: una única medida en este proceso
+        print(json.dumps(medir(args.modelo, args.dias[0], args.limite)))
+        sys.exit(0)
+
+    print(f"{'Días':>5}{'Constr. (s)':>13}{'RSS (MB)':>10}{'Variables':>11}{'Restricc.':>11}"
+          f"{'No ceros':>10}{'Resol. (s)':>12}{'Objetivo':>10}{'Gap':>8}")
+    for n_dias in args.dias:
+        salida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.horizonte", "--interno", "--modelo", args.modelo,
+             "--dias", str(n_dias), "--limite", str(args.limite)],
+            capture_output=True, text=True, check=True).stdout
+        r = json.loads(salida.strip().splitlines()[-1])
+        if "error" in r:
+            resolucion = objetivo = gap = "-"
+        else:
+            resolucion = f"{r['resolucion_s']:.2f}"
+            objetivo = f"{r['objetivo']:.2f}" if "objetivo" in r else "-"
+            gap = f"{r['gap']:.2%}" if "gap" in r else "-"
+        print(f"{r['dias']:>5}{r['construccion_s']:>13.3f}{r['pico_rss_mb']:>10.1f}{r['variables']:>11}"
+              f"{r['restricciones']:>11}{r['no_ceros']:>10}{resolucion:>12}{objetivo:>10}{gap:>8}")
+        if "error" in r:
+            print(f"      Error al resolver: {r['error']}")
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara la generación de menús de ModeloIA con una única petición semanal y
+con peticiones por día, por franja o por bloques compactos, secuenciales o concurrentes.
+
+En lugar de Gemini se usa un servidor local de prueba (ServidorPrueba) que responde tras
+una latencia simulada: una parte fija más una parte proporcional a la longitud del prompt
+(la respuesta de un modelo de lenguaje tarda más cuanto más largo es el menú que tiene que
+escribir), con un ruido aleatorio y una proporción de errores 503 para probar los
+reintentos. Para cada configuración se muestran el número de peticiones, el tiempo total,
+la latencia máxima de una unidad (sin esperas), los reintentos y las unidades fallidas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.ia_concurrente --latencia 0.5 --por-caracter 0.002 --fallos 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ModeloIA import ClienteHTTP, cargar_dieta, generar_menus, unidades
+
+# (nombre, unidad, concurrencia)
+CONFIGURACIONES = [
+    ("semana", "semana", 1),
+    ("dia secuencial", "dia", 1),
+    ("dia concurrente", "dia", 7),
+    ("franja concurrente", "franja", 8),
+    ("bloque compacto", "bloque", 7),
+]
+
+
+class ServidorPrueba:
+    """
+    Servidor HTTP local que imita a un modelo de lenguaje: POST {"prompt": ...} devuelve
+    {"texto": ...} tras latencia + por_caracter * len(prompt) segundos (con un ruido de
+    ±20 %) y falla con un 503 con probabilidad 'fallos'.
+    """
+
+    def __init__(self, latencia=0.5, por_caracter=0.002, fallos=0.0, semilla=0):
+        self.latencia = latencia
+        self.por_caracter = por_caracter
+        self.fallos = fallos
+        self.aleatorio = random.Random(semilla)
+        self.cerrojo = threading.Lock()
+        self.peticiones = 0
+        servicio = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_POST(self):
+                prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["prompt"]
+                with servicio.cerrojo:
+                    servicio.peticiones += 1
+                    ruido = servicio.aleatorio.uniform(0.8, 1.2)
+                    falla = servicio.aleatorio.random() < servicio.fallos
+                time.sleep((servicio.latencia + servicio.por_caracter * len(prompt)) * ruido)
+                if falla:
+                    codigo, respuesta = 503, {"error": "sobrecargado"}
+                else:
+                    # Menú ficticio: la cabecera del primer día y el número de alimentos
+                    lineas = prompt.splitlines()
+                    cabecera = next((linea for linea in lineas if linea.startswith("---")), lineas[-1].split("|")[0])
+                    alimentos = (sum(linea.startswith("  - ") for linea in lineas)
+                                 + sum(linea.count(",") + 1 for linea in lineas if linea[:1].isdigit()))
+                    codigo, respuesta = 200, {"texto": f"{cabecera}\nMenú de prueba con {alimentos} alimentos.\n"}
+                cuerpo = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+                try:
+                    self.send_response(codigo)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(cuerpo)))
+                    self.end_headers()
+                    self.wfile.write(cuerpo)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente dejó de esperar (tiempo límite agotado)
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self.servidor.daemon_threads = True
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.servidor.server_address[1]}/generar"
+
+    def cerrar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Menús de ModeloIA: petición semanal frente a concurrentes.")
+    parser.add_argument("--dieta", default="Resultados/dieta_optima_Modelo3_alimentos")
+    parser.add_argument("--latencia", type=float, default=0.5, help="latencia fija de cada petición (s)")
+    parser.add_argument("--por-caracter", type=float, default=0.002, help="latencia por carácter del prompt (s)")
+    parser.add_argument("--fallos", type=float, default=0.1, help="proporción de peticiones que fallan")
+    parser.add_argument("--reintentos", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0, help="tiempo límite de cada petición (s)")
+    parser.add_argument("--espera-base", type=float, default=0.2, help="espera antes del primer reintento (s)")
+    args = parser.parse_args()
+
+    dieta = cargar_dieta(args.dieta)
+    servidor = ServidorPrueba(args.latencia, args.por_caracter, args.fallos)
+    cliente = ClienteHTTP(servidor.url)
+
+    print(f"{'Configuración':<20}{'Peticiones':>11}{'Tiempo (s)':>12}{'Máx. (s)':>10}{'Reintentos':>12}"
+          f"{'Fallidas':>10}")
+    for nombre, unidad, concurrencia in CONFIGURACIONES:
+        inicio = time.perf_counter()
+        menus = asyncio.run(generar_menus(dieta, cliente, unidad, concurrencia, args.reintentos, args.timeout,
+                                          args.espera_base))
+        total = time.perf_counter() - inicio
+        reintentos = sum(m["intentos"] - 1 for m in menus)
+        fallidas = sum(m["error"] is not None for m in menus)
+        print(f"{nombre:<20}{len(unidades(dieta, unidad)):>11}{total:>12.2f}{max(m['tiempo'] for m in menus):>10.2f}"
+              f"{reintentos:>12}{fallidas:>10}")
+    servidor.cerrar()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara el Modelo 2 y el Modelo 3 con alimentos construidos con variables para
+todos los pares (alimento, franja), anulando los no admisibles con restricciones X == 0
+(formulación original), y construidos solo sobre los pares admisibles.
+
+Para cada modelo y formulación construye y resuelve el modelo en un proceso independiente
+y muestra el número de variables, restricciones y no ceros, el tiempo de construcción y el
+tiempo de resolución con el resolutor elegido (ver resolutores.py).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.pares_admisibles --modelos Modelo2 Modelo3_alimentos --resolutor highs --limite 600
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import gurobipy as gp
+
+from horizonte import generar_dias
+from resolutores import RESOLUTORES, resolver
+
+MODELOS = ["Modelo2", "Modelo3_alimentos", "Modelo3_alimentos_matricial"]
+
+
+def medir(nombre, solo_admisibles, resolutor, limite, n_dias):
+    """
+    Construye y resuelve el modelo indicado con la formulación indicada y devuelve las medidas.
+    """
+    if nombre == "Modelo2":
+        import Modelo2
+        constructor = lambda: Modelo2.construir_modelo(solo_admisibles=solo_admisibles)
+    else:
+        import Modelo3_alimentos
+        funcion = (Modelo3_alimentos.construir_modelo_matricial if nombre.endswith("matricial")
+                   else Modelo3_alimentos.construir_modelo)
+        constructor = lambda: funcion(generar_dias(n_dias), solo_admisibles=solo_admisibles)
+
+    inicio = time.perf_counter()
+    model, _ = constructor()
+    model.update()
+    resultado = {
+        "modelo": nombre,
+        "formulacion": "admisibles" if solo_admisibles else "completa",
+        "construccion_s": round(time.perf_counter() - inicio, 3),
+        "variables": model.NumVars,
+        "restricciones": model.NumConstrs,
+        "no_ceros": model.NumNZs,
+    }
+    if limite > 0:
+        try:
+            solucion = resolver(model, resolutor, limite_tiempo=limite)
+        except gp.GurobiError as e:
+            resultado["error"] = str(e)
+            return resultado
+        resultado["resolucion_s"] = round(solucion.tiempo, 3)
+        resultado["estado"] = solucion.estado
+        if solucion.tiene_solucion:
+            resultado["objetivo"] = round(solucion.objetivo, 4)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Formulación completa frente a pares admisibles.")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, default=MODELOS)
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="gurobi")
+    parser.add_argument("--limite", type=float, default=600,
+                        help="límite de tiempo de resolución (s); 0 para medir solo la construcción")
+    parser.add_argument("--dias", type=int, default=7, help="días del horizonte del Modelo 3")
+    parser.add_argument("--interno", choices=["completa", "admisibles"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        # Modo interno: una única medida en este proceso
+        print(json.dumps(medir(args.modelos[0], args.interno == "admisibles", args.resolutor, args.limite,
+                               args.dias)))
+        sys.exit(0)
+
+    print(f"{'Modelo':<29}{'Formulación':<12}{'Variables':>10}{'Restricc.':>10}{'No ceros':>10}"
+          f"{'Constr. (s)':>12}{'Resol. (s)':>11}{'Estado':>15}{'Objetivo':>10}")
+    for nombre in args.modelos:
+        for formulacion in ["completa", "admisibles"]:
+            salida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.pares_admisibles", "--interno", formulacion,
+                 "--modelos", nombre, "--resolutor", args.resolutor, "--limite", str(args.limite),
+                 "--dias", str(args.dias)],
+                capture_output=True, text=True, check=True).stdout
+            r = json.loads(salida.strip().splitlines()[-1])
+            resolucion = f"{r['resolucion_s']:.2f}" if "resolucion_s" in r else "-"
+            objetivo = f"{r['objetivo']:.2f}" if "objetivo" in r else "-"
+            estado = r.get("estado", "error" if "error" in r else "-")
+            print(f"{nombre:<29}{formulacion:<12}{r['variables']:>10}{r['restricciones']:>10}{r['no_ceros']:>10}"
+                  f"{r['construccion_s']:>12.3f}{resolucion:>11}{estado:>15}{objetivo:>10}")
+            if "error" in r:
+                print(f"    Error al resolver: {r['error']}")
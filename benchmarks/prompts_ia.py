@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara la construcción de los prompts de ModeloIA.py para planes de varias
+semanas (el plan semanal guardado repetido, con los días renumerados):
+    - "original": el generar_prompt_semanal inicial, que concatena con += (copiado aquí
+      como referencia),
+    - "detallado": el generar_prompt_semanal actual (mismo texto, unido con join),
+    - "compacto": generar_prompts_compactos, con la codificación tabular y bloques que no
+      superan el presupuesto de tokens.
+
+Para cada número de semanas muestra el tiempo de construcción (mejor de varias
+repeticiones), los caracteres, los tokens estimados (ver estimar_tokens), el número de
+prompts y los tokens del prompt más largo.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.prompts_ia --semanas 1 4 12 52 --presupuesto 1000
+"""
+
+import argparse
+import timeit
+
+from ModeloIA import (PRESUPUESTO_TOKENS, cargar_dieta, estimar_tokens, generar_prompt_semanal,
+                      generar_prompts_compactos)
+
+
+def prompt_original(dieta_semanal):
+    """
+    Constructor original del prompt semanal (concatenación con +=), como referencia.
+    """
+    prompt = (
+        "Eres un chef profesional. A partir de los siguientes ingredientes por franja horaria y día,"
+        "crea un menú completo diario elaborado con nombres de platos y descripciones que sea apetitoso."
+        "No añadas ningún ingrediente extra  e incluye todos los alimentos disponibles en cada franja."
+        "En la descripción indica los gramos de cada ingrediente."
+        "En la comida y la cena siempre debe haber primer plato, segundo plato y postre. "
+        "Da sugerencias de diferentes platos para cada día aunque los ingredientes sean los mismos"
+    )
+
+    for dia, dieta_diaria in dieta_semanal.items():
+        if dia == "Coste total":
+            continue
+        prompt += f"--- {dia} ---\n"
+        for franja, alimentos in dieta_diaria.items():
+            prompt += f"{franja}:\n"
+            for alimento, cantidad in alimentos.items():
+                prompt += f"  - {alimento}: {cantidad:.2f} g\n"
+            prompt += "\n"
+
+    if "Coste total" in dieta_semanal:
+        prompt += f"Coste total semanal: {dieta_semanal['Coste total']} €\n"
+
+    return prompt
+
+
+def repetir_semanas(dieta, semanas):
+    """
+    Plan de varias semanas: la dieta semanal repetida, con los días numerados seguidos.
+    """
+    dias = [dieta_diaria for dia, dieta_diaria in dieta.items() if dia != "Coste total"]
+    plan = {f"Día {k + 1}": dias[k % len(dias)] for k in range(semanas * len(dias))}
+    if "Coste total" in dieta:
+        plan["Coste total"] = round(dieta["Coste total"] * semanas, 2)
+    return plan
+
+
+def medir(constructor, dieta, repeticiones):
+    """
+    Mejor tiempo de construcción (s) y lista de prompts generados.
+    """
+    veces = max(1, repeticiones)
+    tiempo = min(timeit.repeat(lambda: constructor(dieta), number=1, repeat=veces))
+    prompts = constructor(dieta)
+    return tiempo, prompts if isinstance(prompts, list) else [prompts]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construcción de prompts de ModeloIA: detallado frente a compacto.")
+    parser.add_argument("--dieta", default="Resultados/dieta_optima_Modelo3_alimentos")
+    parser.add_argument("--semanas", type=int, nargs="+", default=[1, 4, 12, 52])
+    parser.add_argument("--presupuesto", type=int, default=PRESUPUESTO_TOKENS, help="tokens máximos por prompt")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    dieta = cargar_dieta(args.dieta)
+    constructores = [
+        ("original", prompt_original),
+        ("detallado", generar_prompt_semanal),
+        ("compacto", lambda d: [p for _, p in generar_prompts_compactos(d, args.presupuesto)]),
+    ]
+
+    print(f"{'Semanas':>8}  {'Constructor':<11}{'Tiempo (ms)':>12}{'Caracteres':>12}{'Tokens':>9}"
+          f"{'Prompts':>9}{'Máx. tokens':>13}")
+    for semanas in args.semanas:
+        plan = repetir_semanas(dieta, semanas)
+        base = None
+        for nombre, constructor in constructores:
+            tiempo, prompts = medir(constructor, plan, args.repeticiones)
+            tokens = sum(estimar_tokens(p) for p in prompts)
+            base = base or tokens
+            print(f"{semanas:>8}  {nombre:<11}{1000 * tiempo:>12.3f}{sum(len(p) for p in prompts):>12}"
+                  f"{tokens:>9}{len(prompts):>9}{max(estimar_tokens(p) for p in prompts):>13}"
+                  f"   ({tokens / base:.0%})")
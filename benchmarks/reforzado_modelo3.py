@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara la formulación actual del Modelo 3 con alimentos (constructor
+matricial) con la formulación reforzada (reforzado=True: máximos ajustados por grupo,
+vinculación de los binarios de grupo con los de sus alimentos y ruptura de la simetría de inversión
+de los días).
+
+Para cada formulación construye y resuelve el modelo en un proceso independiente y
+muestra el número de restricciones, la cota de la relajación lineal, el número de nodos,
+el tiempo hasta alcanzar el MIPGap de 0.028 y el coste obtenido.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.reforzado_modelo3 --dias 7 --resolutor gurobi --limite 600
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+import gurobipy as gp
+
+import Modelo3_alimentos as m3
+from horizonte import generar_dias
+from resolutores import RESOLUTORES, resolver
+
+FORMULACIONES = ["actual", "reforzada"]
+
+
+def medir(reforzado, resolutor, limite, n_dias):
+    """
+    Construye y resuelve el modelo con la formulación indicada y devuelve las medidas.
+    """
+    model, _ = m3.construir_modelo_matricial(generar_dias(n_dias), reforzado=reforzado)
+    model.update()
+    resultado = {
+        "formulacion": FORMULACIONES[reforzado],
+        "restricciones": model.NumConstrs,
+        "no_ceros": model.NumNZs,
+    }
+    try:
+        relajacion = resolver(model.relax(), resolutor)
+        resultado["cota_lp"] = relajacion.objetivo
+        solucion = resolver(model, resolutor, limite_tiempo=limite, gap=m3.MIP_GAP)
+    except gp.GurobiError as e:
+        resultado["error"] = str(e)
+        return resultado
+    resultado.update(estado=solucion.estado, tiempo_s=round(solucion.tiempo, 3), nodos=solucion.nodos)
+    if solucion.tiene_solucion:
+        resultado.update(objetivo=solucion.objetivo, cota=solucion.cota)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Formulación actual frente a reforzada del Modelo 3.")
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="gurobi")
+    parser.add_argument("--limite", type=float, default=600, help="límite de tiempo de resolución (s)")
+    parser.add_argument("--interno", choices=FORMULACIONES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        # Modo interno: una única medida en este proceso
+        print(json.dumps(medir(args.interno == "reforzada", args.resolutor, args.limite, args.dias)))
+        sys.exit(0)
+
+    print(f"{'Formulación':<12}{'Restricc.':>10}{'Cota LP':>10}{'Nodos':>9}{'Tiempo (s)':>12}"
+          f"{'Estado':>15}{'Coste (€)':>11}{'Cota':>9}")
+    for formulacion in FORMULACIONES:
+        salida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.reforzado_modelo3", "--interno", formulacion,
+             "--dias", str(args.dias), "--resolutor", args.resolutor, "--limite", str(args.limite)],
+            capture_output=True, text=True, check=True).stdout
+        r = json.loads(salida.strip().splitlines()[-1])
+        if "error" in r:
+            print(f"{formulacion:<12}{r['restricciones']:>10}    Error al resolver: {r['error']}")
+            continue
+        nodos = str(r["nodos"]) if r["nodos"] is not None else "-"
+        objetivo = f"{r['objetivo']:.4f}" if "objetivo" in r else "-"
+        cota = f"{r['cota']:.4f}" if "cota" in r else "-"
+        print(f"{formulacion:<12}{r['restricciones']:>10}{r['cota_lp']:>10.4f}{nodos:>9}{r['tiempo_s']:>12.2f}"
+              f"{r['estado']:>15}{objetivo:>11}{cota:>9}")
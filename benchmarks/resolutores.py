@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script compara los resolutores disponibles (ver resolutores.py) en los cuatro modelos.
+
+Para cada modelo y resolutor construye el modelo en un proceso independiente y muestra el
+tiempo de construcción con gurobipy, el tiempo de conversión a la forma estándar dispersa
+(solo HiGHS), el tiempo de resolución, el estado y el objetivo. Si un resolutor falla (por
+ejemplo, Gurobi con la licencia limitada en los modelos grandes) se muestra el error.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.resolutores --modelos Modelo1 Modelo2 --resolutores gurobi highs scipy --limite 600
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import gurobipy as gp
+
+from resolutores import MODELOS, RESOLUTORES, FormaEstandar, construir, resolver, resolver_highs, resolver_scipy
+
+
+def medir(nombre, resolutor, limite, n_dias):
+    """
+    Construye y resuelve el modelo indicado con el resolutor indicado y devuelve las medidas.
+    """
+    inicio = time.perf_counter()
+    model, _ = construir(nombre, n_dias=n_dias)
+    model.update()
+    resultado = {
+        "modelo": nombre,
+        "resolutor": resolutor,
+        "construccion_s": round(time.perf_counter() - inicio, 3),
+        "variables": model.NumVars,
+        "restricciones": model.NumConstrs,
+    }
+    try:
+        if resolutor == "gurobi":
+            solucion = resolver(model, "gurobi", limite_tiempo=limite)
+        else:
+            inicio = time.perf_counter()
+            forma = FormaEstandar(model)
+            resultado["conversion_s"] = round(time.perf_counter() - inicio, 3)
+            if resolutor == "highs":
+                solucion = resolver_highs(forma, limite_tiempo=limite)
+            else:
+                solucion = resolver_scipy(forma, limite_tiempo=limite)
+    except gp.GurobiError as e:
+        resultado["error"] = str(e)
+        return resultado
+    resultado["resolucion_s"] = round(solucion.tiempo, 3)
+    resultado["estado"] = solucion.estado
+    if solucion.tiene_solucion:
+        resultado["objetivo"] = round(solucion.objetivo, 4)
+        resultado["cota"] = round(solucion.cota, 4)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparación de resolutores en los cuatro modelos.")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, default=MODELOS)
+    parser.add_argument("--resolutores", nargs="+", choices=RESOLUTORES, default=RESOLUTORES)
+    parser.add_argument("--limite", type=float, default=600, help="límite de tiempo de resolución (s)")
+    parser.add_argument("--dias", type=int, default=7, help="días del horizonte de los modelos semanales")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        # Modo interno: una única medida en este proceso
+        print(json.dumps(medir(args.modelos[0], args.resolutores[0], args.limite, args.dias)))
+        sys.exit(0)
+
+    print(f"{'Modelo':<19}{'Resolutor':<10}{'Variables':>10}{'Restricc.':>10}{'Constr. (s)':>12}"
+          f"{'Conv. (s)':>10}{'Resol. (s)':>11}{'Estado':>15}{'Objetivo':>10}{'Cota':>10}")
+    for nombre in args.modelos:
+        for resolutor in args.resolutores:
+            salida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.resolutores", "--interno", "--modelos", nombre,
+                 "--resolutores", resolutor, "--limite", str(args.limite), "--dias", str(args.dias)],
+                capture_output=True, text=True, check=True).stdout
+            r = json.loads(salida.strip().splitlines()[-1])
+            conversion = f"{r['conversion_s']:.3f}" if "conversion_s" in r else "-"
+            resolucion = f"{r['resolucion_s']:.2f}" if "resolucion_s" in r else "-"
+            objetivo = f"{r['objetivo']:.2f}" if "objetivo" in r else "-"
+            cota = f"{r['cota']:.2f}" if "cota" in r else "-"
+            print(f"{nombre:<19}{resolutor:<10}{r['variables']:>10}{r['restricciones']:>10}"
+                  f"{r['construccion_s']:>12.3f}{conversion:>10}{resolucion:>11}{r.get('estado', 'error'):>15}"
+                  f"{objetivo:>10}{cota:>10}")
+            if "error" in r:
+                print(f"    Error al resolver: {r['error']}")
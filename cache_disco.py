@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo contiene la parte común de las cachés en disco del repositorio (soluciones
+de los modelos en cache_soluciones.py y respuestas del modelo de lenguaje en cache_ia.py).
+
+CacheDisco guarda cada valor en un directorio <directorio>/<clave>, donde la clave es el
+hash SHA-256 de lo que determina el valor (ver hash_partes). Cada subclase define cómo se
+calcula la clave y cómo se leen (_leer) y escriben (_escribir) sus valores; CacheDisco se
+encarga de:
+    - escribir cada entrada en un directorio temporal y renombrarlo al final, para no leer
+      nunca una entrada a medio escribir,
+    - el tamaño máximo, con expulsión de las entradas usadas hace más tiempo (LRU; el
+      último uso es la fecha de modificación de la entrada, que se actualiza en cada acierto),
+    - las estadísticas acumuladas (aciertos, fallos, expulsiones) en estadisticas.json,
+      que se actualiza con un bloqueo (fcntl.flock sobre .estadisticas.lock) para que no se
+      pierdan cuentas cuando varios procesos usan la misma caché (lote.py, servidor.py).
+
+No depende de ningún resolutor ni de los módulos de los modelos.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+
+def hash_partes(partes):
+    """
+    Hash SHA-256 de un diccionario serializable (con las claves ordenadas).
+    """
+    texto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheDisco(ABC):
+    """
+    Caché en disco direccionada por contenido y con expulsión LRU. Las subclases
+    implementan _leer(entrada) y _escribir(entrada, valor) y un método clave(...) con los
+    datos que determinan sus valores.
+    """
+
+    def __init__(self, directorio, tamano_maximo):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    @abstractmethod
+    def _leer(self, entrada):
+        """
+        Lee el valor guardado en el directorio de una entrada (OSError, ValueError o
+        KeyError si no está o no se puede leer).
+        """
+
+    @abstractmethod
+    def _escribir(self, entrada, valor):
+        """
+        Escribe un valor en el directorio (ya creado) de una entrada.
+        """
+
+    def obtener(self, clave):
+        """
+        Devuelve el valor guardado con esa clave o None si no está.
+        """
+        entrada = os.path.join(self.directorio, clave)
+        try:
+            valor = self._leer(entrada)
+            os.utime(entrada)  # Último uso (LRU)
+        except (OSError, ValueError, KeyError):
+            self._contar("fallos")
+            return None
+        self._contar("aciertos")
+        return valor
+
+    def guardar(self, clave, valor):
+        """
+        Guarda un valor y expulsa las entradas menos usadas si se supera el tamaño máximo.
+        La entrada se escribe en un directorio temporal y se renombra al final, de modo que
+        nunca se lee una entrada a medio escribir.
+        """
+        entrada = os.path.join(self.directorio, clave)
+        tmp = os.path.join(self.directorio, f".{clave}.{os.getpid()}.tmp")
+        os.makedirs(tmp, exist_ok=True)
+        self._escribir(tmp, valor)
+        # Sustituir la entrada anterior si la hay (por ejemplo, al resolver con --sin-cache)
+        shutil.rmtree(entrada, ignore_errors=True)
+        try:
+            os.replace(tmp, entrada)
+        except OSError:
+            # Otro proceso acaba de guardar la misma entrada
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.expulsar()
+
+    def entradas(self):
+        """
+        Lista de entradas (último uso, bytes, ruta) de la más antigua a la más reciente.
+        """
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            if nombre.startswith(".") or not os.path.isdir(ruta):
+                continue
+            tamano = sum(os.path.getsize(os.path.join(ruta, f)) for f in os.listdir(ruta))
+            entradas.append((os.path.getmtime(ruta), tamano, ruta))
+        return sorted(entradas)
+
+    def expulsar(self):
+        """
+        Elimina las entradas usadas hace más tiempo hasta no superar el tamaño máximo.
+        Devuelve el número de entradas eliminadas.
+        """
+        entradas = self.entradas()
+        total = sum(tamano for _, tamano, _ in entradas)
+        expulsadas = 0
+        for _, tamano, ruta in entradas:
+            if total <= self.tamano_maximo:
+                break
+            shutil.rmtree(ruta, ignore_errors=True)
+            total -= tamano
+            expulsadas += 1
+        if expulsadas:
+            self._contar("expulsadas", expulsadas)
+        return expulsadas
+
+    def vaciar(self):
+        """
+        Elimina todas las entradas y reinicia las estadísticas.
+        """
+        for _, _, ruta in self.entradas():
+            shutil.rmtree(ruta, ignore_errors=True)
+        with self._bloqueo():
+            self._escribir_estadisticas({})
+
+    def estadisticas(self):
+        """
+        Estadísticas acumuladas de la caché (aciertos, fallos, tasa de aciertos,
+        expulsiones) y su ocupación actual.
+        """
+        estadisticas = {"aciertos": 0, "fallos": 0, "expulsadas": 0}
+        estadisticas.update(self._leer_estadisticas())
+        consultas = estadisticas["aciertos"] + estadisticas["fallos"]
+        entradas = self.entradas()
+        estadisticas.update(
+            tasa_aciertos=estadisticas["aciertos"] / consultas if consultas else None,
+            entradas=len(entradas),
+            bytes=sum(tamano for _, tamano, _ in entradas),
+            tamano_maximo=self.tamano_maximo,
+        )
+        return estadisticas
+
+    def _contar(self, campo, n=1):
+        if campo == "aciertos":
+            self.aciertos += n
+        elif campo == "fallos":
+            self.fallos += n
+        with self._bloqueo():
+            estadisticas = self._leer_estadisticas()
+            estadisticas[campo] = estadisticas.get(campo, 0) + n
+            self._escribir_estadisticas(estadisticas)
+
+    @contextmanager
+    def _bloqueo(self):
+        """
+        Bloqueo exclusivo entre procesos para leer y reescribir estadisticas.json.
+        """
+        with open(os.path.join(self.directorio, ".estadisticas.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _leer_estadisticas(self):
+        try:
+            with open(os.path.join(self.directorio, "estadisticas.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _escribir_estadisticas(self, estadisticas):
+        tmp = os.path.join(self.directorio, f".estadisticas.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estadisticas, f)
+        os.replace(tmp, os.path.join(self.directorio, "estadisticas.json"))
+
+
+def mostrar_estadisticas(cache, vaciar=False):
+    """
+    Muestra las estadísticas de una caché (y antes la vacía si vaciar es True).
+    """
+    if vaciar:
+        cache.vaciar()
+        print(f"Caché '{cache.directorio}' vaciada.")
+    e = cache.estadisticas()
+    tasa = f"{e['tasa_aciertos']:.1%}" if e["tasa_aciertos"] is not None else "-"
+    print(f"Entradas: {e['entradas']} ({e['bytes'] / 2**10:.1f} KiB de {e['tamano_maximo'] / 2**20:.0f} MiB)")
+    print(f"Aciertos: {e['aciertos']}, fallos: {e['fallos']} (tasa de aciertos {tasa}), "
+          f"expulsadas: {e['expulsadas']}")
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo guarda en disco las respuestas del modelo de lenguaje de ModeloIA.py para no
+volver a pedir (ni pagar) el menú de un día o de una franja que no ha cambiado.
+
+Cada respuesta se guarda en .cache/ia/<clave>/respuesta.json, donde la clave es el hash
+SHA-256 de:
+    - el prompt de la unidad (día o franja) normalizado: sin espacios repetidos ni líneas
+      vacías, de modo que un cambio de formato no invalida la caché,
+    - el nombre del modelo de lenguaje,
+    - los parámetros de generación (temperatura, etc.).
+Así, si al volver a generar la semana solo ha cambiado un día, solo se hace una petición.
+
+La expulsión LRU por tamaño y las estadísticas (aciertos, fallos, tasa de aciertos) son
+las de cache_disco.py, común con la caché de soluciones (cache_soluciones.py).
+
+Uso: python cache_ia.py [--vaciar]   (muestra las estadísticas de la caché)
+"""
+
+import argparse
+import json
+import os
+
+from cache_disco import CacheDisco, hash_partes, mostrar_estadisticas
+
+CACHE_DIR = ".cache/ia"
+TAMANO_MAXIMO = 16 * 2**20  # bytes
+
+# Versión del formato de la caché (cambiarla invalida las cachés existentes)
+VERSION_CACHE = 1
+
+
+def normalizar_prompt(prompt):
+    """
+    Prompt sin espacios al principio ni al final de las líneas, sin espacios repetidos y
+    sin líneas vacías.
+    """
+    return "\n".join(" ".join(linea.split()) for linea in prompt.splitlines() if linea.strip())
+
+
+class CacheIA(CacheDisco):
+    """
+    Caché en disco de respuestas del modelo de lenguaje direccionada por contenido y con
+    expulsión LRU.
+    """
+
+    def __init__(self, directorio=CACHE_DIR, tamano_maximo=TAMANO_MAXIMO):
+        super().__init__(directorio, tamano_maximo)
+
+    def clave(self, prompt, modelo, configuracion=None):
+        """
+        Clave de una respuesta: hash del prompt normalizado, el modelo y los parámetros de
+        generación.
+        """
+        partes = {
+            "version": VERSION_CACHE,
+            "modelo": modelo,
+            "configuracion": configuracion or {},
+            "prompt": normalizar_prompt(prompt),
+        }
+        return hash_partes(partes)
+
+    def guardar(self, clave, texto, modelo=None):
+        """
+        Guarda una respuesta (y el modelo que la generó) y expulsa las entradas menos usadas
+        si se supera el tamaño máximo.
+        """
+        super().guardar(clave, {"modelo": modelo, "texto": texto})
+
+    def _leer(self, entrada):
+        with open(os.path.join(entrada, "respuesta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["texto"]
+
+    def _escribir(self, entrada, respuesta):
+        with open(os.path.join(entrada, "respuesta.json"), "w", encoding="utf-8") as f:
+            json.dump(respuesta, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estadísticas de la caché de respuestas de ModeloIA.")
+    parser.add_argument("--vaciar", action="store_true", help="elimina todas las respuestas guardadas")
+    args = parser.parse_args()
+
+    mostrar_estadisticas(CacheIA(), args.vaciar)
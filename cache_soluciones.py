@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo guarda en disco las soluciones de los modelos para no volver a resolverlos
+cuando no ha cambiado nada.
+
+Cada solución se guarda como un Resultado (ver resultados.py) en .cache/soluciones/<clave>,
+donde la clave es el hash SHA-256 de todo lo que determina la solución:
+    - el contenido de los ficheros de datos (alimentos.json, recetas.json),
+    - la variante del modelo y sus opciones (constructor, número de días, arranque...),
+    - todos los parámetros del perfil nutricional,
+    - los parámetros del resolutor (MIPGap, resolutor...),
+    - la versión del código: el contenido del fichero del modelo y de los módulos comunes.
+
+La caché tiene un tamaño máximo: al guardar una solución nueva se eliminan las entradas
+usadas hace más tiempo (LRU). La expulsión y las estadísticas (aciertos, fallos, tasa de
+aciertos) son las de cache_disco.py.
+
+Uso: python cache_soluciones.py [--vaciar]   (muestra las estadísticas de la caché)
+"""
+
+import argparse
+import os
+
+from cache_disco import CacheDisco, hash_partes, mostrar_estadisticas
+from catalogo import _hash_fichero
+from perfil import perfil_serializable
+from resultados import Resultado
+
+CACHE_DIR = ".cache/soluciones"
+TAMANO_MAXIMO = 64 * 2**20  # bytes
+
+# Versión del formato de la caché (cambiarla invalida las cachés existentes)
+VERSION_CACHE = 1
+
+# Módulos que usan todos los modelos: si cambian, cambia la clave de todas las soluciones
+FUENTES_COMUNES = ["catalogo.py", "horizonte.py", "perfil.py", "resultados.py"]
+
+
+class CacheSoluciones(CacheDisco):
+    """
+    Caché en disco de soluciones (Resultado) direccionada por contenido y con expulsión LRU.
+    """
+
+    def __init__(self, directorio=CACHE_DIR, tamano_maximo=TAMANO_MAXIMO):
+        super().__init__(directorio, tamano_maximo)
+
+    def clave(self, modelo, perfil, parametros=None, ficheros=(), fuentes=()):
+        """
+        Clave de una solución: hash de la variante del modelo, el perfil, los parámetros,
+        el contenido de los ficheros de datos y el código del modelo (fuentes) y de los
+        módulos comunes.
+        """
+        partes = {
+            "version": VERSION_CACHE,
+            "modelo": modelo,
+            "perfil": perfil_serializable(perfil),
+            "parametros": parametros or {},
+            "ficheros": {ruta: _hash_fichero(ruta) for ruta in ficheros},
+            "codigo": {ruta: _hash_fichero(ruta) for ruta in list(fuentes) + FUENTES_COMUNES},
+        }
+        return hash_partes(partes)
+
+    def _leer(self, entrada):
+        return Resultado.cargar(os.path.join(entrada, "resultado"))
+
+    def _escribir(self, entrada, resultado):
+        resultado.guardar(os.path.join(entrada, "resultado"), informe=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estadísticas de la caché de soluciones.")
+    parser.add_argument("--vaciar", action="store_true", help="elimina todas las soluciones guardadas")
+    args = parser.parse_args()
+
+    mostrar_estadisticas(CacheSoluciones(), args.vaciar)
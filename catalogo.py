@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo compila el catálogo de alimentos (alimentos.json) en arrays de NumPy
+alineados por índice, compartidos por todos los modelos.
+
+El catálogo compilado se guarda en disco como ficheros .npy que se abren con
+memoria mapeada, de forma que solo se vuelve a leer y convertir el JSON cuando
+el fichero de origen cambia (se comprueba la fecha de modificación y, si esta
+difiere, el hash del contenido).
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Rutas por defecto del catálogo y de la caché compilada
+RUTA_ALIMENTOS = "alimentos.json"
+CACHE_DIR = ".cache/catalogo"
+
+# Versión del formato de la caché (cambiarla invalida las cachés existentes)
+VERSION_CACHE = 1
+
+# Mapear categorías a números
+CATEGORIAS_MAP = {
+    "Cereales y derivados": 1, "Leche y productos lácteos": 2, "Huevos": 3, "Azúcares y dulces": 4,
+    "Aceites y grasas": 5, "Verduras y hortalizas": 6, "Legumbres": 7, "Frutas": 8, "Frutos secos": 9,
+    "Carnes": 10, "Productos cárnicos": 11, "Pescados": 12, "Crustáceos y moluscos": 13,
+    "Condimentos y aperitivos": 14, "Bebidas": 15
+}
+
+# Parámetros numéricos del catálogo y su campo en alimentos.json
+CAMPOS = {
+    "precio": "Precio (€/100g)",
+    "energia": "Energía (Kcal)",
+    "carbohidratos": "Hidratos de carbono (g)",
+    "proteina": "Proteínas (g)",
+    "grasa": "Lípidos totales (g)",
+    "maximo": "Máximo (g/día)",
+}
+
+
+class Catalogo:
+    """
+    Catálogo de alimentos en forma de arrays alineados por índice.
+    La posición k de cada array corresponde al alimento nombres[k].
+    """
+
+    def __init__(self, nombres, arrays):
+        self.nombres = list(nombres)
+        self.indice = {nombre: k for k, nombre in enumerate(self.nombres)}
+        self.precio = arrays["precio"]
+        self.energia = arrays["energia"]
+        self.carbohidratos = arrays["carbohidratos"]
+        self.proteina = arrays["proteina"]
+        self.grasa = arrays["grasa"]
+        self.maximo = arrays["maximo"]
+        self.categoria = arrays["categoria"]
+        self.postre = arrays["postre"]
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def diccionario(self, campo):
+        """
+        Devuelve el parámetro indicado como diccionario alimento -> valor.
+        """
+        return dict(zip(self.nombres, getattr(self, campo).tolist()))
+
+    def subconjunto(self, categoria):
+        """
+        Devuelve la lista de alimentos de una categoría (por nombre o por código).
+        """
+        codigo = CATEGORIAS_MAP.get(categoria, categoria)
+        return [self.nombres[k] for k in np.flatnonzero(self.categoria == codigo)]
+
+    def postres(self):
+        """
+        Devuelve la lista de alimentos marcados como postre.
+        """
+        return [self.nombres[k] for k in np.flatnonzero(self.postre)]
+
+    def admisibles(self, franjas, categorias_permitidas, prohibidos=None):
+        """
+        Devuelve la matriz booleana (alimento, franja) de pares admisibles: la categoría del
+        alimento está permitida en la franja y el alimento no está prohibido en ella.
+        prohibidos es un diccionario franja -> lista de alimentos.
+        """
+        admisible = np.stack([np.isin(self.categoria, list(categorias_permitidas[j])) for j in franjas], axis=1)
+        for j, lista in (prohibidos or {}).items():
+            admisible[[self.indice[i] for i in lista if i in self.indice], franjas.index(j)] = False
+        return admisible
+
+
+def compilar_catalogo(data):
+    """
+    Convierte el diccionario leído de alimentos.json en un Catalogo con arrays contiguos.
+    """
+    nombres = list(data)
+    arrays = {
+        campo: np.array([float(data[i][clave]) for i in nombres], dtype=np.float64)
+        for campo, clave in CAMPOS.items()
+    }
+    arrays["categoria"] = np.array([CATEGORIAS_MAP[data[i]["Categoría"]] for i in nombres], dtype=np.int8)
+    arrays["postre"] = np.array([data[i].get("Extra") == "Postre" for i in nombres], dtype=bool)
+    return Catalogo(nombres, arrays)
+
+
+def _hash_fichero(ruta):
+    """
+    Calcula el hash SHA-256 del contenido de un fichero.
+    """
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _directorio_cache(ruta, cache_dir):
+    """
+    Directorio de la caché asociado a un fichero de catálogo concreto.
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(cache_dir, nombre)
+
+
+def _guardar_cache(catalogo, directorio, meta):
+    """
+    Escribe los arrays del catálogo como ficheros .npy y, en último lugar, los metadatos.
+    Los metadatos actúan como marca de validez: si la escritura se interrumpe, la caché
+    no coincide con el fichero de origen y se vuelve a compilar.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    arrays = {campo: getattr(catalogo, campo) for campo in list(CAMPOS) + ["categoria", "postre"]}
+    arrays["nombres"] = np.array(catalogo.nombres, dtype=str)
+    for campo, valores in arrays.items():
+        tmp = os.path.join(directorio, f"{campo}.{os.getpid()}.tmp.npy")
+        np.save(tmp, np.ascontiguousarray(valores))
+        os.replace(tmp, os.path.join(directorio, f"{campo}.npy"))
+    _guardar_meta(directorio, meta)
+
+
+def _guardar_meta(directorio, meta):
+    tmp = os.path.join(directorio, f"meta.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(directorio, "meta.json"))
+
+
+def _leer_cache(directorio):
+    """
+    Abre los arrays de la caché con memoria mapeada (solo lectura).
+    """
+    arrays = {
+        campo: np.load(os.path.join(directorio, f"{campo}.npy"), mmap_mode="r")
+        for campo in list(CAMPOS) + ["categoria", "postre"]
+    }
+    nombres = np.load(os.path.join(directorio, "nombres.npy")).tolist()
+    return Catalogo(nombres, arrays)
+
+
+def cargar_catalogo(ruta=RUTA_ALIMENTOS, cache_dir=CACHE_DIR):
+    """
+    Carga el catálogo de alimentos desde la caché compilada si sigue siendo válida.
+    En otro caso lee alimentos.json, lo compila y actualiza la caché.
+    Si cache_dir es None no se usa caché.
+    """
+    if cache_dir is None:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return compilar_catalogo(json.load(f))
+
+    directorio = _directorio_cache(ruta, cache_dir)
+    estado = os.stat(ruta)
+    meta = None
+    try:
+        with open(os.path.join(directorio, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if meta is not None and meta.get("version") == VERSION_CACHE:
+        # Comprobación rápida: misma fecha de modificación y tamaño
+        if meta["mtime_ns"] == estado.st_mtime_ns and meta["tamano"] == estado.st_size:
+            try:
+                return _leer_cache(directorio)
+            except (OSError, ValueError):
+                pass
+        # La fecha cambió: solo se recompila si el contenido es distinto
+        elif meta["sha256"] == _hash_fichero(ruta):
+            try:
+                catalogo = _leer_cache(directorio)
+            except (OSError, ValueError):
+                pass
+            else:
+                meta.update(mtime_ns=estado.st_mtime_ns, tamano=estado.st_size)
+                _guardar_meta(directorio, meta)
+                return catalogo
+
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    catalogo = compilar_catalogo(json.loads(contenido.decode("utf-8")))
+    meta = {
+        "version": VERSION_CACHE,
+        "ruta": os.path.abspath(ruta),
+        "mtime_ns": estado.st_mtime_ns,
+        "tamano": estado.st_size,
+        "sha256": hashlib.sha256(contenido).hexdigest(),
+    }
+    try:
+        _guardar_cache(catalogo, directorio, meta)
+    except OSError:
+        # Sin permisos de escritura: se trabaja con el catálogo en memoria
+        return catalogo
+    return _leer_cache(directorio)
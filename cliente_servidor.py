@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script es un cliente de prueba del servicio de servidor.py: envía varias peticiones
+a la vez, como haría la interfaz de planificación, y muestra la latencia de cada una y
+el estado del servicio (profundidad de la cola y percentiles de latencia).
+
+Con --local arranca el servicio en este mismo proceso (en un puerto libre), de modo que
+se puede probar sin lanzar el servidor aparte.
+
+Uso: python cliente_servidor.py [--local] [--peticiones 8] [--concurrencia 4]
+                                [--modelo Modelo2] [--limite 10] [--resolutor gurobi]
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from resolutores import MODELOS, RESOLUTORES
+
+URL = "http://127.0.0.1:8765"
+
+
+def pedir(url, ruta, datos=None, timeout=600):
+    """
+    Hace una petición al servicio (POST si hay datos) y devuelve el código y el JSON de la respuesta.
+    """
+    cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else None
+    peticion = urllib.request.Request(url + ruta, data=cuerpo, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(peticion, timeout=timeout) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def arrancar_local(modelos, n_dias, trabajadores):
+    """
+    Arranca el servicio en un hilo de este proceso y devuelve su URL.
+    """
+    from servidor import ServicioDieta, crear_servidor
+
+    servicio = ServicioDieta(modelos, n_dias, trabajadores)
+    servidor = crear_servidor(servicio, puerto=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cliente de prueba del servicio de dietas.")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--local", action="store_true", help="arranca el servicio en este proceso")
+    parser.add_argument("--trabajadores", type=int, default=None, help="trabajadores del servicio local")
+    parser.add_argument("--peticiones", type=int, default=8)
+    parser.add_argument("--concurrencia", type=int, default=4, help="peticiones enviadas a la vez")
+    parser.add_argument("--modelo", choices=MODELOS, default="Modelo2")
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--limite", type=float, default=10.0, help="límite de tiempo de cada petición (s)")
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="gurobi")
+    args = parser.parse_args()
+
+    url = args.url
+    if args.local:
+        inicio = time.perf_counter()
+        url = arrancar_local([args.modelo], args.dias, args.trabajadores)
+        print(f"Servicio local en {url} (plantillas en {time.perf_counter() - inicio:.1f} s)")
+
+    # Perfiles de prueba: el base y variaciones de la banda de calorías
+    peticiones = [{"modelo": args.modelo, "dias": args.dias, "limite_tiempo": args.limite,
+                   "resolutor": args.resolutor,
+                   "perfil": {} if k % 2 == 0 else {"nombre": f"prueba_{k}", "kcal_min": 2300 + 10 * k}}
+                  for k in range(args.peticiones)]
+
+    def enviar(peticion):
+        inicio = time.perf_counter()
+        codigo, respuesta = pedir(url, "/resolver", peticion)
+        return codigo, respuesta, time.perf_counter() - inicio
+
+    print(f"\n{'Perfil':<14}{'Código':>7}{'Estado':>15}{'Coste (€)':>11}{'Espera (s)':>12}{'Total (s)':>11}")
+    with ThreadPoolExecutor(max_workers=args.concurrencia) as pool:
+        for codigo, r, total in pool.map(enviar, peticiones):
+            coste = f"{r['coste']:.4f}" if "coste" in r else "-"
+            espera = f"{r['espera']:.3f}" if "espera" in r else "-"
+            print(f"{r.get('perfil', '-'):<14}{codigo:>7}{r.get('estado', r.get('error', '-')):>15}"
+                  f"{coste:>11}{espera:>12}{total:>11.3f}")
+
+    _, estado = pedir(url, "/estado")
+    print("\nEstado del servicio:")
+    print(json.dumps(estado, indent=1, ensure_ascii=False))
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script resuelve el Modelo 3 con recetas por generación de columnas (price-and-branch).
+
+Con un catálogo grande de recetas, enumerar todas las recetas de cada franja y día como
+variables X[j, r, d] (con sus cantidades Q[i, j, r, d]) da lugar a un modelo enorme. En
+su lugar:
+    1. Se parte de un subconjunto pequeño de recetas por franja (las más baratas).
+    2. Se resuelve la relajación lineal del modelo restringido a ese subconjunto.
+    3. Con los duales de las restricciones de calorías, macronutrientes y grupos de
+       alimentos de cada franja y día se calcula el coste reducido de cada receta del
+       catálogo que aún no está en el modelo, y se añaden solo las que lo mejoran
+       (coste reducido negativo en algún día).
+    4. Se repite hasta que ninguna receta mejora la relajación y se resuelve el problema
+       entero sobre las recetas generadas.
+
+El coste reducido de una receta con X = 1 se obtiene en forma cerrada: cada ingrediente
+toma su cantidad mínima si su coste reducido es positivo y la máxima si es negativo, y a
+la suma se le restan los duales de las filas en las que aparece X (al menos una receta
+por franja, exclusión de extras y uso del alimento en el día). Las restricciones propias
+de la receta nueva (repetición semanal, separación entre días) aún no existen y su dual
+es 0, de modo que cuando ninguna receta tiene coste reducido negativo la relajación del
+modelo restringido coincide con la del catálogo completo y es una cota inferior válida
+del coste óptimo de la enumeración completa.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from horizonte import generar_dias
+from perfil import PERFIL_BASE
+from resolutores import RESOLUTORES, resolver
+from resultados import metadatos_solucion
+import Modelo3_recetas as m3r
+
+# Filas de grupo de alimentos en las que entra un ingrediente de cada grupo
+FILAS_GRUPO = {
+    "frutas": ["frutas"], "verduras": ["verduras_min", "verduras_max"], "legumbres": ["legumbres"],
+    "carnes": ["carnes"], "pescados": ["pescados"], "lacteos": ["lacteos"], "azúcares": ["azúcares"],
+    "postres": ["postres"], "leche_cafe": ["leche_cafe"],
+}
+NUTRIENTES = ["calorias", "carbohidratos", "proteina", "grasa"]
+
+
+def cargar_recetas(ruta):
+    """
+    Carga un catálogo de recetas con el formato de recetas.json.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ampliar_catalogo(recetas, variantes, semilla=0):
+    """
+    Genera un catálogo de prueba más grande: añade a cada receta 'variantes' copias con
+    los rangos de cantidad de sus ingredientes escalados por un factor entre 0.7 y 1.3.
+    """
+    rng = random.Random(semilla)
+    ampliado = {}
+    for j, lista in recetas.items():
+        ampliado[j] = list(lista)
+        for receta in lista:
+            nombre = receta.get("receta", "Receta sin nombre")
+            for k in range(1, variantes + 1):
+                factor = rng.uniform(0.7, 1.3)
+                ingredientes = {i: [round(float(qmin) * factor), round(float(qmax) * factor)]
+                                for i, (qmin, qmax) in receta["ingredientes"].items()}
+                ampliado[j].append({"receta": f"{nombre} (variante {k})", "ingredientes": ingredientes})
+    return ampliado
+
+
+def coste_minimo(receta, j, perfil):
+    """
+    Coste de una receta con todos sus ingredientes en la cantidad mínima. Devuelve None
+    si la receta no puede usarse en la franja (algún ingrediente obligatorio no permitido).
+    """
+    coste = 0.0
+    for i, (qmin, qmax) in receta["ingredientes"].items():
+        qmin = float(qmin)
+        cota = min(float(qmax), m3r.maximo[i]) if m3r.categorias[i] in perfil["categorias_permitidas"][j] else 0.0
+        if qmin > cota:
+            return None
+        coste += m3r.precio[i] / 100 * qmin
+    return coste
+
+
+def coste_reducido(receta, j, d, duales, perfil):
+    """
+    Coste reducido de usar la receta en la franja j el día d con los duales de la
+    relajación del modelo restringido. Devuelve None si la receta no es utilizable.
+    """
+    permitidas = perfil["categorias_permitidas"][j]
+    total = -duales.get(("recetas", j, d), 0.0)
+    for i, (qmin, qmax) in receta["ingredientes"].items():
+        qmin = float(qmin)
+        cota = min(float(qmax), m3r.maximo[i]) if m3r.categorias[i] in permitidas else 0.0
+        if qmin > cota:
+            return None
+
+        # Coste reducido de un gramo del ingrediente en la franja y el día
+        c = m3r.precio[i] / 100
+        for nutriente in NUTRIENTES:
+            pi = duales.get((f"{nutriente}_min", j, d), 0.0) + duales.get((f"{nutriente}_max", j, d), 0.0)
+            c -= m3r.coeficientes[nutriente][i] * pi
+        for g, conjunto in m3r.grupos.items():
+            if i in conjunto:
+                c -= sum(duales.get((fila, j, d), 0.0) for fila in FILAS_GRUPO[g])
+        total += c * qmin if c >= 0 else c * cota
+
+        # Filas en las que aparece X: exclusión del ingrediente como extra y uso en el día
+        for franja in m3r.franjas:
+            total -= m3r.maximo[i] * duales.get(("exclusion", i, franja, d), 0.0)
+        total += duales.get(("uso", i, d), 0.0)
+    return total
+
+
+def generar_columnas(catalogo, dias, perfil=PERFIL_BASE, iniciales=4, por_iteracion=5, max_iteraciones=50,
+                     resolutor="highs", limite_tiempo=None, tolerancia=1e-6, verbose=True):
+    """
+    Resuelve el Modelo 3 con recetas sobre 'catalogo' generando solo las recetas que
+    mejoran la relajación lineal. En cada iteración se añaden como mucho 'por_iteracion'
+    recetas por franja (las de menor coste reducido). Si el modelo restringido es
+    infactible (cada receta se repite como mucho 2 veces por semana y con 2 días de
+    separación) se amplía con las siguientes recetas más baratas de cada franja.
+    Si se llega a max_iteraciones sin converger, el problema entero se resuelve con todas
+    las recetas generadas hasta entonces (sin garantía de que la cota lineal lo sea del
+    catálogo completo).
+    Devuelve un diccionario con las recetas generadas, el historial de iteraciones, la cota
+    lineal, el modelo final y su solución.
+    """
+    # Subconjunto inicial: las recetas más baratas de cada franja
+    por_coste = {}
+    for j, lista in catalogo.items():
+        costes = [(coste_minimo(receta, j, perfil), r) for r, receta in enumerate(lista)]
+        por_coste[j] = [r for c, r in sorted((c, r) for c, r in costes if c is not None)]
+    subconjunto = {j: orden[:iniciales] for j, orden in por_coste.items()}
+    n_iniciales = iniciales
+
+    historial = []
+    inicio_total = time.perf_counter()
+    for iteracion in range(1, max_iteraciones + 1):
+        inicio = time.perf_counter()
+        recetas = {j: [catalogo[j][r] for r in subconjunto[j]] for j in catalogo}
+        model, variables = m3r.construir_modelo(dias, perfil, recetas)
+        model.update()
+        relajacion = resolver(model.relax(), resolutor)
+        if relajacion.estado == "infactible" and any(len(v) > n_iniciales for v in por_coste.values()):
+            n_iniciales += iniciales
+            subconjunto = {j: list(dict.fromkeys(por_coste[j][:n_iniciales] + subconjunto[j])) for j in catalogo}
+            if verbose:
+                print(f"  Iteración {iteracion}: modelo restringido infactible, "
+                      f"se parte de {n_iniciales} recetas por franja")
+            continue
+        if relajacion.pi is None:
+            raise RuntimeError(f"La relajación del modelo restringido no tiene duales ({relajacion.estado}).")
+        duales = relajacion.dual(variables["filas"])
+
+        # Coste reducido de cada receta que no está en el modelo (el mínimo de los días)
+        nuevas = {}
+        for j, lista in catalogo.items():
+            presentes = set(subconjunto[j])
+            candidatas = []
+            for r, receta in enumerate(lista):
+                if r in presentes:
+                    continue
+                costes = [coste_reducido(receta, j, d, duales, perfil) for d in dias]
+                if costes[0] is not None and min(costes) < -tolerancia:
+                    candidatas.append((min(costes), r))
+            nuevas[j] = [r for c, r in sorted(candidatas)[:por_iteracion]]
+
+        añadidas = sum(len(v) for v in nuevas.values())
+        historial.append({"iteracion": iteracion, "objetivo_lp": relajacion.objetivo, "añadidas": añadidas,
+                          "variables": model.NumVars, "tiempo": time.perf_counter() - inicio})
+        if verbose:
+            print(f"  Iteración {iteracion}: relajación {relajacion.objetivo:.4f} €, "
+                  f"{model.NumVars} variables, {añadidas} recetas añadidas ({historial[-1]['tiempo']:.1f} s)")
+        if añadidas == 0:
+            break
+        for j in catalogo:
+            subconjunto[j] += nuevas[j]
+    else:
+        if not historial:
+            raise RuntimeError(f"El modelo restringido sigue siendo infactible tras {max_iteraciones} iteraciones "
+                               f"({n_iniciales} recetas iniciales por franja).")
+        # Sin convergencia: el modelo entero incluye también las últimas recetas añadidas
+        recetas = {j: [catalogo[j][r] for r in subconjunto[j]] for j in catalogo}
+        model, variables = m3r.construir_modelo(dias, perfil, recetas)
+        model.update()
+
+    # Problema entero final sobre las recetas generadas
+    inicio = time.perf_counter()
+    solucion = resolver(model, resolutor, limite_tiempo=limite_tiempo)
+    return {
+        "subconjunto": subconjunto,
+        "recetas": recetas,
+        "historial": historial,
+        "convergido": historial[-1]["añadidas"] == 0,
+        "cota_lp": historial[-1]["objetivo_lp"],
+        "model": model,
+        "variables": variables,
+        "solucion": solucion,
+        "tiempo_entero": time.perf_counter() - inicio,
+        "tiempo_total": time.perf_counter() - inicio_total,
+    }
+
+
+def resolver_completo(catalogo, dias, perfil=PERFIL_BASE, resolutor="highs", limite_tiempo=None):
+    """
+    Resuelve la enumeración completa del catálogo (relajación lineal y problema entero).
+    """
+    inicio = time.perf_counter()
+    model, variables = m3r.construir_modelo(dias, perfil, catalogo)
+    model.update()
+    relajacion = resolver(model.relax(), resolutor)
+    solucion = resolver(model, resolutor, limite_tiempo=limite_tiempo)
+    return {"variables": model.NumVars, "cota_lp": relajacion.objetivo, "solucion": solucion,
+            "tiempo_total": time.perf_counter() - inicio}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve el Modelo 3 con recetas por generación de columnas.")
+    parser.add_argument("--recetas", default="recetas.json", help="catálogo de recetas (formato de recetas.json)")
+    parser.add_argument("--variantes", type=int, default=0,
+                        help="amplía el catálogo con N variantes de cada receta (catálogo de prueba)")
+    parser.add_argument("--dias", type=int, default=7, help="número de días del horizonte")
+    parser.add_argument("--iniciales", type=int, default=4, help="recetas iniciales por franja")
+    parser.add_argument("--por-iteracion", type=int, default=5, help="recetas añadidas por franja en cada iteración")
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="highs",
+                        help="resolutor (el modelo restringido ya supera el tamaño de la licencia limitada de Gurobi)")
+    parser.add_argument("--limite", type=float, default=None, help="límite de tiempo del problema entero (s)")
+    parser.add_argument("--comparar", action="store_true", help="resuelve también la enumeración completa")
+    args = parser.parse_args()
+
+    catalogo = cargar_recetas(args.recetas)
+    if args.variantes:
+        catalogo = ampliar_catalogo(catalogo, args.variantes)
+    dias = generar_dias(args.dias)
+    total_recetas = sum(len(lista) for lista in catalogo.values())
+    print(f"Catálogo: {total_recetas} recetas ({', '.join(f'{j} {len(v)}' for j, v in catalogo.items())})")
+
+    resultado = generar_columnas(catalogo, dias, iniciales=args.iniciales, por_iteracion=args.por_iteracion,
+                                 resolutor=args.resolutor, limite_tiempo=args.limite)
+    generadas = sum(len(v) for v in resultado["subconjunto"].values())
+    iniciales = generadas - sum(it["añadidas"] for it in resultado["historial"])
+    solucion = resultado["solucion"]
+
+    print(f"\nRecetas en el modelo: {generadas} de {total_recetas} ({iniciales} iniciales y "
+          f"{generadas - iniciales} generadas en {len(resultado['historial'])} iteraciones)")
+    print(f"Columnas X[j, r, d] generadas: {(generadas - iniciales) * len(dias)} "
+          f"(de {total_recetas * len(dias)} en la enumeración completa)")
+    convergencia = "cota del catálogo completo" if resultado["convergido"] else "sin convergencia"
+    print(f"Relajación lineal: {resultado['cota_lp']:.4f} € ({convergencia})")
+    if solucion.tiene_solucion:
+        gap = (solucion.objetivo - resultado["cota_lp"]) / solucion.objetivo
+        if resultado["convergido"]:
+            referencia = f"como mucho un {gap:.2%} por encima del óptimo de la enumeración completa"
+        else:
+            # Sin convergencia la relajación es la del modelo restringido, no una cota del óptimo
+            referencia = f"un {gap:.2%} por encima de la relajación lineal del modelo restringido"
+        print(f"Problema entero: {solucion.objetivo:.2f} € ({solucion.estado}), {referencia}")
+        ruta = "Resultados/dieta_optima_Modelo3_recetas_columnas"
+        plan = m3r.extraer_resultado(resultado["variables"], solucion.valor, dias, resultado["recetas"],
+                                     metadatos_solucion(solucion, "Modelo3_recetas"))
+        plan.guardar(ruta)
+    else:
+        print(f"Problema entero: sin solución ({solucion.estado})")
+    print(f"Tiempo total: {resultado['tiempo_total']:.1f} s (problema entero {resultado['tiempo_entero']:.1f} s)")
+
+    if args.comparar:
+        completo = resolver_completo(catalogo, dias, resolutor=args.resolutor, limite_tiempo=args.limite)
+        print(f"\nEnumeración completa: {completo['variables']} variables "
+              f"(generación de columnas: {resultado['model'].NumVars}), relajación {completo['cota_lp']:.4f} €")
+        if completo["solucion"].tiene_solucion:
+            print(f"Problema entero: {completo['solucion'].objetivo:.2f} € ({completo['solucion'].estado}), "
+                  f"{completo['tiempo_total']:.1f} s")
+            if solucion.tiene_solucion:
+                diferencia = (solucion.objetivo - completo["solucion"].objetivo) / completo["solucion"].objetivo
+                print(f"Diferencia de coste de la generación de columnas: {diferencia:+.2%}")
+        else:
+            print(f"Problema entero: sin solución ({completo['solucion'].estado})")
+    if solucion.tiene_solucion:
+        print(f"\nDieta guardada en '{ruta}.txt' (datos en '{ruta}.json' y '{ruta}.npz')")
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo define el horizonte de planificación de los modelos semanales.
+
+Los días se identifican por su número absoluto ("1", "2", ...). Los límites semanales
+de repetición se aplican a cada bloque de 7 días (días 1-7, 8-14, ...), mientras que las
+restricciones de separación entre días se aplican sobre ventanas deslizantes de 3 días
+consecutivos a lo largo de todo el horizonte, también entre una semana y la siguiente.
+"""
+
+# Número de días de cada bloque al que se aplican los límites semanales
+DIAS_SEMANA = 7
+
+
+def generar_dias(n_dias=DIAS_SEMANA, primer_dia=1):
+    """
+    Devuelve las etiquetas de n_dias días consecutivos empezando en primer_dia.
+    """
+    return [str(d) for d in range(primer_dia, primer_dia + n_dias)]
+
+
+def semana(d):
+    """
+    Devuelve el número de bloque semanal (empezando en 0) al que pertenece el día d.
+    """
+    return (int(d) - 1) // DIAS_SEMANA
+
+
+def bloques_semanales(dias):
+    """
+    Agrupa los días en bloques semanales de 7 días según su número absoluto.
+    Si el horizonte no empieza o no termina en una semana completa, el primer o el último
+    bloque es parcial y conserva el mismo límite semanal.
+    """
+    bloques = {}
+    for d in dias:
+        bloques.setdefault(semana(d), []).append(d)
+    return list(bloques.values())
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script resuelve el Modelo 3 con alimentos para planes de varias semanas con un
+horizonte rodante.
+
+En lugar de resolver un único modelo con todos los días, se resuelve una semana cada vez
+(más unos días de solape con la semana siguiente, que no se fijan) y se fija la solución
+de los días de la semana. Para que las reglas de repetición del Modelo 3 se cumplan
+también entre semanas, cada subproblema recibe:
+    - el uso Z[i, d] de los dos últimos días ya fijados, que entra en las ventanas de
+      separación de 3 días que cruzan la frontera, y
+    - lo que queda del límite semanal de repetición de cada alimento (y de legumbres y
+      azúcares) si el subproblema empieza a mitad de un bloque semanal.
+
+El resultado es un único plan con todos los días. Si el modelo completo es abordable se
+resuelve también para dar la diferencia de coste entre ambos. Los subproblemas y el modelo
+completo se resuelven con cualquiera de los resolutores de resolutores.py (--resolutor).
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import Modelo3_alimentos as m3
+from perfil import PERFIL_BASE
+from resolutores import RESOLUTORES, resolver
+from resultados import Resultado
+from horizonte import DIAS_SEMANA, generar_dias, bloques_semanales, semana
+
+# Cantidad (g) por debajo de la cual un alimento se considera no usado (ruido del resolutor)
+TOLERANCIA = 1e-6
+
+
+def indices_repeticion():
+    """
+    Índices de los alimentos sujetos a cada regla de repetición del Modelo 3.
+    """
+    codigos = np.asarray(m3.cat.categoria)
+    limitados = np.flatnonzero(np.isin(codigos, list(m3.categorias_permitida)))
+    libres = np.flatnonzero([i not in m3.alimentos_repetir for i in m3.data])
+    legumbres = [m3.data[i] for i in m3.legumbres]
+    azucares = [m3.data[i] for i in m3.azúcares]
+    return limitados, libres, legumbres, azucares
+
+
+def añadir_frontera(model, Z, dias, usos_previos):
+    """
+    Añade al subproblema las restricciones que dependen de los días ya fijados.
+
+    usos_previos es un diccionario día -> array 0/1 con el uso Z de cada alimento en los
+    días ya resueltos (basta con los dos últimos y con los de la semana en curso).
+    """
+    limitados, libres, legumbres, azucares = indices_repeticion()
+    n = len(m3.cat)
+    primero = int(dias[0])
+    z2 = usos_previos.get(str(primero - 2), np.zeros(n))
+    z1 = usos_previos.get(str(primero - 1), np.zeros(n))
+
+    # Ventanas de separación que cruzan la frontera: (d-2, d-1, d) y (d-1, d, d+1)
+    for idx, tope in ((limitados, 1), (libres, 2)):
+        model.addConstr(Z[idx, 0] <= tope - z2[idx] - z1[idx])
+        if len(dias) >= 2:
+            model.addConstr(Z[idx, 0] + Z[idx, 1] <= tope - z1[idx])
+
+    # Límite semanal restante del bloque en el que empieza el subproblema
+    bloque = bloques_semanales(dias)[0]
+    anteriores = [d for d, z in usos_previos.items()
+                  if semana(d) == semana(bloque[0]) and int(d) < primero]
+    if anteriores:
+        usados = sum(usos_previos[d] for d in anteriores)
+        cols = slice(0, len(bloque))
+        model.addConstr(Z[limitados, cols].sum(axis=1) <= 2 - usados[limitados])
+        model.addConstr(Z[libres, cols].sum(axis=1) <= 4 - usados[libres])
+        model.addConstr(Z[legumbres, cols].sum() <= 3 - usados[legumbres].sum())
+        model.addConstr(Z[azucares, cols].sum() <= 2 - usados[azucares].sum())
+
+
+def resolver_horizonte_rodante(n_dias, paso=DIAS_SEMANA, solape=2, limite_tiempo=None, verbose=False,
+                               perfil=PERFIL_BASE, resolutor="gurobi"):
+    """
+    Resuelve el Modelo 3 con alimentos para n_dias días por horizonte rodante.
+    Cada subproblema fija 'paso' días y mira 'solape' días más allá.
+    Devuelve un diccionario con el plan completo, el coste y los tiempos de cada subproblema.
+    """
+    cantidades = {}
+    usos_previos = {}
+    coste = 0.0
+    tiempos = []
+
+    inicio_total = time.perf_counter()
+    for primer_dia in range(1, n_dias + 1, paso):
+        fijados = min(paso, n_dias - primer_dia + 1)
+        dias = generar_dias(min(fijados + solape, n_dias - primer_dia + 1), primer_dia)
+
+        inicio = time.perf_counter()
+        model, variables = m3.construir_modelo_matricial(dias, perfil)
+        añadir_frontera(model, variables["Z"], dias, usos_previos)
+        solucion = resolver(model, resolutor, limite_tiempo=limite_tiempo, verbose=verbose)
+        if not solucion.tiene_solucion:
+            raise RuntimeError(f"No se encontró solución para el subproblema que empieza el día {primer_dia} "
+                               f"({solucion.estado}).")
+
+        # Fijar los días del paso y guardar su uso para los subproblemas siguientes
+        X = m3.densificar(solucion.valor(variables["X"]), variables["admisible"])
+        X[X <= TOLERANCIA] = 0.0
+        Z = (solucion.valor(variables["Z"]) > 0.5).astype(float)
+        for b, d in enumerate(dias[:fijados]):
+            for k in np.flatnonzero(X[:, :, b].sum(axis=1) > 0):
+                for a, j in enumerate(m3.franjas):
+                    if X[k, a, b] > 0:
+                        cantidades[m3.cat.nombres[k], j, d] = float(X[k, a, b])
+            coste += float(m3.cat.precio @ X[:, :, b].sum(axis=1)) / 100
+            usos_previos[d] = Z[:, b]
+        tiempos.append(time.perf_counter() - inicio)
+
+        # Solo hacen falta los dos últimos días y los de la semana en curso
+        ultimo = int(dias[fijados - 1])
+        usos_previos = {d: z for d, z in usos_previos.items()
+                        if int(d) > ultimo - 2 or semana(d) == semana(str(ultimo + 1))}
+
+    return {
+        "dias": generar_dias(n_dias),
+        "cantidades": cantidades,
+        "coste": coste,
+        "tiempos": tiempos,
+        "tiempo_total": time.perf_counter() - inicio_total,
+    }
+
+
+def resolver_monolitico(n_dias, limite_tiempo=None, verbose=False, perfil=PERFIL_BASE, resolutor="gurobi"):
+    """
+    Resuelve el modelo completo de n_dias días. Devuelve None si no encuentra solución.
+    """
+    inicio = time.perf_counter()
+    model, variables = m3.construir_modelo_matricial(generar_dias(n_dias), perfil)
+    solucion = resolver(model, resolutor, limite_tiempo=limite_tiempo, verbose=verbose)
+    if not solucion.tiene_solucion:
+        return None
+    return {
+        "coste": solucion.objetivo,
+        "cota": solucion.cota,
+        "optimo": solucion.estado == "optimo",
+        "tiempo_total": time.perf_counter() - inicio,
+    }
+
+
+def comprobar_repeticiones(cantidades, dias):
+    """
+    Comprueba sobre el plan completo los límites semanales y las ventanas de separación
+    del Modelo 3. Devuelve la lista de incumplimientos (vacía si el plan es válido).
+    """
+    limitados, libres, legumbres, azucares = indices_repeticion()
+    pos_dia = {d: b for b, d in enumerate(dias)}
+    Z = np.zeros((len(m3.cat), len(dias)))
+    for (i, j, d), cantidad in cantidades.items():
+        if cantidad > TOLERANCIA:
+            Z[m3.data[i], pos_dia[d]] = 1
+
+    errores = []
+    for bloque in bloques_semanales(dias):
+        cols = [pos_dia[d] for d in bloque]
+        for idx, tope in ((limitados, 2), (libres, 4)):
+            for k in idx[Z[np.ix_(idx, cols)].sum(axis=1) > tope]:
+                errores.append(f"{m3.cat.nombres[k]}: más de {tope} días en la semana {semana(bloque[0]) + 1}")
+        for nombre, idx, tope in (("legumbres", legumbres, 3), ("azúcares", azucares, 2)):
+            if Z[np.ix_(idx, cols)].sum() > tope:
+                errores.append(f"{nombre}: más de {tope} días en la semana {semana(bloque[0]) + 1}")
+    ventanas = Z[:, :-2] + Z[:, 1:-1] + Z[:, 2:]
+    for idx, tope in ((limitados, 1), (libres, 2)):
+        for k, b in zip(*np.nonzero(ventanas[idx] > tope)):
+            errores.append(f"{m3.cat.nombres[idx[k]]}: más de {tope} veces en los días {dias[b]}-{dias[b + 2]}")
+    return errores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve el Modelo 3 con alimentos por horizonte rodante.")
+    parser.add_argument("--semanas", type=int, default=4, help="número de semanas del plan")
+    parser.add_argument("--solape", type=int, default=2, help="días de la semana siguiente incluidos sin fijar")
+    parser.add_argument("--limite", type=float, default=None, help="límite de tiempo por subproblema (s)")
+    parser.add_argument("--comparar", action="store_true", help="resuelve también el modelo completo")
+    parser.add_argument("--limite-completo", type=float, default=600, help="límite de tiempo del modelo completo (s)")
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="gurobi",
+                        help="resolutor (highs y scipy no necesitan licencia de Gurobi)")
+    args = parser.parse_args()
+    n_dias = args.semanas * DIAS_SEMANA
+
+    resultado = resolver_horizonte_rodante(n_dias, solape=args.solape, limite_tiempo=args.limite,
+                                           resolutor=args.resolutor)
+    dias = resultado["dias"]
+
+    # Guardar el plan completo (ver resultados.py)
+    ruta = f"Resultados/dieta_optima_Modelo3_alimentos_{n_dias}dias_rodante"
+    cantidades = resultado["cantidades"]
+    registros = ((d, j, None, i, cantidades[i, j, d]) for d in dias for j in m3.franjas for i in m3.data
+                 if (i, j, d) in cantidades)
+    metadatos = {"modelo": "Modelo3_alimentos", "perfil": PERFIL_BASE["nombre"], "resolutor": args.resolutor,
+                 "estado": "horizonte_rodante", "coste": resultado["coste"], "cota": None,
+                 "tiempo": resultado["tiempo_total"], "dias": dias}
+    Resultado.desde_registros(registros, metadatos).guardar(ruta)
+
+    print(f"\nHorizonte rodante: {args.semanas} semanas, coste {resultado['coste']:.2f} €, "
+          f"{resultado['tiempo_total']:.1f} s")
+    for s, t in enumerate(resultado["tiempos"], start=1):
+        print(f"  Semana {s}: {t:.1f} s")
+    errores = comprobar_repeticiones(resultado["cantidades"], dias)
+    print("Reglas de repetición:", "se cumplen" if not errores else f"{len(errores)} incumplimientos")
+    for error in errores:
+        print("  -", error)
+
+    if args.comparar:
+        completo = resolver_monolitico(n_dias, limite_tiempo=args.limite_completo, resolutor=args.resolutor)
+        if completo is None:
+            print(f"\nModelo completo: sin solución en {args.limite_completo:.0f} s")
+        else:
+            diferencia = (resultado["coste"] - completo["coste"]) / completo["coste"]
+            print(f"\nModelo completo: coste {completo['coste']:.2f} € "
+                  f"({'óptimo' if completo['optimo'] else 'no óptimo'}, cota {completo['cota']:.2f} €), "
+                  f"{completo['tiempo_total']:.1f} s")
+            print(f"Diferencia de coste del horizonte rodante: {diferencia:+.2%}")
+    print(f"\nDieta guardada en '{ruta}.txt' (datos en '{ruta}.json' y '{ruta}.npz')")
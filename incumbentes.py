@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo publica las soluciones enteras que va encontrando Gurobi mientras resuelve
+los modelos semanales, sin esperar a que se alcance el MIPGap.
+
+FlujoIncumbentes es un callback que, cada vez que Gurobi encuentra una solución mejor
+(MIPSOL), escribe una línea JSON en un fichero, en una tubería o en la salida estándar:
+
+    {"evento": "incumbente", "modelo": ..., "n": 1, "objetivo": ..., "cota": ...,
+     "gap": ..., "tiempo": ..., "plan": [{"dia": "1", "franja": ..., "alimento": ...,
+     "gramos": ..., "coste": ...}, ...]}
+
+y al terminar una línea {"evento": "fin", ...} con el estado final. El plan tiene el
+mismo formato que los registros de resultados.py, así que quien lo consume (la generación
+de menús, la interfaz) puede empezar con el primer plan bueno y sustituirlo cuando llegue
+uno mejor. ultimo_incumbente() devuelve el último plan de un fichero como Resultado.
+
+Con el destino "-" la salida estándar queda reservada para el JSONL: el resto de la salida
+del proceso (print, el log de Gurobi y su aviso de licencia) pasa a stderr, así que el
+flujo debe crearse antes de construir el primer modelo. Si la resolución falla, el
+registro final tiene el estado "error"; un plan recuperado de la caché se publica como
+único incumbente seguido del registro final (con "cache": true).
+"""
+
+import json
+import os
+import sys
+
+from gurobipy import GRB
+
+from resolutores import estado_gurobi
+from resultados import CATEGORICAS, Resultado, lector_callback
+
+
+class FlujoIncumbentes:
+    """
+    Callback de Gurobi que escribe cada nueva solución entera como una línea JSON.
+    destino es una ruta, "-" para la salida estándar o un fichero ya abierto; extraer
+    convierte la solución en un Resultado a partir de una función de lectura de valores
+    (ver lector_callback) y también se puede indicar al resolver (ver optimizar).
+    """
+
+    def __init__(self, destino, modelo, extraer=None):
+        self.modelo = modelo
+        self.extraer = extraer
+        self.n = 0
+        self.mejor = None
+        if destino == "-":
+            self.fichero, self.propio = reservar_salida_estandar(), True
+        elif isinstance(destino, str):
+            self.fichero, self.propio = open(destino, "w", encoding="utf-8"), True
+        else:
+            self.fichero, self.propio = destino, False
+
+    def __call__(self, model, where):
+        if where != GRB.Callback.MIPSOL:
+            return
+        objetivo = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+        # Gurobi también avisa de soluciones que no mejoran la mejor conocida
+        if self.mejor is not None and objetivo >= self.mejor - 1e-9:
+            return
+        self.mejor = objetivo
+        self.n += 1
+        cota = model.cbGet(GRB.Callback.MIPSOL_OBJBND)
+        resultado = self.extraer(lector_callback(model))
+        self._escribir({
+            "evento": "incumbente",
+            "modelo": self.modelo,
+            "n": self.n,
+            "objetivo": objetivo,
+            "cota": cota,
+            "gap": _gap(objetivo, cota),
+            "tiempo": model.cbGet(GRB.Callback.RUNTIME),
+            "plan": resultado.registros(),
+        })
+
+    def optimizar(self, model, extraer=None, callback=None):
+        """
+        Resuelve el modelo publicando cada incumbente (y llamando también a callback, si se
+        indica) y escribe el registro final y cierra el destino aunque la resolución falle.
+        """
+        if extraer is not None:
+            self.extraer = extraer
+
+        def llamada(model, where):
+            if callback is not None:
+                callback(model, where)
+            self(model, where)
+
+        error = None
+        try:
+            model.optimize(llamada)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.cerrar(model, error)
+
+    def cerrar(self, model, error=None):
+        """
+        Escribe el registro final con el estado de la resolución (o el error con el que
+        terminó) y cierra el destino.
+        """
+        registro = {"evento": "fin", "modelo": self.modelo, "soluciones": self.n}
+        if error is not None:
+            registro.update(estado="error", error=str(error))
+        else:
+            registro.update(estado=estado_gurobi(model), tiempo=model.Runtime)
+            if model.SolCount > 0:
+                registro.update(objetivo=model.ObjVal, cota=model.ObjBound, gap=model.MIPGap)
+        self._escribir(registro)
+        self._cerrar_destino()
+
+    def publicar_resultado(self, resultado):
+        """
+        Publica un plan ya resuelto (por ejemplo, recuperado de la caché) como único
+        incumbente, escribe el registro final y cierra el destino.
+        """
+        metadatos = resultado.metadatos
+        objetivo, cota = metadatos.get("coste"), metadatos.get("cota")
+        gap = _gap(objetivo, cota) if objetivo is not None and cota is not None else None
+        self.n = 1
+        self._escribir({"evento": "incumbente", "modelo": self.modelo, "n": 1, "objetivo": objetivo,
+                        "cota": cota, "gap": gap, "tiempo": 0.0, "plan": resultado.registros(), "cache": True})
+        self._escribir({"evento": "fin", "modelo": self.modelo, "soluciones": 1, "estado": metadatos.get("estado"),
+                        "tiempo": 0.0, "objetivo": objetivo, "cota": cota, "gap": gap, "cache": True})
+        self._cerrar_destino()
+
+    def _escribir(self, registro):
+        self.fichero.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self.fichero.flush()
+
+    def _cerrar_destino(self):
+        if self.propio:
+            self.fichero.close()
+
+
+def reservar_salida_estandar():
+    """
+    Devuelve un fichero abierto sobre la salida estándar del proceso y redirige el
+    descriptor 1 a stderr, para que nada más (print, el log de Gurobi) se mezcle con el JSONL.
+    """
+    sys.stdout.flush()
+    salida = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    return salida
+
+
+def _gap(objetivo, cota):
+    """
+    Gap relativo con la definición de Gurobi: |objetivo - cota| / |objetivo|.
+    """
+    if objetivo == 0:
+        return 0.0 if cota == 0 else float("inf")
+    return abs(objetivo - cota) / abs(objetivo)
+
+
+def ultimo_incumbente(ruta):
+    """
+    Devuelve el último plan escrito en un fichero de incumbentes como Resultado (con el
+    objetivo, la cota, el gap y el tiempo en los metadatos), o None si aún no hay ninguno.
+    Las líneas incompletas (el fichero se está escribiendo) se ignoran.
+    """
+    ultimo = None
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                continue
+            if registro.get("evento") == "incumbente":
+                ultimo = registro
+    if ultimo is None:
+        return None
+    metadatos = {"modelo": ultimo["modelo"], "estado": "incumbente", "coste": ultimo["objetivo"],
+                 "cota": ultimo["cota"], "gap": ultimo["gap"], "tiempo": ultimo["tiempo"]}
+    registros = ((*(r.get(c) for c in CATEGORICAS), r["gramos"]) for r in ultimo["plan"])
+    return Resultado.desde_registros(registros, metadatos)
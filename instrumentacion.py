@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo mide dónde se va el tiempo y la memoria en cada modelo, para seguir su
+evolución cuando crece el catálogo.
+
+Cada modelo se mide en un proceso independiente y por fases:
+    - importacion:   importar gurobipy,
+    - carga:         importar el modelo (lectura de alimentos.json, recetas.json y el catálogo),
+    - construccion:  construir el modelo, con subfases marcadas en los constructores con
+                     hito() (indices, variables, restricciones),
+    - presolve:      presolve de Gurobi (solo para medir las reducciones),
+    - optimizacion:  resolver el modelo,
+    - escritura:     extraer el resultado y guardarlo (ver resultados.py).
+De cada fase se guarda el tiempo, la memoria residente (RSS) al empezar y al terminar y
+el pico de RSS durante la fase (en Linux el pico se reinicia al empezar cada fase).
+Además se guardan las estadísticas del modelo (variables, binarias, restricciones, no
+ceros y reducciones del presolve) y de la resolución (estado, unidades de trabajo, nodos,
+iteraciones y gap final).
+
+La salida es un JSON con una entrada por modelo y, opcionalmente, un fichero en formato
+de texto de Prometheus. Con --perfil-construccion se guarda además un volcado de cProfile
+de la fase de construcción de cada modelo (se abre con pstats o snakeviz).
+
+Los constructores llaman a hito() en todo caso; si no hay ninguna medición activa no hace nada.
+
+Uso: python instrumentacion.py [--modelos Modelo1 Modelo2 ...] [--dias 7] [--limite 60]
+                               [--salida Resultados/instrumentacion.json] [--prometheus fichero.prom]
+                               [--perfil-construccion directorio]
+"""
+
+import argparse
+import cProfile
+import importlib
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+MODELOS = ["Modelo1", "Modelo2", "Modelo3_alimentos", "Modelo3_recetas"]
+DIRECTORIO = "Resultados/instrumentacion"
+
+# Medición activa en este proceso (la usa hito())
+_activa = None
+
+
+def _memoria_proc(campo):
+    """
+    Valor en bytes de un campo de /proc/self/status (VmRSS, VmHWM) o None si no existe.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            encontrado = re.search(rf"^{campo}:\s+(\d+) kB", f.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(encontrado.group(1)) * 1024 if encontrado else None
+
+
+def rss_actual():
+    return _memoria_proc("VmRSS")
+
+
+def pico_rss():
+    """
+    Pico de memoria residente del proceso en bytes (desde el último reinicio del pico).
+    """
+    pico = _memoria_proc("VmHWM")
+    if pico is None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return pico
+
+
+def _reiniciar_pico():
+    """
+    Reinicia el pico de RSS del proceso (Linux 4.0 o posterior). Si no se puede, el pico
+    de cada fase es el pico del proceso hasta ese momento.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class Instrumentacion:
+    """
+    Registro de las fases de una ejecución: tiempo, RSS y pico de RSS de cada una.
+    """
+
+    def __init__(self):
+        self.fases = []
+        self._actual = None
+        self._ultimo_hito = None
+
+    @contextmanager
+    def fase(self, nombre, perfilador=None):
+        """
+        Mide el bloque como una fase. Si se indica un perfilador (cProfile.Profile), se
+        activa solo durante la fase.
+        """
+        global _activa
+        anterior, _activa = _activa, self
+        reiniciado = _reiniciar_pico()
+        registro = {"fase": nombre, "rss_inicio": rss_actual(), "pico_reiniciado": reiniciado}
+        self.fases.append(registro)
+        self._actual = registro
+        inicio = self._ultimo_hito = time.perf_counter()
+        if perfilador is not None:
+            perfilador.enable()
+        try:
+            yield registro
+        finally:
+            if perfilador is not None:
+                perfilador.disable()
+            registro["segundos"] = time.perf_counter() - inicio
+            registro["rss_fin"] = rss_actual()
+            registro["pico_rss"] = pico_rss()
+            self._actual = None
+            _activa = anterior
+
+    def hito(self, nombre):
+        """
+        Cierra una subfase de la fase actual: el tiempo desde el hito anterior (o desde
+        el inicio de la fase) se atribuye a 'fase/nombre'.
+        """
+        if self._actual is None:
+            return
+        ahora = time.perf_counter()
+        self.fases.append({"fase": f"{self._actual['fase']}/{nombre}", "segundos": ahora - self._ultimo_hito,
+                           "rss_fin": rss_actual()})
+        self._ultimo_hito = ahora
+
+
+def hito(nombre):
+    """
+    Marca el final de una subfase en la medición activa (no hace nada si no hay ninguna).
+    """
+    if _activa is not None:
+        _activa.hito(nombre)
+
+
+def estadisticas_modelo(model):
+    """
+    Tamaño del modelo ya construido.
+    """
+    model.update()
+    return {
+        "variables": model.NumVars,
+        "binarias": model.NumBinVars,
+        "enteras": model.NumIntVars,
+        "restricciones": model.NumConstrs,
+        "no_ceros": model.NumNZs,
+    }
+
+
+def estadisticas_presolve(model):
+    """
+    Reducciones del presolve de Gurobi (filas, columnas y no ceros eliminados).
+    """
+    import gurobipy as gp
+
+    try:
+        reducido = model.presolve()
+    except gp.GurobiError as e:
+        return {"error": str(e)}
+    estadisticas = {
+        "filas_eliminadas": model.NumConstrs - reducido.NumConstrs,
+        "columnas_eliminadas": model.NumVars - reducido.NumVars,
+        "no_ceros_eliminados": model.NumNZs - reducido.NumNZs,
+    }
+    reducido.dispose()
+    return estadisticas
+
+
+def estadisticas_resolucion(model):
+    """
+    Resultado y esfuerzo de la última resolución de Gurobi.
+    """
+    from resolutores import estado_gurobi
+
+    estadisticas = {
+        "estado": estado_gurobi(model),
+        "tiempo": model.Runtime,
+        "trabajo": model.Work,
+        "iteraciones": model.IterCount,
+        "nodos": model.NodeCount if model.IsMIP else 0,
+    }
+    if model.SolCount > 0:
+        estadisticas["objetivo"] = model.ObjVal
+        estadisticas["gap"] = model.MIPGap if model.IsMIP else 0.0
+    return estadisticas
+
+
+def medir(nombre, n_dias=7, limite=None, presolve=True, directorio=DIRECTORIO, perfil_construccion=None):
+    """
+    Mide todas las fases de un modelo en este proceso y devuelve el informe.
+    """
+    medida = Instrumentacion()
+    informe = {"modelo": nombre, "dias": n_dias if nombre.startswith("Modelo3") else None}
+
+    with medida.fase("importacion"):
+        import gurobipy as gp
+    with medida.fase("carga"):
+        modulo = importlib.import_module(nombre)
+        from horizonte import generar_dias
+        from resolutores import construir
+        from resultados import lector_gurobi, metadatos_gurobi
+
+    perfilador = cProfile.Profile() if perfil_construccion else None
+    with medida.fase("construccion", perfilador):
+        model, variables = construir(nombre, n_dias=n_dias)
+        model.update()
+    if perfilador is not None:
+        os.makedirs(perfil_construccion, exist_ok=True)
+        ruta = os.path.join(perfil_construccion, f"{nombre}_construccion.prof")
+        perfilador.dump_stats(ruta)
+        informe["perfil_construccion"] = ruta
+    informe["estadisticas"] = estadisticas_modelo(model)
+
+    model.setParam("OutputFlag", 0)
+    if presolve:
+        with medida.fase("presolve"):
+            informe["presolve"] = estadisticas_presolve(model)
+    if limite is not None:
+        model.setParam("TimeLimit", limite)
+    try:
+        with medida.fase("optimizacion"):
+            model.optimize()
+    except gp.GurobiError as e:
+        informe["resolucion"] = {"estado": "error", "mensaje": str(e)}
+    else:
+        informe["resolucion"] = estadisticas_resolucion(model)
+        if model.SolCount > 0:
+            with medida.fase("escritura"):
+                metadatos = metadatos_gurobi(model, nombre)
+                if nombre in ("Modelo1", "Modelo2"):
+                    resultado = modulo.extraer_resultado(variables, lector_gurobi(model), metadatos)
+                else:
+                    resultado = modulo.extraer_resultado(variables, lector_gurobi(model), generar_dias(n_dias),
+                                                         metadatos)
+                os.makedirs(directorio, exist_ok=True)
+                resultado.guardar(os.path.join(directorio, nombre))
+    informe["fases"] = medida.fases
+    return informe
+
+
+def medir_en_proceso(nombre, n_dias=7, limite=None, presolve=True, directorio=DIRECTORIO,
+                     perfil_construccion=None):
+    """
+    Mide un modelo en un proceso nuevo, para que la carga y la memoria no dependan de
+    los modelos medidos antes.
+    """
+    orden = [sys.executable, "-m", "instrumentacion", "--interno", "--modelos", nombre, "--dias", str(n_dias),
+             "--directorio", directorio]
+    if limite is not None:
+        orden += ["--limite", str(limite)]
+    if not presolve:
+        orden.append("--sin-presolve")
+    if perfil_construccion:
+        orden += ["--perfil-construccion", perfil_construccion]
+    salida = subprocess.run(orden, capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def _etiquetas(**valores):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in valores.items()) + "}"
+
+
+def prometheus(informes):
+    """
+    Convierte los informes al formato de texto de Prometheus (una métrica gauge por
+    medida, con el modelo y la fase como etiquetas).
+    """
+    metricas = {
+        "dieta_fase_segundos": ("Tiempo de cada fase (s)", []),
+        "dieta_fase_pico_rss_bytes": ("Pico de memoria residente durante la fase (bytes)", []),
+        "dieta_fase_rss_bytes": ("Memoria residente al terminar la fase (bytes)", []),
+        "dieta_modelo_tamano": ("Tamaño del modelo (variables, binarias, restricciones, no ceros)", []),
+        "dieta_presolve_eliminados": ("Filas, columnas y no ceros eliminados por el presolve", []),
+        "dieta_resolucion": ("Tiempo, trabajo, iteraciones, nodos, objetivo y gap de la resolución", []),
+    }
+    for informe in informes:
+        modelo = informe["modelo"]
+        for f in informe["fases"]:
+            etiquetas = _etiquetas(modelo=modelo, fase=f["fase"])
+            metricas["dieta_fase_segundos"][1].append((etiquetas, f["segundos"]))
+            if f.get("pico_rss") is not None:
+                metricas["dieta_fase_pico_rss_bytes"][1].append((etiquetas, f["pico_rss"]))
+            if f.get("rss_fin") is not None:
+                metricas["dieta_fase_rss_bytes"][1].append((etiquetas, f["rss_fin"]))
+        for clave, valor in informe["estadisticas"].items():
+            metricas["dieta_modelo_tamano"][1].append((_etiquetas(modelo=modelo, medida=clave), valor))
+        for clave, valor in informe.get("presolve", {}).items():
+            if isinstance(valor, (int, float)):
+                metricas["dieta_presolve_eliminados"][1].append((_etiquetas(modelo=modelo, medida=clave), valor))
+        for clave, valor in informe["resolucion"].items():
+            if isinstance(valor, (int, float)):
+                metricas["dieta_resolucion"][1].append((_etiquetas(modelo=modelo, medida=clave), valor))
+
+    lineas = []
+    for nombre, (ayuda, muestras) in metricas.items():
+        if not muestras:
+            continue
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} gauge"]
+        lineas += [f"{nombre}{etiquetas} {valor:.9g}" for etiquetas, valor in muestras]
+    return "\n".join(lineas) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempos por fase y estadísticas de los modelos.")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, default=MODELOS)
+    parser.add_argument("--dias", type=int, default=7, help="días del horizonte de los modelos semanales")
+    parser.add_argument("--limite", type=float, default=None, help="límite de tiempo de resolución (s)")
+    parser.add_argument("--sin-presolve", action="store_true", help="no mide las reducciones del presolve")
+    parser.add_argument("--salida", default="Resultados/instrumentacion.json", help="fichero JSON con los informes")
+    parser.add_argument("--prometheus", default=None, help="fichero de texto de Prometheus (opcional)")
+    parser.add_argument("--perfil-construccion", default=None,
+                        help="directorio donde guardar el cProfile de la construcción de cada modelo")
+    parser.add_argument("--directorio", default=DIRECTORIO, help="directorio de los resultados de cada modelo")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        # Modo interno: una única medida en este proceso. Se usa el módulo importado (no
+        # __main__) para que los hito() de los constructores vean la medición activa.
+        import instrumentacion
+
+        medida = instrumentacion.medir(args.modelos[0], args.dias, args.limite, not args.sin_presolve,
+                                       args.directorio, args.perfil_construccion)
+        print(json.dumps(medida))
+        sys.exit(0)
+
+    informes = []
+    print(f"{'Modelo':<20}{'Fase':<28}{'Tiempo (s)':>11}{'Pico RSS (MB)':>15}")
+    for nombre in args.modelos:
+        informe = medir_en_proceso(nombre, args.dias, args.limite, not args.sin_presolve, args.directorio,
+                                   args.perfil_construccion)
+        informes.append(informe)
+        for f in informe["fases"]:
+            pico = f"{f['pico_rss'] / 2**20:.1f}" if f.get("pico_rss") is not None else "-"
+            print(f"{nombre:<20}{f['fase']:<28}{f['segundos']:>11.3f}{pico:>15}")
+        e, r = informe["estadisticas"], informe["resolucion"]
+        gap = f"{r['gap']:.2%}" if "gap" in r else "-"
+        print(f"{'':<20}{e['variables']} variables ({e['binarias']} binarias), {e['restricciones']} restricciones, "
+              f"{e['no_ceros']} no ceros; {r['estado']}, trabajo {r.get('trabajo', 0):.2f}, "
+              f"{r.get('nodos', 0):.0f} nodos, gap {gap}")
+        if r["estado"] == "error":
+            print(f"{'':<20}Error al resolver: {r['mensaje']}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informes, f, ensure_ascii=False, indent=1)
+    print(f"\nInformes guardados en '{args.salida}'")
+    if args.prometheus:
+        with open(args.prometheus, "w", encoding="utf-8") as f:
+            f.write(prometheus(informes))
+        print(f"Métricas de Prometheus guardadas en '{args.prometheus}'")
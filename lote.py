@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script resuelve los modelos para un lote de perfiles de escaladores.
+
+Lee un fichero de perfiles (ver perfil.py) y resuelve cada modelo indicado para cada
+perfil en un conjunto de procesos. Los procesos abren el catálogo compilado con memoria
+mapeada (ver catalogo.py), de modo que todos comparten los mismos datos en memoria, y los
+hilos del resolutor se reparten entre ellos para no tener más hilos que núcleos.
+
+Cada resultado se escribe en cuanto termina como una línea JSON con el perfil, el modelo,
+el estado, el coste, el tiempo y el plan (los registros de resultados.py). Con
+--resolutor highs (o scipy) los modelos se resuelven con HiGHS y el lote no necesita
+licencia de Gurobi (ver resolutores.py).
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from catalogo import cargar_catalogo
+from horizonte import generar_dias
+from perfil import cargar_perfiles
+from resolutores import MODELOS, RESOLUTORES, construir, resolver
+
+
+def iniciar_proceso(modelos):
+    """
+    Prepara cada proceso del lote: desactiva la salida de Gurobi e importa los modelos
+    (y con ellos el catálogo) una sola vez por proceso.
+    """
+    import gurobipy as gp
+
+    gp.setParam("OutputFlag", 0)
+    for nombre in modelos:
+        importlib.import_module(nombre)
+
+
+def extraer_plan(nombre, variables, solucion, n_dias):
+    """
+    Devuelve el plan de la solución como lista de registros con el día, la franja,
+    la receta (solo Modelo 3 con recetas), el alimento, los gramos y el coste
+    (ver resultados.py).
+    """
+    modelo = importlib.import_module(nombre)
+    if nombre in ("Modelo1", "Modelo2"):
+        resultado = modelo.extraer_resultado(variables, solucion.valor)
+    else:
+        resultado = modelo.extraer_resultado(variables, solucion.valor, generar_dias(n_dias))
+    return resultado.registros()
+
+
+def resolver_perfil(nombre, perfil, n_dias, resolutor="gurobi", hilos=None, limite_tiempo=None):
+    """
+    Construye y resuelve un modelo para un perfil. Devuelve el registro del resultado;
+    cualquier error (del resolutor o de un perfil incorrecto) se registra con estado
+    "error" para este par (perfil, modelo) sin detener el resto del lote.
+    """
+    inicio = time.perf_counter()
+    registro = {"perfil": perfil.get("nombre"), "modelo": nombre, "resolutor": resolutor}
+    try:
+        model, variables = construir(nombre, perfil, n_dias)
+        solucion = resolver(model, resolutor, limite_tiempo=limite_tiempo, hilos=hilos)
+        registro["estado"] = solucion.estado
+        if solucion.tiene_solucion:
+            registro["coste"] = solucion.objetivo
+            registro["cota"] = solucion.cota
+            registro["plan"] = extraer_plan(nombre, variables, solucion, n_dias)
+    except Exception as e:
+        for campo in ("coste", "cota", "plan"):
+            registro.pop(campo, None)
+        registro.update(estado="error", mensaje=f"{type(e).__name__}: {e}")
+    registro["tiempo"] = time.perf_counter() - inicio
+    return registro
+
+
+def resolver_lote(perfiles, modelos, salida, procesos=None, hilos_totales=None, limite_tiempo=None,
+                  n_dias=7, resolutor="gurobi"):
+    """
+    Resuelve todos los pares (perfil, modelo) y escribe los resultados en 'salida' (JSONL)
+    a medida que terminan. Devuelve el número de resultados de cada estado.
+    """
+    hilos_totales = hilos_totales or os.cpu_count() or 1
+    procesos = max(1, min(procesos or hilos_totales, len(perfiles) * len(modelos)))
+    hilos = max(1, hilos_totales // procesos)
+
+    # Compilar el catálogo antes de lanzar los procesos para que todos abran la misma caché
+    cargar_catalogo()
+
+    estados = {}
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto,
+                             initializer=iniciar_proceso, initargs=(modelos,)) as pool, \
+            open(salida, "w", encoding="utf-8") as f:
+        tareas = {pool.submit(resolver_perfil, nombre, perfil, n_dias, resolutor, hilos, limite_tiempo):
+                  (perfil, nombre) for perfil in perfiles for nombre in modelos}
+        for tarea in as_completed(tareas):
+            try:
+                registro = tarea.result()
+            except Exception as e:
+                # El proceso que resolvía el par terminó de forma anómala
+                perfil, nombre = tareas[tarea]
+                registro = {"perfil": perfil.get("nombre"), "modelo": nombre, "resolutor": resolutor,
+                            "estado": "error", "mensaje": f"{type(e).__name__}: {e}", "tiempo": 0.0}
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            estados[registro["estado"]] = estados.get(registro["estado"], 0) + 1
+            coste = f"{registro['coste']:.2f} €" if "coste" in registro else "-"
+            print(f"  {registro['perfil']} / {registro['modelo']}: {registro['estado']}, {coste}, "
+                  f"{registro['tiempo']:.1f} s")
+    return estados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve los modelos para un lote de perfiles.")
+    parser.add_argument("perfiles", help="fichero de perfiles (JSON o JSONL)")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, default=MODELOS[:3],
+                        help="modelos a resolver para cada perfil")
+    parser.add_argument("--procesos", type=int, default=None, help="número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--hilos", type=int, default=None,
+                        help="hilos totales a repartir entre los procesos (por defecto, los núcleos disponibles)")
+    parser.add_argument("--limite", type=float, default=None, help="límite de tiempo por modelo (s)")
+    parser.add_argument("--dias", type=int, default=7, help="días del horizonte de los modelos semanales")
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="gurobi",
+                        help="resolutor (highs y scipy no necesitan licencia de Gurobi)")
+    parser.add_argument("--salida", default="Resultados/lote.jsonl", help="fichero JSONL de resultados")
+    args = parser.parse_args()
+
+    perfiles = cargar_perfiles(args.perfiles)
+    print(f"Resolviendo {len(args.modelos)} modelos para {len(perfiles)} perfiles...")
+    inicio = time.perf_counter()
+    estados = resolver_lote(perfiles, args.modelos, args.salida, args.procesos, args.hilos, args.limite, args.dias,
+                            args.resolutor)
+    resumen = ", ".join(f"{n} {estado}" for estado, n in sorted(estados.items()))
+    print(f"\nLote terminado en {time.perf_counter() - inicio:.1f} s ({resumen}).")
+    print(f"Resultados guardados en '{args.salida}'")
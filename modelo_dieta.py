@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo mantiene un modelo de dieta construido en memoria para hacer ajustes
+sucesivos sin reconstruirlo.
+
+ModeloDieta construye una sola vez el Modelo 2 o el Modelo 3 con alimentos (constructor
+matricial) y permite:
+    - cambiar el precio de un alimento (coeficiente de la función objetivo),
+    - cambiar la cantidad máxima de un alimento (coeficiente de Y en X <= máximo * Y),
+    - prohibir o volver a permitir un alimento (cotas superiores de X e Y),
+    - cambiar la fracción de calorías de una franja (lado derecho de las restricciones de
+      calorías y macronutrientes; el resto de franjas se reescala para sumar lo mismo).
+
+Cada ajuste modifica directamente el modelo de Gurobi y la siguiente resolución parte de
+la solución anterior (atributo Start), así que en una sesión de planificación con decenas
+de ajustes solo se paga una vez el tiempo de construcción.
+
+Uso: python modelo_dieta.py [--modelo Modelo2|Modelo3_alimentos] [--dias N]
+     (ejecuta una sesión de ejemplo y la compara con construir y resolver desde cero)
+"""
+
+import argparse
+import copy
+import importlib
+import time
+
+import numpy as np
+from gurobipy import GRB
+
+from catalogo import cargar_catalogo
+from horizonte import generar_dias
+from perfil import PERFIL_BASE
+from resultados import lector_gurobi, metadatos_gurobi
+
+MODELOS = ["Modelo2", "Modelo3_alimentos"]
+NUTRIENTES = ["calorias", "carbohidratos", "proteina", "grasa"]
+
+
+class ModeloDieta:
+    """
+    Modelo 2 o Modelo 3 con alimentos construido una vez y modificable con ajustes
+    incrementales (precio, cantidad máxima, alimentos prohibidos y reparto calórico).
+    """
+
+    def __init__(self, modelo="Modelo2", perfil=PERFIL_BASE, n_dias=7, verbose=False):
+        if modelo not in MODELOS:
+            raise ValueError(f"Modelo no soportado: {modelo} (disponibles: {', '.join(MODELOS)})")
+        self.nombre = modelo
+        self.modulo = importlib.import_module(modelo)
+        self.perfil = copy.deepcopy(perfil)
+        self.dias = generar_dias(n_dias) if modelo == "Modelo3_alimentos" else None
+
+        self.cat = cargar_catalogo()
+        self.precio = self.cat.precio.astype(float)
+        self.maximo = self.cat.maximo.astype(float)
+        self.prohibidos = set()
+        self.cambios = []
+
+        inicio = time.perf_counter()
+        if modelo == "Modelo2":
+            self.model, self.variables = self.modulo.construir_modelo(self.perfil)
+        else:
+            self.model, self.variables = self.modulo.construir_modelo_matricial(self.dias, self.perfil)
+        self.model.setParam("OutputFlag", int(verbose))
+        self.model.update()
+        self._indexar()
+        self.tiempo_construccion = time.perf_counter() - inicio
+        self.anterior = None
+
+    def _indexar(self):
+        """
+        Agrupa por alimento las variables X e Y y las filas de cantidad máxima, y por
+        (nutriente, franja) las filas de nutrientes, para aplicar los ajustes en bloque.
+        """
+        filas = self.variables["filas"]
+        franjas = self.modulo.franjas
+        self._x = {k: [] for k in range(len(self.cat))}
+        self._y = {k: [] for k in range(len(self.cat))}
+        self._maximo = {k: [] for k in range(len(self.cat))}
+        self._nutrientes = {}
+
+        if self.nombre == "Modelo2":
+            for (i, j), x in self.variables["X"].items():
+                k = self.cat.indice[i]
+                self._x[k].append(x)
+                self._y[k].append(self.variables["Y"][i, j])
+                self._maximo[k].append(filas["maximo", i, j])
+            for n in NUTRIENTES:
+                for sentido in ("min", "max"):
+                    clave = f"{n}_{sentido}"
+                    self._nutrientes[clave] = {j: [filas[clave, j]] for j in franjas}
+            return
+
+        # Constructor matricial: X, Y y la fila de cantidad máxima tienen dimensiones (par, día)
+        D = len(self.dias)
+        alimento_par = np.nonzero(self.variables["admisible"])[0]
+        X = self.variables["X"].tolist()
+        Y = self.variables["Y"].tolist()
+        maximo = filas["maximo"].tolist()
+        for p, k in enumerate(alimento_par.tolist()):
+            self._x[k].extend(X[p])
+            self._y[k].extend(Y[p])
+            self._maximo[k].extend(maximo[p * D:(p + 1) * D])
+        for n in NUTRIENTES:
+            for sentido in ("min", "max"):
+                clave = f"{n}_{sentido}"
+                bloque = filas[clave].tolist()
+                self._nutrientes[clave] = {j: bloque[a * D:(a + 1) * D] for a, j in enumerate(franjas)}
+
+    def _alimento(self, alimento):
+        k = self.cat.indice.get(alimento)
+        if k is None:
+            raise ValueError(f"Alimento desconocido: {alimento}")
+        return k
+
+    def cambiar_precio(self, alimento, precio):
+        """
+        Cambia el precio de un alimento (en las mismas unidades que alimentos.json).
+        """
+        k = self._alimento(alimento)
+        self.precio[k] = precio
+        self.model.setAttr("Obj", self._x[k], [precio / 100] * len(self._x[k]))
+        self.cambios.append(("precio", alimento, precio))
+
+    def limitar_maximo(self, alimento, gramos):
+        """
+        Cambia la cantidad máxima (g/día) de un alimento en cada franja en la que aparece.
+        """
+        k = self._alimento(alimento)
+        self.maximo[k] = gramos
+        for fila, y in zip(self._maximo[k], self._y[k]):
+            self.model.chgCoeff(fila, y, -gramos)
+        self.cambios.append(("maximo", alimento, gramos))
+
+    def prohibir(self, alimento):
+        """
+        Impide que el alimento aparezca en la dieta.
+        """
+        k = self._alimento(alimento)
+        self.prohibidos.add(alimento)
+        self.model.setAttr("UB", self._x[k], [0.0] * len(self._x[k]))
+        self.model.setAttr("UB", self._y[k], [0.0] * len(self._y[k]))
+        self.cambios.append(("prohibir", alimento, None))
+
+    def permitir(self, alimento):
+        """
+        Vuelve a permitir un alimento prohibido.
+        """
+        k = self._alimento(alimento)
+        self.prohibidos.discard(alimento)
+        self.model.setAttr("UB", self._x[k], [GRB.INFINITY] * len(self._x[k]))
+        self.model.setAttr("UB", self._y[k], [1.0] * len(self._y[k]))
+        self.cambios.append(("permitir", alimento, None))
+
+    def cambiar_reparto(self, franja, fraccion):
+        """
+        Fija la fracción de las calorías diarias de una franja. Las demás franjas se
+        reescalan proporcionalmente para que el total no cambie.
+        """
+        distr = self.perfil["distr_calorica"]
+        if franja not in distr:
+            raise ValueError(f"Franja desconocida: {franja}")
+        total = sum(distr.values())
+        resto = total - distr[franja]
+        if not 0 < fraccion < total or resto <= 0:
+            raise ValueError(f"La fracción de {franja} debe estar entre 0 y {total:g}.")
+        escala = (total - fraccion) / resto
+        for j in distr:
+            distr[j] = fraccion if j == franja else distr[j] * escala
+        self._actualizar_rhs()
+        self.cambios.append(("reparto", franja, fraccion))
+
+    def _actualizar_rhs(self):
+        """
+        Recalcula el lado derecho de las restricciones de calorías y macronutrientes con
+        el perfil actual.
+        """
+        kcal = {"min": self.perfil["kcal_min"], "max": self.perfil["kcal_max"]}
+        distr_macros = self.perfil["distr_macros"]
+        for clave, por_franja in self._nutrientes.items():
+            nutriente, sentido = clave.rsplit("_", 1)
+            for j, filas in por_franja.items():
+                rhs = self.perfil["distr_calorica"][j] * kcal[sentido]
+                if nutriente != "calorias":
+                    rhs *= distr_macros[nutriente][j]
+                self.model.setAttr("RHS", filas, [rhs] * len(filas))
+
+    def resolver(self, limite_tiempo=None):
+        """
+        Reoptimiza el modelo partiendo de la solución anterior (si la hay) y devuelve la
+        solución como Resultado (ver resultados.py), o None si no hay solución.
+        """
+        if limite_tiempo is not None:
+            self.model.setParam("TimeLimit", limite_tiempo)
+        self.model.update()
+        variables = self.model.getVars()
+        if self.anterior is not None:
+            # Solución anterior recortada a las cotas actuales (alimentos prohibidos)
+            ub = np.array(self.model.getAttr("UB", variables))
+            self.model.setAttr("Start", variables, np.minimum(self.anterior, ub).tolist())
+        self.model.optimize()
+        if self.model.SolCount == 0:
+            return None
+        self.anterior = np.array(self.model.getAttr("X", variables))
+
+        metadatos = metadatos_gurobi(self.model, self.nombre, self.perfil)
+        metadatos["cambios"] = [list(c) for c in self.cambios]
+        if self.dias is None:
+            resultado = self.modulo.extraer_resultado(self.variables, lector_gurobi(self.model), metadatos)
+        else:
+            resultado = self.modulo.extraer_resultado(self.variables, lector_gurobi(self.model), self.dias, metadatos)
+        # Coste de cada registro con los precios actuales, no con los del catálogo
+        precio = self.precio[[self.cat.indice[i] for i in resultado.categorias["alimento"]]]
+        if len(precio):
+            resultado.columnas["coste"] = resultado.columnas["gramos"] * precio[resultado.columnas["alimento"]] / 100
+        return resultado
+
+
+def construir_y_resolver(modelo, n_dias):
+    """
+    Tiempo de construir y resolver el modelo desde cero (sin ajustes).
+    """
+    inicio = time.perf_counter()
+    sesion = ModeloDieta(modelo, n_dias=n_dias)
+    sesion.resolver()
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sesión de ajustes incrementales sobre un modelo de dieta.")
+    parser.add_argument("--modelo", choices=MODELOS, default="Modelo2")
+    parser.add_argument("--dias", type=int, default=7, help="número de días del Modelo 3 con alimentos")
+    args = parser.parse_args()
+
+    frio = construir_y_resolver(args.modelo, args.dias)
+    print(f"Construir y resolver desde cero: {frio:.3f} s")
+
+    sesion = ModeloDieta(args.modelo, n_dias=args.dias)
+    resultado = sesion.resolver()
+    print(f"Construcción: {sesion.tiempo_construccion:.3f} s, primera resolución: {sesion.model.Runtime:.3f} s, "
+          f"coste {resultado.metadatos['coste']:.4f} €")
+
+    # Ajustes de ejemplo, como los de una sesión con la nutricionista
+    ajustes = [
+        ("precio", lambda: sesion.cambiar_precio("pollo", sesion.precio[sesion.cat.indice["pollo"]] * 1.5)),
+        ("máximo", lambda: sesion.limitar_maximo("arroz", 60)),
+        ("prohibir", lambda: sesion.prohibir("coco")),
+        ("reparto", lambda: sesion.cambiar_reparto("comida", 0.35)),
+        ("permitir", lambda: sesion.permitir("coco")),
+    ]
+    print(f"\n{'Ajuste':<10}{'Tiempo (s)':>12}{'Fracción':>10}{'Coste (€)':>11}")
+    for nombre, ajuste in ajustes:
+        inicio = time.perf_counter()
+        ajuste()
+        resultado = sesion.resolver()
+        tiempo = time.perf_counter() - inicio
+        coste = f"{resultado.metadatos['coste']:.4f}" if resultado is not None else "-"
+        print(f"{nombre:<10}{tiempo:>12.3f}{tiempo / frio:>10.1%}{coste:>11}")
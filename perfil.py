@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo define el perfil nutricional de la escaladora que usan todos los modelos:
+banda de calorías diarias, reparto de macronutrientes, distribución por franjas
+horarias y categorías de alimentos permitidas en cada franja.
+
+Los perfiles se pueden leer de un fichero JSON (una lista de perfiles) o JSONL (un perfil
+por línea). Cada perfil solo necesita indicar los valores que cambian respecto al perfil
+base y un nombre que lo identifique.
+"""
+
+import copy
+import json
+
+# Perfil base (escaladora de competición del trabajo)
+PERFIL_BASE = {
+    "nombre": "base",
+    # Banda de calorías diarias (kcal)
+    "kcal_min": 2900,
+    "kcal_max": 3100,
+    # Reparto de macronutrientes del día (Modelo 1), en fracción de las calorías
+    "reparto_macros": {"carbohidratos": 0.4, "proteina": 0.3, "grasa": 0.3},
+    # Distribución de calorías por franja horaria
+    "distr_calorica": {"desayuno": 0.2, "comida": 0.4, "merienda": 0.1, "cena": 0.3},
+    # Distribución de macronutrientes por franja horaria
+    "distr_macros": {
+        "carbohidratos": {"desayuno": 0.5, "comida": 0.35, "merienda": 0.4, "cena": 0.4},
+        "proteina": {"desayuno": 0.25, "comida": 0.4, "merienda": 0.3, "cena": 0.3},
+        "grasa": {"desayuno": 0.25, "comida": 0.25, "merienda": 0.3, "cena": 0.3}
+    },
+    # Categorías permitidas por franja
+    "categorias_permitidas": {
+        "desayuno": {1, 2, 3, 4, 5, 8, 11},
+        "comida": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15},
+        "merienda": {1, 2, 3, 4, 5, 8, 9, 11},
+        "cena": {1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15}
+    },
+}
+
+
+def crear_perfil(valores):
+    """
+    Crea un perfil completo a partir del perfil base y de los valores indicados.
+    Los diccionarios anidados se combinan clave a clave y las categorías permitidas
+    se convierten a conjuntos.
+    """
+    perfil = copy.deepcopy(PERFIL_BASE)
+    for clave, valor in valores.items():
+        if isinstance(valor, dict) and isinstance(perfil.get(clave), dict):
+            for subclave, subvalor in valor.items():
+                if isinstance(subvalor, dict) and isinstance(perfil[clave].get(subclave), dict):
+                    perfil[clave][subclave].update(subvalor)
+                else:
+                    perfil[clave][subclave] = subvalor
+        else:
+            perfil[clave] = valor
+    perfil["categorias_permitidas"] = {j: set(c) for j, c in perfil["categorias_permitidas"].items()}
+    return perfil
+
+
+def cargar_perfiles(ruta):
+    """
+    Lee los perfiles de un fichero JSON (lista de perfiles) o JSONL (un perfil por línea).
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        contenido = f.read()
+    try:
+        valores = json.loads(contenido)
+        if isinstance(valores, dict):
+            valores = [valores]
+    except json.JSONDecodeError:
+        valores = [json.loads(linea) for linea in contenido.splitlines() if linea.strip()]
+    perfiles = [crear_perfil(v) for v in valores]
+    for k, perfil in enumerate(perfiles):
+        if perfil["nombre"] == PERFIL_BASE["nombre"] and "nombre" not in valores[k]:
+            perfil["nombre"] = f"perfil_{k + 1}"
+    return perfiles
+
+
+def perfil_serializable(perfil):
+    """
+    Devuelve una copia del perfil que se puede guardar como JSON (conjuntos como listas ordenadas).
+    """
+    perfil = copy.deepcopy(perfil)
+    perfil["categorias_permitidas"] = {j: sorted(c) for j, c in perfil["categorias_permitidas"].items()}
+    return perfil
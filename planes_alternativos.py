@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script genera en una sola ejecución K planes semanales distintos y casi óptimos del
+Modelo 3 (con alimentos o con recetas), para ofrecer alternativas a la escaladora sin
+volver a resolver con exclusiones a mano cada vez que rechaza un plan.
+
+Dos planes se consideran distintos si su distancia de Hamming en las variables binarias
+que los caracterizan es al menos --distancia: Z[i, d] (alimento i en el día d) en el
+Modelo 3 con alimentos y X[j, r, d] (receta r en la franja j el día d) en el de recetas.
+
+Métodos:
+    - "pool":   una sola resolución de Gurobi con el pool de soluciones (PoolSearchMode=2,
+                PoolSolutions, PoolGap). Todas las soluciones del pool se leen en bloque
+                (atributo Xn) y se eligen, por orden de coste, las que están a la distancia
+                mínima de las ya elegidas. Si el pool no tiene K planes distintos, se
+                completa con cortes.
+    - "cortes": con cualquier resolutor (ver resolutores.py), se resuelve, se añade un corte
+                que obliga a estar a la distancia mínima del plan obtenido y se repite.
+
+Los planes se guardan ordenados por coste en Resultados/planes_<modelo>/plan_<k> (ver
+resultados.py) junto con un resumen.json con el coste, la diferencia con el mejor plan y
+la distancia al mejor plan de cada uno.
+
+Uso: python planes_alternativos.py [--modelo Modelo3_alimentos|Modelo3_recetas] [--k 10]
+                                   [--distancia 6] [--gap-pool 0.1] [--metodo pool|cortes]
+                                   [--resolutor gurobi] [--dias 7] [--limite 600]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import time
+
+import gurobipy as gp
+import numpy as np
+
+from horizonte import generar_dias
+from resolutores import RESOLUTORES, Solucion, construir, estado_gurobi, resolver
+from resultados import metadatos_solucion
+
+MODELOS = ["Modelo3_alimentos", "Modelo3_recetas"]
+
+# Variables binarias con las que se mide la distancia entre planes
+BINARIAS = {"Modelo3_alimentos": "Z", "Modelo3_recetas": "X"}
+
+
+def lista_variables(v):
+    """
+    Lista de Var de un diccionario de variables o de una variable matricial (MVar).
+    """
+    if isinstance(v, dict):
+        return list(v.values())
+    return [x for fila in np.atleast_2d(np.array(v.tolist(), dtype=object)) for x in fila]
+
+
+def _binarios(solucion, indices):
+    return solucion.x[indices] > 0.5
+
+
+def _cortar(model, binarias, valores, distancia):
+    """
+    Corte de distancia de Hamming: el siguiente plan debe diferir del plan dado en al menos
+    'distancia' de las variables binarias.
+        suma_{b: v_b = 1} (1 - z_b) + suma_{b: v_b = 0} z_b >= distancia
+    """
+    coeficientes = np.where(valores, -1.0, 1.0)
+    model.addConstr(gp.LinExpr(coeficientes.tolist(), binarias) + float(valores.sum()) >= distancia)
+    # Los resolutores distintos de Gurobi leen la matriz del modelo: hay que aplicar el corte
+    model.update()
+
+
+def planes_pool(model, binarias, k, distancia, gap_pool, limite_tiempo=None, tamano_pool=None, verbose=False):
+    """
+    Resuelve una vez con el pool de soluciones de Gurobi y devuelve hasta k Soluciones, por
+    orden de coste, a distancia de Hamming >= distancia entre sí en las variables binarias.
+    """
+    model.setParam("OutputFlag", int(verbose))
+    model.setParam("PoolSearchMode", 2)
+    model.setParam("PoolSolutions", tamano_pool or 10 * k)
+    model.setParam("PoolGap", gap_pool)
+    if limite_tiempo is not None:
+        model.setParam("TimeLimit", limite_tiempo)
+    inicio = time.perf_counter()
+    model.optimize()
+    tiempo = time.perf_counter() - inicio
+
+    variables = model.getVars()
+    indices = np.array([b.index for b in binarias])
+    estado = estado_gurobi(model)
+    cota = model.ObjBound if model.SolCount > 0 else None
+    elegidas = []
+    for n in range(model.SolCount):
+        model.setParam("SolutionNumber", n)
+        x = np.array(model.getAttr("Xn", variables))
+        candidata = Solucion("gurobi", estado, model.PoolObjVal, cota, x, tiempo)
+        z = _binarios(candidata, indices)
+        if all(np.count_nonzero(z != _binarios(s, indices)) >= distancia for s in elegidas):
+            elegidas.append(candidata)
+            if len(elegidas) == k:
+                break
+    return elegidas
+
+
+def planes_cortes(model, binarias, k, distancia, resolutor="gurobi", limite_tiempo=None, elegidas=(),
+                  verbose=False):
+    """
+    Genera planes resolviendo repetidamente y añadiendo tras cada plan un corte de distancia
+    de Hamming. Parte de los planes ya elegidos (a los que también se les añade el corte) y
+    devuelve la lista completa, con hasta k planes.
+    """
+    indices = np.array([b.index for b in binarias])
+    elegidas = list(elegidas)
+    for s in elegidas:
+        _cortar(model, binarias, _binarios(s, indices), distancia)
+    model.setParam("PoolSearchMode", 0)
+    while len(elegidas) < k:
+        solucion = resolver(model, resolutor, limite_tiempo=limite_tiempo, verbose=verbose)
+        if not solucion.tiene_solucion:
+            break
+        elegidas.append(solucion)
+        _cortar(model, binarias, _binarios(solucion, indices), distancia)
+    return sorted(elegidas, key=lambda s: s.objetivo)
+
+
+def generar_planes(nombre="Modelo3_alimentos", k=10, distancia=6, gap_pool=0.1, metodo="pool",
+                   resolutor="gurobi", n_dias=7, limite_tiempo=None, verbose=False):
+    """
+    Construye el modelo y devuelve (model, variables, soluciones, dias) con hasta k planes
+    distintos ordenados por coste. Hay que conservar model mientras se lean las soluciones:
+    al liberarlo, los índices de las variables dejan de ser válidos.
+    """
+    if metodo == "pool" and resolutor != "gurobi":
+        raise ValueError("El pool de soluciones solo está disponible con Gurobi; usa el método 'cortes'.")
+    if nombre == "Modelo3_alimentos":
+        # Formulación reforzada: los binarios de grupo quedan determinados por los de los
+        # alimentos, así que el pool no se llena de copias del mismo plan
+        import Modelo3_alimentos
+
+        model, variables = Modelo3_alimentos.construir_modelo_matricial(generar_dias(n_dias), reforzado=True)
+    else:
+        model, variables = construir(nombre, n_dias=n_dias)
+    model.update()
+    binarias = lista_variables(variables[BINARIAS[nombre]])
+
+    elegidas = []
+    if metodo == "pool":
+        elegidas = planes_pool(model, binarias, k, distancia, gap_pool, limite_tiempo, verbose=verbose)
+    if len(elegidas) < k:
+        elegidas = planes_cortes(model, binarias, k, distancia, resolutor, limite_tiempo, elegidas, verbose)
+    return model, variables, elegidas, generar_dias(n_dias)
+
+
+def guardar_planes(nombre, variables, soluciones, dias, directorio=None):
+    """
+    Guarda cada plan como Resultado en directorio/plan_<k> (k = 1 el más barato) y un
+    resumen.json con el coste, la diferencia con el mejor plan y la distancia al mejor.
+    Devuelve el resumen.
+    """
+    modulo = importlib.import_module(nombre)
+    directorio = directorio or f"Resultados/planes_{nombre}"
+    os.makedirs(directorio, exist_ok=True)
+    indices = np.array([b.index for b in lista_variables(variables[BINARIAS[nombre]])])
+    mejor = soluciones[0]
+    resumen = []
+    for k, solucion in enumerate(soluciones, start=1):
+        metadatos = dict(metadatos_solucion(solucion, nombre), plan=k)
+        resultado = modulo.extraer_resultado(variables, solucion.valor, dias, metadatos=metadatos)
+        ruta = os.path.join(directorio, f"plan_{k}")
+        resultado.guardar(ruta)
+        resumen.append({
+            "plan": k,
+            "ruta": ruta,
+            "coste": solucion.objetivo,
+            "diferencia": solucion.objetivo / mejor.objetivo - 1,
+            "distancia_al_mejor": int(np.count_nonzero(_binarios(solucion, indices) != _binarios(mejor, indices))),
+        })
+    with open(os.path.join(directorio, "resumen.json"), "w", encoding="utf-8") as f:
+        json.dump(resumen, f, ensure_ascii=False, indent=1)
+    return resumen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera K planes semanales distintos y casi óptimos.")
+    parser.add_argument("--modelo", choices=MODELOS, default="Modelo3_alimentos")
+    parser.add_argument("--k", type=int, default=10, help="número de planes")
+    parser.add_argument("--distancia", type=int, default=6,
+                        help="distancia de Hamming mínima entre planes (en Z o en las recetas)")
+    parser.add_argument("--gap-pool", type=float, default=0.1,
+                        help="diferencia de coste relativa máxima de las soluciones del pool")
+    parser.add_argument("--metodo", choices=["pool", "cortes"], default="pool")
+    parser.add_argument("--resolutor", choices=RESOLUTORES, default="gurobi")
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--limite", type=float, default=None, help="límite de tiempo de cada resolución (s)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    model, variables, soluciones, dias = generar_planes(args.modelo, args.k, args.distancia, args.gap_pool,
+                                                        args.metodo, args.resolutor, args.dias, args.limite)
+    if not soluciones:
+        print("No se encontró ningún plan.")
+    else:
+        resumen = guardar_planes(args.modelo, variables, soluciones, dias)
+        print(f"{len(resumen)} planes en {time.perf_counter() - inicio:.1f} s:")
+        print(f"\n{'Plan':>5}{'Coste (€)':>11}{'Diferencia':>12}{'Distancia':>11}")
+        for r in resumen:
+            print(f"{r['plan']:>5}{r['coste']:>11.4f}{r['diferencia']:>12.2%}{r['distancia_al_mejor']:>11}")
+        print(f"\nPlanes guardados en '{os.path.dirname(resumen[0]['ruta'])}'")
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo permite resolver los modelos con distintos resolutores.
+
+Los modelos se siguen formulando una sola vez con gurobipy, que aquí actúa como lenguaje
+de modelado (construir un modelo no requiere licencia, solo resolverlo). Una vez
+construido, el modelo se convierte a su forma estándar dispersa
+
+    min/max  c x + c0   s.a.   l_fila <= A x <= u_fila,   l <= x <= u,   x_k entera (k en I)
+
+con A en formato CSR, y se resuelve con el resolutor elegido:
+    - "gurobi": Gurobi (requiere licencia para modelos grandes),
+    - "highs":  HiGHS a través de highspy,
+    - "scipy":  HiGHS a través de scipy.optimize.milp.
+
+Todos devuelven una Solucion con el mismo formato, cuyos valores se consultan con las
+mismas variables del modelo (Var, MVar o diccionarios de variables).
+"""
+
+import time
+
+import numpy as np
+from gurobipy import GRB
+
+from horizonte import generar_dias
+from perfil import PERFIL_BASE
+
+RESOLUTORES = ["gurobi", "highs", "scipy"]
+MODELOS = ["Modelo1", "Modelo2", "Modelo3_alimentos", "Modelo3_recetas"]
+
+
+def construir(nombre, perfil=PERFIL_BASE, n_dias=7):
+    """
+    Construye uno de los modelos por nombre. Devuelve el modelo y sus variables.
+    """
+    import importlib
+
+    modelo = importlib.import_module(nombre)
+    if nombre in ("Modelo1", "Modelo2"):
+        return modelo.construir_modelo(perfil)
+    if nombre == "Modelo3_alimentos":
+        return modelo.construir_modelo_matricial(generar_dias(n_dias), perfil)
+    return modelo.construir_modelo(generar_dias(n_dias), perfil)
+
+
+class FormaEstandar:
+    """
+    Forma estándar dispersa de un modelo lineal (entero mixto) ya construido.
+    """
+
+    def __init__(self, model):
+        model.update()
+        if model.NumQConstrs or model.NumGenConstrs or model.NumSOS or model.IsQP:
+            raise ValueError("Solo se pueden convertir modelos lineales.")
+        variables = model.getVars()
+        restricciones = model.getConstrs()
+
+        self.A = model.getA().tocsr()
+        self.c = np.array(model.getAttr("Obj", variables))
+        self.c0 = model.ObjCon
+        self.maximizar = model.ModelSense == GRB.MAXIMIZE
+        self.lb = _infinitos(np.array(model.getAttr("LB", variables)))
+        self.ub = _infinitos(np.array(model.getAttr("UB", variables)))
+        self.enteras = np.isin(np.array(model.getAttr("VType", variables)), [GRB.BINARY, GRB.INTEGER])
+
+        rhs = np.array(model.getAttr("RHS", restricciones))
+        sentido = np.array(model.getAttr("Sense", restricciones))
+        self.fila_lb = np.where(sentido == GRB.LESS_EQUAL, -np.inf, rhs)
+        self.fila_ub = np.where(sentido == GRB.GREATER_EQUAL, np.inf, rhs)
+
+        # Tolerancia de optimalidad fijada en el modelo (por ejemplo, MIPGap = 0.028)
+        self.gap = model.Params.MIPGap
+
+    @property
+    def num_variables(self):
+        return self.A.shape[1]
+
+    @property
+    def num_restricciones(self):
+        return self.A.shape[0]
+
+
+def _infinitos(valores):
+    """
+    Convierte los infinitos de Gurobi (1e100) en infinitos de NumPy.
+    """
+    valores[valores >= GRB.INFINITY] = np.inf
+    valores[valores <= -GRB.INFINITY] = -np.inf
+    return valores
+
+
+class Solucion:
+    """
+    Resultado de resolver un modelo con cualquiera de los resolutores.
+    estado es "optimo", "limite_tiempo", "infactible", "no_acotado" o "sin_solucion";
+    x contiene el valor de cada variable en el orden de model.getVars() (None si no hay
+    solución) y pi, en los problemas lineales, el dual de cada restricción en el orden de
+    model.getConstrs() (con el convenio de Gurobi: coste reducido = c - A^T pi). nodos es
+    el número de nodos del árbol de ramificación (None si el resolutor no lo da).
+    """
+
+    def __init__(self, resolutor, estado, objetivo=None, cota=None, x=None, tiempo=0.0, pi=None, nodos=None):
+        self.resolutor = resolutor
+        self.estado = estado
+        self.objetivo = objetivo
+        self.cota = cota
+        self.x = x
+        self.tiempo = tiempo
+        self.pi = pi
+        self.nodos = nodos
+
+    @property
+    def tiene_solucion(self):
+        return self.x is not None
+
+    def valor(self, v):
+        """
+        Valor de una variable (Var), de una variable matricial (MVar, devuelve un array)
+        o de un diccionario de variables (devuelve un diccionario con las mismas claves).
+        """
+        if isinstance(v, dict):
+            claves = list(v)
+            valores = self.x[[v[k].index for k in claves]]
+            return dict(zip(claves, valores.tolist()))
+        if hasattr(v, "tolist") and hasattr(v, "shape"):
+            indices = np.array([x.index for x in np.ravel(np.array(v.tolist(), dtype=object))], dtype=np.int64)
+            return self.x[indices].reshape(v.shape)
+        return float(self.x[v.index])
+
+    def dual(self, restriccion):
+        """
+        Dual de una restricción (Constr) o de un diccionario de restricciones.
+        """
+        if isinstance(restriccion, dict):
+            return {k: float(self.pi[c.index]) for k, c in restriccion.items()}
+        return float(self.pi[restriccion.index])
+
+
+def resolver(model, resolutor="gurobi", limite_tiempo=None, gap=None, hilos=None, verbose=False):
+    """
+    Resuelve un modelo ya construido con el resolutor indicado y devuelve una Solucion.
+    Si gap es None se usa el MIPGap fijado en el modelo.
+    """
+    if resolutor == "gurobi":
+        return _resolver_gurobi(model, limite_tiempo, gap, hilos, verbose)
+    forma = FormaEstandar(model)
+    if resolutor == "highs":
+        return resolver_highs(forma, limite_tiempo, gap, hilos, verbose)
+    if resolutor == "scipy":
+        return resolver_scipy(forma, limite_tiempo, gap, verbose)
+    raise ValueError(f"Resolutor desconocido: {resolutor} (disponibles: {', '.join(RESOLUTORES)})")
+
+
+def estado_gurobi(model):
+    """
+    Estado de la resolución de un modelo de Gurobi con los nombres de Solucion.
+    """
+    estados = {GRB.OPTIMAL: "optimo", GRB.TIME_LIMIT: "limite_tiempo", GRB.INFEASIBLE: "infactible",
+               GRB.INF_OR_UNBD: "infactible", GRB.UNBOUNDED: "no_acotado"}
+    return estados.get(model.Status, "sin_solucion")
+
+
+def _resolver_gurobi(model, limite_tiempo, gap, hilos, verbose):
+    model.setParam("OutputFlag", int(verbose))
+    if limite_tiempo is not None:
+        model.setParam("TimeLimit", limite_tiempo)
+    if gap is not None:
+        model.setParam("MIPGap", gap)
+    if hilos is not None:
+        model.setParam("Threads", hilos)
+    inicio = time.perf_counter()
+    model.optimize()
+    tiempo = time.perf_counter() - inicio
+
+    estado = estado_gurobi(model)
+    nodos = int(model.NodeCount) if model.IsMIP else 0
+    if model.SolCount == 0:
+        return Solucion("gurobi", estado, tiempo=tiempo, nodos=nodos)
+    cota = model.ObjBound if model.IsMIP else model.ObjVal
+    x = np.array(model.getAttr("X", model.getVars()))
+    pi = None if model.IsMIP else np.array(model.getAttr("Pi", model.getConstrs()))
+    return Solucion("gurobi", estado, model.ObjVal, cota, x, tiempo, pi, nodos)
+
+
+def resolver_highs(forma, limite_tiempo=None, gap=None, hilos=None, verbose=False):
+    """
+    Resuelve la forma estándar con HiGHS (highspy), pasando la matriz por filas.
+    """
+    import highspy
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = forma.num_variables
+    lp.num_row_ = forma.num_restricciones
+    lp.col_cost_ = forma.c
+    lp.col_lower_ = forma.lb
+    lp.col_upper_ = forma.ub
+    lp.row_lower_ = forma.fila_lb
+    lp.row_upper_ = forma.fila_ub
+    lp.offset_ = forma.c0
+    lp.sense_ = highspy.ObjSense.kMaximize if forma.maximizar else highspy.ObjSense.kMinimize
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.num_col_ = forma.num_variables
+    lp.a_matrix_.num_row_ = forma.num_restricciones
+    lp.a_matrix_.start_ = forma.A.indptr
+    lp.a_matrix_.index_ = forma.A.indices
+    lp.a_matrix_.value_ = forma.A.data
+    if forma.enteras.any():
+        lp.integrality_ = [highspy.HighsVarType.kInteger if e else highspy.HighsVarType.kContinuous
+                           for e in forma.enteras]
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", verbose)
+    h.setOptionValue("mip_rel_gap", forma.gap if gap is None else gap)
+    if limite_tiempo is not None:
+        h.setOptionValue("time_limit", float(limite_tiempo))
+    if hilos is not None:
+        h.setOptionValue("threads", int(hilos))
+    h.passModel(lp)
+
+    inicio = time.perf_counter()
+    h.run()
+    tiempo = time.perf_counter() - inicio
+
+    status = h.getModelStatus()
+    estados = {highspy.HighsModelStatus.kOptimal: "optimo",
+               highspy.HighsModelStatus.kTimeLimit: "limite_tiempo",
+               highspy.HighsModelStatus.kInfeasible: "infactible",
+               highspy.HighsModelStatus.kUnboundedOrInfeasible: "infactible",
+               highspy.HighsModelStatus.kUnbounded: "no_acotado"}
+    estado = estados.get(status, "sin_solucion")
+    info = h.getInfo()
+    nodos = int(info.mip_node_count) if forma.enteras.any() else 0
+    if info.primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+        return Solucion("highs", estado, tiempo=tiempo, nodos=nodos)
+    solucion = h.getSolution()
+    x = np.array(solucion.col_value)
+    objetivo = info.objective_function_value
+    cota = info.mip_dual_bound if forma.enteras.any() else objetivo
+    pi = None if forma.enteras.any() or not solucion.dual_valid else np.array(solucion.row_dual)
+    return Solucion("highs", estado, objetivo, cota, x, tiempo, pi, nodos)
+
+
+def resolver_scipy(forma, limite_tiempo=None, gap=None, verbose=False):
+    """
+    Resuelve la forma estándar con scipy.optimize.milp (HiGHS incluido en SciPy).
+    """
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    signo = -1 if forma.maximizar else 1
+    opciones = {"disp": verbose, "mip_rel_gap": forma.gap if gap is None else gap}
+    if limite_tiempo is not None:
+        opciones["time_limit"] = float(limite_tiempo)
+
+    inicio = time.perf_counter()
+    res = milp(signo * forma.c, integrality=forma.enteras.astype(np.uint8), bounds=Bounds(forma.lb, forma.ub),
+               constraints=LinearConstraint(forma.A, forma.fila_lb, forma.fila_ub), options=opciones)
+    tiempo = time.perf_counter() - inicio
+
+    estados = {0: "optimo", 1: "limite_tiempo", 2: "infactible", 3: "no_acotado"}
+    estado = estados.get(res.status, "sin_solucion")
+    if res.x is None:
+        return Solucion("scipy", estado, tiempo=tiempo)
+    objetivo = signo * res.fun + forma.c0
+    cota = getattr(res, "mip_dual_bound", None)
+    cota = objetivo if cota is None else signo * cota + forma.c0
+    return Solucion("scipy", estado, objetivo, cota, res.x, tiempo)
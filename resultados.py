@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este módulo guarda y carga los resultados de los modelos en un formato estructurado.
+
+Un resultado es una tabla de registros (día, franja, receta, alimento, gramos, coste)
+junto con los metadatos de la resolución (modelo, perfil, resolutor, estado, coste, cota,
+tiempo y días; los resultados convertidos de un informe de texto anterior, sin volver a
+resolver, tienen además 'origen' y la cota y el tiempo nulos). Se guarda con una misma
+ruta base en tres ficheros:
+    - <ruta>.json: metadatos y tablas de códigos de las columnas categóricas,
+    - <ruta>.npz:  columnas de la tabla como arrays de NumPy (las categóricas como
+                   códigos enteros, -1 si el modelo no tiene esa dimensión),
+    - <ruta>.txt:  informe de texto generado a partir de la tabla.
+
+Los modelos extraen la solución en bloque (model.getAttr("X", ...), Solucion.valor o,
+dentro de un callback, model.cbGetSolution; ver lector_gurobi y lector_callback) y
+ModeloIA y el resto de herramientas leen directamente el .json y el .npz, sin volver a
+interpretar el informe de texto.
+"""
+
+import json
+
+import numpy as np
+
+from catalogo import cargar_catalogo
+
+# Columnas categóricas (se guardan como códigos) y numéricas de la tabla
+CATEGORICAS = ["dia", "franja", "receta", "alimento"]
+NUMERICAS = ["gramos", "coste"]
+
+
+def lector_gurobi(model):
+    """
+    Devuelve una función que lee en bloque los valores de la solución de Gurobi de un
+    diccionario de variables (con model.getAttr) o de una variable matricial (MVar).
+    Tiene la misma interfaz que Solucion.valor (ver resolutores.py).
+    """
+    def valor(v):
+        if isinstance(v, dict):
+            claves = list(v)
+            return dict(zip(claves, model.getAttr("X", [v[k] for k in claves])))
+        return v.X
+    return valor
+
+
+def lector_callback(model):
+    """
+    Como lector_gurobi, pero lee la nueva solución entera dentro de un callback MIPSOL
+    (model.cbGetSolution).
+    """
+    def valor(v):
+        if isinstance(v, dict):
+            claves = list(v)
+            return dict(zip(claves, model.cbGetSolution([v[k] for k in claves])))
+        return model.cbGetSolution(v)
+    return valor
+
+
+def metadatos_gurobi(model, modelo, perfil=None):
+    """
+    Metadatos de la resolución de un modelo con Gurobi.
+    """
+    # Importación local: ModeloIA y las cachés usan este módulo sin tener gurobipy
+    from resolutores import estado_gurobi
+
+    return {
+        "modelo": modelo,
+        "perfil": perfil["nombre"] if perfil else None,
+        "resolutor": "gurobi",
+        "estado": estado_gurobi(model),
+        "coste": model.ObjVal if model.SolCount > 0 else None,
+        "cota": (model.ObjBound if model.IsMIP else model.ObjVal) if model.SolCount > 0 else None,
+        "tiempo": model.Runtime,
+    }
+
+
+def metadatos_solucion(solucion, modelo, perfil=None):
+    """
+    Metadatos de una Solucion de cualquiera de los resolutores (ver resolutores.py).
+    """
+    return {
+        "modelo": modelo,
+        "perfil": perfil["nombre"] if perfil else None,
+        "resolutor": solucion.resolutor,
+        "estado": solucion.estado,
+        "coste": solucion.objetivo,
+        "cota": solucion.cota,
+        "tiempo": solucion.tiempo,
+    }
+
+
+class Resultado:
+    """
+    Tabla de registros de una dieta en formato columnar con sus metadatos.
+    columnas contiene un array por columna (CATEGORICAS como códigos int32 y NUMERICAS
+    como float64) y categorias la lista de valores de cada columna categórica.
+    """
+
+    def __init__(self, columnas, categorias, metadatos=None):
+        self.columnas = columnas
+        self.categorias = categorias
+        self.metadatos = metadatos or {}
+
+    @classmethod
+    def desde_registros(cls, registros, metadatos=None):
+        """
+        Construye el resultado a partir de tuplas (día, franja, receta, alimento, gramos),
+        con None en las dimensiones que no tiene el modelo. El coste de cada registro se
+        calcula con los precios del catálogo.
+        """
+        categorias = {c: [] for c in CATEGORICAS}
+        codigos = {c: {} for c in CATEGORICAS}
+        filas = {c: [] for c in CATEGORICAS}
+        gramos = []
+        for *claves, cantidad in registros:
+            for c, valor in zip(CATEGORICAS, claves):
+                if valor is None:
+                    filas[c].append(-1)
+                    continue
+                k = codigos[c].get(valor)
+                if k is None:
+                    k = codigos[c][valor] = len(categorias[c])
+                    categorias[c].append(valor)
+                filas[c].append(k)
+            gramos.append(cantidad)
+
+        columnas = {c: np.array(filas[c], dtype=np.int32) for c in CATEGORICAS}
+        columnas["gramos"] = np.array(gramos, dtype=np.float64)
+        cat = cargar_catalogo()
+        precio = np.array([cat.precio[cat.indice[i]] for i in categorias["alimento"]], dtype=np.float64)
+        columnas["coste"] = columnas["gramos"] * precio[columnas["alimento"]] / 100
+        return cls(columnas, categorias, metadatos)
+
+    def __len__(self):
+        return len(self.columnas["gramos"])
+
+    def valores(self, columna):
+        """
+        Valores de una columna (las categóricas decodificadas, con None donde no hay valor).
+        """
+        if columna in NUMERICAS:
+            return self.columnas[columna].tolist()
+        tabla = self.categorias[columna]
+        return [tabla[k] if k >= 0 else None for k in self.columnas[columna].tolist()]
+
+    def filas(self):
+        """
+        Recorre la tabla como tuplas (día, franja, receta, alimento, gramos, coste).
+        """
+        return zip(*(self.valores(c) for c in CATEGORICAS + NUMERICAS))
+
+    def registros(self):
+        """
+        Devuelve la tabla como lista de diccionarios, sin las dimensiones vacías.
+        """
+        return [{c: v for c, v in zip(CATEGORICAS + NUMERICAS, fila) if v is not None} for fila in self.filas()]
+
+    def cantidades(self):
+        """
+        Devuelve los gramos de cada (alimento, franja, día), sumando recetas y extras.
+        """
+        cantidades = {}
+        for dia, franja, receta, alimento, gramos, coste in self.filas():
+            cantidades[alimento, franja, dia] = cantidades.get((alimento, franja, dia), 0.0) + gramos
+        return cantidades
+
+    def por_dia(self):
+        """
+        Devuelve la dieta como diccionario día -> franja -> alimento -> gramos.
+        """
+        dieta = {}
+        for (alimento, franja, dia), gramos in self.cantidades().items():
+            dieta.setdefault(dia, {}).setdefault(franja, {})[alimento] = gramos
+        return dieta
+
+    def informe(self):
+        """
+        Devuelve las líneas del informe de texto del resultado.
+        """
+        if (self.columnas["receta"] >= 0).any():
+            return self._informe_recetas()
+        lineas = ["\nDieta óptima encontrada:"]
+        actual = (None, None, None)
+        for dia, franja, receta, alimento, gramos, coste in self.filas():
+            sangria = "  " * max(1, (dia is not None) + (franja is not None))
+            if dia is not None and dia != actual[0]:
+                lineas.append(f"\nDía: {dia}")
+                actual = (dia, None, None)
+            if franja is not None and franja != actual[1]:
+                lineas.append(f"  {franja.capitalize()}:" if dia is not None else f"\n{franja.capitalize()}:")
+                actual = (actual[0], franja, None)
+            lineas.append(f"{sangria}{alimento}: {gramos:.2f} g")
+        if self.metadatos.get("coste") is not None:
+            lineas.append(f"\nCoste total: {self.metadatos['coste']:.2f} €")
+        return lineas
+
+    def _informe_recetas(self):
+        """
+        Informe de los modelos con recetas, con el formato original del Modelo 3 con
+        recetas: en cada día, las recetas de cada franja y después los extras de cada franja.
+        """
+        lineas = ["\nDieta óptima encontrada:"]
+        dias = {}
+        for dia, franja, receta, alimento, gramos, coste in self.filas():
+            recetas, extras = dias.setdefault(dia, ({}, {}))
+            grupo = recetas.setdefault((franja, receta), []) if receta is not None else extras.setdefault(franja, [])
+            grupo.append(f"  - {alimento}: {gramos:.2f}g")
+        for dia, (recetas, extras) in dias.items():
+            lineas.append(f"\nDía: {dia.capitalize()}")
+            for (franja, receta), ingredientes in recetas.items():
+                lineas += [f"\n{franja.capitalize()}: {receta}"] + ingredientes
+            for franja, ingredientes in extras.items():
+                lineas += [f"\n{franja.capitalize()} extra:"] + ingredientes
+        if self.metadatos.get("coste") is not None:
+            lineas.append(f"\nCoste total: {self.metadatos['coste']:.2f} €")
+        return lineas
+
+    def guardar(self, ruta, informe=True):
+        """
+        Guarda el resultado en <ruta>.json, <ruta>.npz y, si informe es True, el informe
+        de texto en <ruta>.txt.
+        """
+        with open(ruta + ".json", "w", encoding="utf-8") as f:
+            json.dump({"metadatos": self.metadatos, "categorias": self.categorias, "registros": len(self)},
+                      f, ensure_ascii=False, indent=1)
+        np.savez(ruta + ".npz", **self.columnas)
+        if informe:
+            with open(ruta + ".txt", "w", encoding="utf-8") as f:
+                for linea in self.informe():
+                    f.write(linea + "\n")
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Carga un resultado guardado con guardar (ruta sin extensión).
+        """
+        with open(ruta + ".json", "r", encoding="utf-8") as f:
+            cabecera = json.load(f)
+        with np.load(ruta + ".npz") as npz:
+            columnas = {c: npz[c] for c in CATEGORICAS + NUMERICAS}
+        return cls(columnas, cabecera["categorias"], cabecera["metadatos"])
+
+
+def publicar(resultado, ruta):
+    """
+    Muestra el informe de un resultado por pantalla y lo guarda en ruta (.json, .npz y .txt).
+    """
+    for linea in resultado.informe():
+        print(linea)
+    resultado.guardar(ruta)
+    print(f"\nDieta óptima guardada en '{ruta}.txt' (datos en '{ruta}.json' y '{ruta}.npz').")
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script realiza el análisis de sensibilidad del Modelo 1 y responde preguntas del
+tipo "¿qué pasa si el pollo sube un 20 %?" sin volver a construir el modelo.
+
+El Modelo 1 es un problema lineal, así que tras resolverlo una vez se obtienen:
+    - los rangos de precio de cada alimento en los que la dieta óptima no cambia
+      (SAObjLow / SAObjUp),
+    - los rangos del lado derecho de las restricciones de calorías y macronutrientes
+      en los que la base óptima no cambia (SARHSLow / SARHSUp) y sus precios sombra (Pi).
+
+Para un escenario con varios precios distintos se comprueba directamente si la base
+óptima sigue siéndolo (costes reducidos con la base guardada), lo que permite evaluar
+miles de escenarios con unas pocas operaciones matriciales. Para los lados derechos se
+aplica la regla del 100 % sobre sus rangos. Si la base deja de ser óptima, se modifica el
+modelo ya resuelto y se reoptimiza con el símplex partiendo de la base anterior.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from gurobipy import GRB
+
+import Modelo1
+from perfil import PERFIL_BASE
+
+
+def _fraccion_rango(delta, bajo, alto, actual):
+    """
+    Fracción del rango de estabilidad que consume cada cambio (regla del 100 %).
+    Los cambios hacia un extremo infinito no consumen rango y los cambios hacia un
+    extremo que coincide con el valor actual (rango nulo) obligan a reoptimizar.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        subida = np.where(delta > 0, delta / (alto - actual), 0.0)
+        bajada = np.where(delta < 0, -delta / (actual - bajo), 0.0)
+    return subida + bajada
+
+
+class AnalisisSensibilidad:
+    """
+    Mantiene resuelto el Modelo 1 para un perfil y responde preguntas de sensibilidad.
+    Los precios se expresan en €/100 g, como en el catálogo.
+    """
+
+    def __init__(self, perfil=PERFIL_BASE):
+        self.model, variables = Modelo1.construir_modelo(perfil)
+        self.model.setParam("OutputFlag", 0)
+        # Símplex dual: tras cambiar precios o lados derechos reutiliza la base anterior
+        self.model.setParam("Method", 1)
+        self.model.optimize()
+        if self.model.Status != GRB.OPTIMAL:
+            raise RuntimeError("El Modelo 1 no tiene solución óptima para este perfil.")
+
+        self.alimentos = list(variables["X"])
+        self.indice = {i: k for k, i in enumerate(self.alimentos)}
+        self.vars = list(variables["X"].values())
+        self.restricciones = self.model.getConstrs()
+        self.nombres_restricciones = [c.ConstrName for c in self.restricciones]
+
+        # Solución base y rangos de estabilidad (coeficientes del objetivo en €/g)
+        self.coste_base = self.model.ObjVal
+        self.x_base = np.array(self.model.getAttr("X", self.vars))
+        self.obj_base = np.array(self.model.getAttr("Obj", self.vars))
+        self.obj_bajo = np.array(self.model.getAttr("SAObjLow", self.vars))
+        self.obj_alto = np.array(self.model.getAttr("SAObjUp", self.vars))
+        self.rhs_base = np.array(self.model.getAttr("RHS", self.restricciones))
+        self.rhs_bajo = np.array(self.model.getAttr("SARHSLow", self.restricciones))
+        self.rhs_alto = np.array(self.model.getAttr("SARHSUp", self.restricciones))
+        self.pi = np.array(self.model.getAttr("Pi", self.restricciones))
+        self.holgura = np.array(self.model.getAttr("Slack", self.restricciones))
+
+        # Base óptima: columnas básicas (variables y holguras) y su inversa, para comprobar
+        # la optimalidad de la base con otros precios sin resolver
+        A = self.model.getA().toarray()
+        m = len(self.restricciones)
+        basicas = np.flatnonzero(np.array(self.model.getAttr("VBasis", self.vars)) == GRB.BASIC)
+        holguras_basicas = np.flatnonzero(np.array(self.model.getAttr("CBasis", self.restricciones)) == GRB.BASIC)
+        B = np.hstack([A[:, basicas], np.eye(m)[:, holguras_basicas]])
+        self._A = A
+        self._basicas = basicas
+        self._B_inv = np.linalg.inv(B)
+        self._no_basicas = np.setdiff1d(np.arange(len(self.vars)), basicas)
+        # Filas con holgura no básica: el signo de su dual debe mantenerse (>= : Pi >= 0, <= : Pi <= 0)
+        sentidos = np.array(self.model.getAttr("Sense", self.restricciones))
+        activas = np.setdiff1d(np.arange(m), holguras_basicas)
+        self._filas_mayor = activas[sentidos[activas] == GRB.GREATER_EQUAL]
+        self._filas_menor = activas[sentidos[activas] == GRB.LESS_EQUAL]
+
+        # Estado actual del modelo (cambia tras cada reoptimización)
+        self._obj_actual = self.obj_base.copy()
+        self._rhs_actual = self.rhs_base.copy()
+        self.reoptimizaciones = 0
+
+    def rangos_precio(self):
+        """
+        Devuelve, para cada alimento, el rango de precios (€/100 g) en el que la dieta
+        óptima no cambia: alimento -> (mínimo, actual, máximo).
+        """
+        return {i: (100 * self.obj_bajo[k], 100 * self.obj_base[k], 100 * self.obj_alto[k])
+                for k, i in enumerate(self.alimentos)}
+
+    def rangos_restricciones(self):
+        """
+        Devuelve, para cada restricción de calorías y macronutrientes, su precio sombra
+        (€ por unidad del lado derecho), la holgura y el rango del lado derecho en el que
+        la base óptima no cambia.
+        """
+        return {
+            nombre: {"dual": self.pi[k], "holgura": self.holgura[k], "rhs": self.rhs_base[k],
+                     "rhs_min": self.rhs_bajo[k], "rhs_max": self.rhs_alto[k]}
+            for k, nombre in enumerate(self.nombres_restricciones)
+        }
+
+    def dieta_base(self):
+        """
+        Devuelve la dieta óptima del modelo base: alimento -> gramos.
+        """
+        return {self.alimentos[k]: self.x_base[k] for k in np.flatnonzero(self.x_base > 0)}
+
+    def _vector_precios(self, precios):
+        obj = self.obj_base.copy()
+        for i, valor in (precios or {}).items():
+            obj[self.indice[i]] = valor / 100
+        return obj
+
+    def _vector_rhs(self, rhs):
+        valores = self.rhs_base.copy()
+        for nombre, valor in (rhs or {}).items():
+            valores[self.nombres_restricciones.index(nombre)] = valor
+        return valores
+
+    def _base_optima(self, obj, tol=1e-9):
+        """
+        Comprueba para cada fila de obj (vectores de coeficientes del objetivo) si la base
+        óptima del modelo base sigue siendo óptima. La solución sigue siendo factible
+        porque los precios no cambian las restricciones.
+        """
+        obj = np.atleast_2d(obj)
+        c_B = np.hstack([obj[:, self._basicas], np.zeros((len(obj), self._B_inv.shape[0] - len(self._basicas)))])
+        y = c_B @ self._B_inv
+        reducidos = obj[:, self._no_basicas] - y @ self._A[:, self._no_basicas]
+        return ((reducidos >= -tol).all(axis=1)
+                & (y[:, self._filas_mayor] >= -tol).all(axis=1)
+                & (y[:, self._filas_menor] <= tol).all(axis=1))
+
+    def _reoptimizar(self, obj, rhs):
+        """
+        Aplica al modelo resuelto solo los coeficientes que cambian y reoptimiza desde la
+        base actual.
+        """
+        cambia = np.flatnonzero(obj != self._obj_actual)
+        if len(cambia):
+            self.model.setAttr("Obj", [self.vars[k] for k in cambia], obj[cambia].tolist())
+            self._obj_actual[cambia] = obj[cambia]
+        cambia = np.flatnonzero(rhs != self._rhs_actual)
+        if len(cambia):
+            self.model.setAttr("RHS", [self.restricciones[k] for k in cambia], rhs[cambia].tolist())
+            self._rhs_actual[cambia] = rhs[cambia]
+        self.model.optimize()
+        self.reoptimizaciones += 1
+        if self.model.Status != GRB.OPTIMAL:
+            return None, None
+        return self.model.ObjVal, np.array(self.model.getAttr("X", self.vars))
+
+    def que_pasaria(self, precios=None, rhs=None):
+        """
+        Evalúa un escenario con nuevos precios (alimento -> €/100 g) y/o nuevos lados
+        derechos (restricción -> valor) respecto al modelo base.
+        Devuelve un diccionario con el coste, la dieta (si se conoce) y si ha hecho falta
+        reoptimizar.
+        """
+        obj = self._vector_precios(precios)
+        valores_rhs = self._vector_rhs(rhs)
+        frac_rhs = _fraccion_rango(valores_rhs - self.rhs_base, self.rhs_bajo, self.rhs_alto, self.rhs_base).sum()
+
+        if not rhs and self._base_optima(obj)[0]:
+            # Misma dieta, nuevos precios
+            return {"coste": float(obj @ self.x_base), "dieta": self.dieta_base(), "reoptimizado": False}
+        if not precios and frac_rhs <= 1:
+            # Misma base: el coste varía según los precios sombra
+            coste = self.coste_base + float(self.pi @ (valores_rhs - self.rhs_base))
+            return {"coste": coste, "dieta": None, "reoptimizado": False}
+
+        coste, x = self._reoptimizar(obj, valores_rhs)
+        if coste is None:
+            return {"coste": None, "dieta": None, "reoptimizado": True}
+        dieta = {self.alimentos[k]: x[k] for k in np.flatnonzero(x > 0)}
+        return {"coste": coste, "dieta": dieta, "reoptimizado": True}
+
+    def lote_precios(self, factores):
+        """
+        Evalúa un lote de escenarios de precios. factores es un array (escenarios, alimentos)
+        con el factor que multiplica el precio base de cada alimento (columnas en el orden de
+        self.alimentos). Devuelve el coste de cada escenario y qué escenarios se han
+        reoptimizado.
+        """
+        factores = np.atleast_2d(np.asarray(factores, dtype=float))
+        obj = factores * self.obj_base
+
+        # Escenarios en los que la base sigue siendo óptima: misma dieta, coste en una sola
+        # operación matricial
+        estables = self._base_optima(obj)
+        costes = obj @ self.x_base
+        for e in np.flatnonzero(~estables):
+            coste, _ = self._reoptimizar(obj[e], self.rhs_base)
+            costes[e] = np.nan if coste is None else coste
+        return costes, ~estables
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análisis de sensibilidad del Modelo 1.")
+    parser.add_argument("--alimento", action="append", default=[],
+                        help="alimento cuyo precio cambia (se puede repetir)")
+    parser.add_argument("--variacion", type=float, action="append", default=[],
+                        help="variación relativa del precio de cada --alimento (0.2 = +20 %%)")
+    parser.add_argument("--lote", type=int, default=0,
+                        help="número de escenarios aleatorios de precios a evaluar")
+    parser.add_argument("--dispersion", type=float, default=0.1,
+                        help="desviación típica relativa de los precios en el lote")
+    args = parser.parse_args()
+
+    analisis = AnalisisSensibilidad()
+    print(f"Coste óptimo: {analisis.coste_base:.2f} €")
+
+    print("\nRangos de precio de los alimentos de la dieta (€/100 g):")
+    rangos = analisis.rangos_precio()
+    for i, gramos in analisis.dieta_base().items():
+        bajo, actual, alto = rangos[i]
+        print(f"  {i}: {gramos:.2f} g, precio {actual:.3f} en [{bajo:.3f}, {alto:.3f}]")
+
+    print("\nRestricciones (precio sombra en €/unidad, rango del lado derecho):")
+    for nombre, r in analisis.rangos_restricciones().items():
+        print(f"  {nombre}: dual {r['dual']:.5f}, holgura {r['holgura']:.2f}, "
+              f"rhs {r['rhs']:.1f} en [{r['rhs_min']:.1f}, {r['rhs_max']:.1f}]")
+
+    if args.alimento:
+        variaciones = args.variacion + [0.0] * (len(args.alimento) - len(args.variacion))
+        precios = {i: rangos[i][1] * (1 + v) for i, v in zip(args.alimento, variaciones)}
+        resultado = analisis.que_pasaria(precios=precios)
+        cambios = ", ".join(f"{i} {v:+.0%}" for i, v in zip(args.alimento, variaciones))
+        print(f"\nEscenario ({cambios}): coste {resultado['coste']:.2f} €"
+              f" ({'reoptimizado' if resultado['reoptimizado'] else 'dentro del rango, sin reoptimizar'})")
+        for i, gramos in resultado["dieta"].items():
+            print(f"  {i}: {gramos:.2f} g")
+
+    if args.lote:
+        rng = np.random.default_rng(0)
+        factores = np.clip(1 + args.dispersion * rng.standard_normal((args.lote, len(analisis.alimentos))), 0, None)
+        inicio = time.perf_counter()
+        costes, reoptimizados = analisis.lote_precios(factores)
+        tiempo = time.perf_counter() - inicio
+        print(f"\nLote de {args.lote} escenarios en {tiempo:.2f} s "
+              f"({reoptimizados.sum()} reoptimizados desde la base anterior)")
+        print(f"  Coste: media {np.nanmean(costes):.2f} €, "
+              f"percentil 5 {np.nanpercentile(costes, 5):.2f} €, percentil 95 {np.nanpercentile(costes, 95):.2f} €")
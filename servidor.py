@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Trabajo de fin de grado. (Ingeniería Matemática UCM)
+
+Título: El problema de la dieta y su aplicación en escaladores de competición
+Autor: Ana Llorente García
+
+
+Este script mantiene un servicio local (HTTP en 127.0.0.1) que resuelve los modelos de
+dieta sin pagar en cada petición el arranque de Python, la importación de gurobipy, la
+carga de los datos y la construcción del modelo.
+
+Al arrancar construye una plantilla de cada modelo para el perfil base. Cada petición
+se pone en una cola y la atiende uno de los trabajadores, cada uno con su propio entorno
+de Gurobi: copia la plantilla en su entorno (model.copy(env)), la resuelve con el límite
+de tiempo de la petición y devuelve el plan. Las plantillas de otros perfiles u horizontes
+se construyen la primera vez que se piden y se guardan (como máximo MAX_PLANTILLAS).
+
+Peticiones:
+    POST /resolver  {"modelo": "Modelo2", "perfil": {...}, "dias": 7, "limite_tiempo": 10,
+                     "resolutor": "gurobi"}   (todos opcionales; perfil como en perfil.py)
+    GET  /estado    profundidad de la cola, peticiones en curso y percentiles de latencia
+    GET  /salud
+
+Uso: python servidor.py [--puerto 8765] [--trabajadores N] [--modelos Modelo1 Modelo2 ...]
+     (ver cliente_servidor.py para probarlo)
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import gurobipy as gp
+import numpy as np
+
+from lote import extraer_plan
+from perfil import PERFIL_BASE, crear_perfil, perfil_serializable
+from resolutores import MODELOS, RESOLUTORES, construir, resolver
+
+PUERTO = 8765
+LIMITE_MAXIMO = 120.0  # límite de tiempo máximo por petición (s)
+MAX_PLANTILLAS = 16
+VENTANA_LATENCIAS = 1000  # latencias recientes con las que se calculan los percentiles
+PERCENTILES = [50, 90, 99]
+MODELOS_DIARIOS = ("Modelo1", "Modelo2")  # modelos que no dependen del número de días
+
+
+class Plantillas:
+    """
+    Modelos ya construidos por (modelo, días, perfil), de los que se hace una copia para
+    cada petición. Se expulsan las plantillas usadas hace más tiempo (LRU).
+    Cada plantilla se guarda como un Future: la construye, fuera del lock general, el
+    primer hilo que la pide; los que piden la misma plantilla esperan a que termine y el
+    resto de hilos siguen copiando las plantillas ya construidas.
+    """
+
+    def __init__(self, maximo=MAX_PLANTILLAS):
+        self.maximo = maximo
+        self.plantillas = OrderedDict()
+        self.construcciones = 0
+        self.lock = threading.Lock()
+
+    def _obtener(self, nombre, perfil, n_dias):
+        """
+        Plantilla (modelo, variables, lock de la plantilla) de un modelo; se construye si no está.
+        """
+        # Los modelos diarios no dependen del horizonte
+        dias = None if nombre in MODELOS_DIARIOS else n_dias
+        clave = (nombre, dias, json.dumps(perfil_serializable(perfil), sort_keys=True, ensure_ascii=False))
+        with self.lock:
+            futuro = self.plantillas.get(clave)
+            construir_aqui = futuro is None
+            if construir_aqui:
+                futuro = self.plantillas[clave] = Future()
+            self.plantillas.move_to_end(clave)
+        if construir_aqui:
+            try:
+                model, variables = construir(nombre, perfil, n_dias)
+                model.update()
+            except Exception as e:
+                with self.lock:
+                    if self.plantillas.get(clave) is futuro:
+                        del self.plantillas[clave]
+                futuro.set_exception(e)
+                raise
+            futuro.set_result((model, variables, threading.Lock()))
+            with self.lock:
+                self.construcciones += 1
+                self._expulsar()
+        return futuro.result()
+
+    def _expulsar(self):
+        """
+        Quita las plantillas construidas usadas hace más tiempo hasta no pasar del máximo
+        (hay que llamarla con el lock tomado). Los modelos no se liberan aquí: el recolector
+        los libera cuando ya no los usa ninguna copia en curso.
+        """
+        for clave in [c for c, futuro in self.plantillas.items() if futuro.done()]:
+            if len(self.plantillas) <= self.maximo:
+                break
+            del self.plantillas[clave]
+
+    def preparar(self, nombre, perfil, n_dias):
+        """
+        Construye la plantilla de un modelo sin copiarla.
+        """
+        self._obtener(nombre, perfil, n_dias)
+
+    def copiar(self, nombre, perfil, n_dias, env):
+        """
+        Devuelve una copia del modelo en el entorno env y las variables de la plantilla
+        (las copias conservan el orden de las variables, así que sirven para leer la
+        solución de la copia con Solucion.valor).
+        """
+        model, variables, lock = self._obtener(nombre, perfil, n_dias)
+        # Gurobi no admite accesos simultáneos a un mismo modelo desde varios hilos
+        with lock:
+            return model.copy(env), variables
+
+
+class Metricas:
+    """
+    Profundidad de la cola, peticiones en curso y latencias recientes del servicio.
+    """
+
+    def __init__(self, ventana=VENTANA_LATENCIAS):
+        self.lock = threading.Lock()
+        self.en_cola = 0
+        self.max_en_cola = 0
+        self.en_curso = 0
+        self.atendidas = 0
+        self.errores = 0
+        self.latencias = deque(maxlen=ventana)
+        self.esperas = deque(maxlen=ventana)
+        self.por_modelo = {}
+
+    def encolada(self):
+        with self.lock:
+            self.en_cola += 1
+            self.max_en_cola = max(self.max_en_cola, self.en_cola)
+
+    def iniciada(self):
+        with self.lock:
+            self.en_cola -= 1
+            self.en_curso += 1
+
+    def terminada(self, modelo, espera, latencia, error=False):
+        with self.lock:
+            self.en_curso -= 1
+            self.atendidas += 1
+            self.errores += int(error)
+            self.latencias.append(latencia)
+            self.esperas.append(espera)
+            self.por_modelo.setdefault(modelo, deque(maxlen=self.latencias.maxlen)).append(latencia)
+
+    def resumen(self):
+        with self.lock:
+            return {
+                "en_cola": self.en_cola,
+                "max_en_cola": self.max_en_cola,
+                "en_curso": self.en_curso,
+                "atendidas": self.atendidas,
+                "errores": self.errores,
+                "latencia_s": _percentiles(self.latencias),
+                "espera_s": _percentiles(self.esperas),
+                "latencia_por_modelo_s": {m: _percentiles(v) for m, v in self.por_modelo.items()},
+            }
+
+
+def _percentiles(valores):
+    if not valores:
+        return {}
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(list(valores), PERCENTILES))}
+
+
+class ServicioDieta:
+    """
+    Cola de peticiones atendida por varios trabajadores, cada uno con su entorno de Gurobi,
+    que resuelven copias de las plantillas de los modelos.
+    """
+
+    def __init__(self, modelos=MODELOS, n_dias=7, trabajadores=None, limite_maximo=LIMITE_MAXIMO):
+        self.n_dias = n_dias
+        self.limite_maximo = limite_maximo
+        self.plantillas = Plantillas()
+        self.metricas = Metricas()
+        self.cola = queue.Queue()
+
+        # Plantillas del perfil base, construidas antes de aceptar peticiones
+        for nombre in modelos:
+            self.plantillas.preparar(nombre, PERFIL_BASE, n_dias)
+
+        self.trabajadores = [threading.Thread(target=self._trabajar, daemon=True)
+                             for _ in range(trabajadores or os.cpu_count() or 1)]
+        for t in self.trabajadores:
+            t.start()
+
+    def enviar(self, peticion):
+        """
+        Pone una petición en la cola y devuelve un Future con su respuesta.
+        """
+        futuro = Future()
+        self.metricas.encolada()
+        self.cola.put((peticion, futuro, time.perf_counter()))
+        return futuro
+
+    def _trabajar(self):
+        env = gp.Env(params={"OutputFlag": 0})
+        while True:
+            peticion, futuro, llegada = self.cola.get()
+            self.metricas.iniciada()
+            espera = time.perf_counter() - llegada
+            modelo = peticion.get("modelo", "Modelo2") if isinstance(peticion, dict) else None
+            try:
+                respuesta = self._resolver(peticion, env)
+            except Exception as e:
+                self.metricas.terminada(modelo, espera, time.perf_counter() - llegada, error=True)
+                futuro.set_exception(e)
+                continue
+            latencia = time.perf_counter() - llegada
+            respuesta.update(espera=espera, latencia=latencia)
+            self.metricas.terminada(modelo, espera, latencia, error=respuesta["estado"] == "error")
+            futuro.set_result(respuesta)
+
+    def _resolver(self, peticion, env):
+        """
+        Resuelve una petición en el entorno del trabajador. Los datos incorrectos de la
+        petición producen ValueError; los errores del resolutor (Gurobi, HiGHS o SciPy) se
+        devuelven con estado "error".
+        """
+        if not isinstance(peticion, dict):
+            raise ValueError("La petición debe ser un objeto JSON.")
+        nombre = peticion.get("modelo", "Modelo2")
+        resolutor = peticion.get("resolutor", "gurobi")
+        if nombre not in MODELOS:
+            raise ValueError(f"Modelo desconocido: {nombre} (disponibles: {', '.join(MODELOS)})")
+        if resolutor not in RESOLUTORES:
+            raise ValueError(f"Resolutor desconocido: {resolutor} (disponibles: {', '.join(RESOLUTORES)})")
+        n_dias = int(peticion.get("dias", self.n_dias))
+        limite = min(float(peticion.get("limite_tiempo", self.limite_maximo)), self.limite_maximo)
+        perfil = crear_perfil(peticion.get("perfil", {}))
+
+        respuesta = {"modelo": nombre, "perfil": perfil["nombre"], "resolutor": resolutor}
+        copia, variables = self.plantillas.copiar(nombre, perfil, n_dias, env)
+        try:
+            solucion = resolver(copia, resolutor, limite_tiempo=limite, hilos=peticion.get("hilos", 1))
+        except Exception as e:
+            respuesta.update(estado="error", mensaje=f"{type(e).__name__}: {e}")
+            return respuesta
+        finally:
+            copia.dispose()
+        respuesta.update(estado=solucion.estado, tiempo_resolucion=solucion.tiempo)
+        if solucion.tiene_solucion:
+            respuesta.update(coste=solucion.objetivo, cota=solucion.cota,
+                             plan=extraer_plan(nombre, variables, solucion, n_dias))
+        return respuesta
+
+    def estado(self):
+        resumen = self.metricas.resumen()
+        resumen.update(trabajadores=len(self.trabajadores), plantillas=len(self.plantillas.plantillas),
+                       construcciones=self.plantillas.construcciones)
+        return resumen
+
+
+def crear_servidor(servicio, puerto=PUERTO, host="127.0.0.1"):
+    """
+    Servidor HTTP (un hilo por conexión) que pasa las peticiones al servicio.
+    """
+
+    class Manejador(BaseHTTPRequestHandler):
+        def _responder(self, codigo, cuerpo):
+            datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            if self.path == "/estado":
+                self._responder(200, servicio.estado())
+            elif self.path == "/salud":
+                self._responder(200, {"ok": True})
+            else:
+                self._responder(404, {"error": f"Ruta desconocida: {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/resolver":
+                self._responder(404, {"error": f"Ruta desconocida: {self.path}"})
+                return
+            try:
+                longitud = int(self.headers.get("Content-Length", 0))
+                peticion = json.loads(self.rfile.read(longitud) or b"{}")
+                self._responder(200, servicio.enviar(peticion).result())
+            except (ValueError, TypeError) as e:
+                self._responder(400, {"error": str(e)})
+            except Exception as e:
+                self._responder(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, formato, *args):
+            pass
+
+    return ThreadingHTTPServer((host, puerto), Manejador)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de resolución de los modelos de dieta.")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="peticiones resueltas a la vez (por defecto, una por núcleo)")
+    parser.add_argument("--modelos", nargs="+", choices=MODELOS, default=MODELOS,
+                        help="modelos cuya plantilla se construye al arrancar")
+    parser.add_argument("--dias", type=int, default=7, help="días del horizonte por defecto")
+    parser.add_argument("--limite", type=float, default=LIMITE_MAXIMO, help="límite de tiempo máximo por petición (s)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    servicio = ServicioDieta(args.modelos, args.dias, args.trabajadores, args.limite)
+    servidor = crear_servidor(servicio, args.puerto)
+    print(f"Plantillas construidas en {time.perf_counter() - inicio:.1f} s. "
+          f"Escuchando en http://127.0.0.1:{args.puerto} ({len(servicio.trabajadores)} trabajadores)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
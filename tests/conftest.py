@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Configuración de las pruebas: los módulos del repositorio y los scripts de preprocesado
+se importan desde sus carpetas, como cuando se ejecutan.
+"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "Prepocesado de datos")]
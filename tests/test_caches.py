@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las cachés en disco (cache_disco.py, cache_ia.py y cache_soluciones.py).
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from cache_disco import CacheDisco
+from cache_ia import CacheIA, normalizar_prompt
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_normalizar_prompt():
+    prompt = "  Desayuno:\n\n    avena   80 g \n\t\nleche  200 ml\n"
+    assert normalizar_prompt(prompt) == "Desayuno:\navena 80 g\nleche 200 ml"
+
+
+def test_clave_ia_ignora_el_formato_del_prompt(tmp_path):
+    cache = CacheIA(str(tmp_path))
+    clave = cache.clave("Día 1:\n  avena 80 g", "modelo-a", {"temperatura": 0.2})
+    assert clave == cache.clave("Día 1:\n\navena   80 g  ", "modelo-a", {"temperatura": 0.2})
+    assert clave != cache.clave("Día 1:\navena 90 g", "modelo-a", {"temperatura": 0.2})
+    assert clave != cache.clave("Día 1:\navena 80 g", "modelo-b", {"temperatura": 0.2})
+    assert clave != cache.clave("Día 1:\navena 80 g", "modelo-a", {"temperatura": 0.7})
+
+
+def test_cache_ia_guarda_y_cuenta(tmp_path):
+    cache = CacheIA(str(tmp_path))
+    clave = cache.clave("Día 1", "modelo-a")
+    assert cache.obtener(clave) is None
+    cache.guardar(clave, "menú del día 1", "modelo-a")
+    assert cache.obtener(clave) == "menú del día 1"
+    e = cache.estadisticas()
+    assert (e["aciertos"], e["fallos"], e["entradas"], e["tasa_aciertos"]) == (1, 1, 1, 0.5)
+    cache.vaciar()
+    assert cache.estadisticas()["entradas"] == 0
+
+
+def test_expulsion_lru(tmp_path):
+    cache = CacheIA(str(tmp_path), tamano_maximo=250)
+    claves = [cache.clave(f"Día {d}", "modelo-a") for d in range(3)]
+    for t, clave in enumerate(claves[:2]):
+        cache.guardar(clave, "x" * 80)
+        os.utime(os.path.join(cache.directorio, clave), (t, t))
+    # Usar la primera entrada la convierte en la más reciente: se expulsa la segunda
+    assert cache.obtener(claves[0]) is not None
+    cache.guardar(claves[2], "x" * 80)
+    assert cache.obtener(claves[1]) is None
+    assert cache.obtener(claves[0]) is not None and cache.obtener(claves[2]) is not None
+    assert cache.estadisticas()["expulsadas"] == 1
+
+
+def test_clave_soluciones(tmp_path, monkeypatch):
+    from cache_soluciones import CacheSoluciones
+    from perfil import PERFIL_BASE
+
+    # Las rutas de los ficheros y del código son relativas a la raíz del repositorio
+    monkeypatch.chdir(RAIZ)
+    cache = CacheSoluciones(str(tmp_path))
+    clave = cache.clave("Modelo3_alimentos", PERFIL_BASE, {"dias": 7}, ["alimentos.json"], ["Modelo3_alimentos.py"])
+    assert clave == cache.clave("Modelo3_alimentos", dict(PERFIL_BASE), {"dias": 7}, ["alimentos.json"],
+                                ["Modelo3_alimentos.py"])
+    assert clave != cache.clave("Modelo3_alimentos", PERFIL_BASE, {"dias": 14}, ["alimentos.json"],
+                                ["Modelo3_alimentos.py"])
+    otro = dict(PERFIL_BASE, nombre=PERFIL_BASE["nombre"] + " (copia)")
+    assert clave != cache.clave("Modelo3_alimentos", otro, {"dias": 7}, ["alimentos.json"], ["Modelo3_alimentos.py"])
+
+
+def _consultar(directorio, n):
+    cache = CacheIA(directorio)
+    for k in range(n):
+        cache.obtener(cache.clave(f"Día {k}", "modelo-a"))
+
+
+def test_estadisticas_con_varios_procesos(tmp_path):
+    # Las cuentas de varios procesos sobre la misma caché no se pierden
+    procesos = [multiprocessing.Process(target=_consultar, args=(str(tmp_path), 50)) for _ in range(4)]
+    for proceso in procesos:
+        proceso.start()
+    for proceso in procesos:
+        proceso.join()
+    assert CacheIA(str(tmp_path)).estadisticas()["fallos"] == 200
+
+
+def test_cache_disco_es_abstracta(tmp_path):
+    with pytest.raises(TypeError):
+        CacheDisco(str(tmp_path), 2**20)
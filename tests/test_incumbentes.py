@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del gap relativo de los incumbentes publicados (incumbentes.py).
+"""
+
+import math
+
+import pytest
+
+pytest.importorskip("gurobipy")
+
+from incumbentes import _gap  # noqa: E402
+
+
+def test_gap_como_gurobi():
+    assert _gap(10.0, 9.0) == pytest.approx(0.1)
+    assert _gap(10.0, 10.0) == 0.0
+    assert _gap(-10.0, -11.0) == pytest.approx(0.1)
+
+
+def test_gap_con_objetivo_nulo():
+    assert _gap(0.0, 0.0) == 0.0
+    assert math.isinf(_gap(0.0, -1.0))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del reparto de la dieta en prompts compactos con presupuesto de tokens (ModeloIA.py).
+"""
+
+import pytest
+
+from ModeloIA import INSTRUCCIONES_COMPACTAS, estimar_tokens, generar_prompts_compactos
+
+DIETA = {
+    f"Día {d}": {
+        "Desayuno": {"avena": 80.0, "leche": 250.0, "plátano": 120.0},
+        "Comida": {"arroz": 90.0, "pollo": 150.0, "tomate": 200.0, "aceite de oliva": 15.0},
+        "Cena": {"merluza": 180.0, "patata": 250.0, "yogur": 125.0},
+    }
+    for d in range(1, 8)
+}
+DIETA["Coste total"] = 31.5
+
+
+def _filas(prompts):
+    return [fila for _, prompt in prompts for fila in prompt.removeprefix(INSTRUCCIONES_COMPACTAS).splitlines()]
+
+
+def _presupuesto(filas):
+    return estimar_tokens(INSTRUCCIONES_COMPACTAS) + filas
+
+
+@pytest.mark.parametrize("filas", [1000, 200, 60, 30])
+def test_prompts_dentro_del_presupuesto(filas):
+    presupuesto = _presupuesto(filas)
+    prompts = generar_prompts_compactos(DIETA, presupuesto)
+    assert all(estimar_tokens(prompt) <= presupuesto for _, prompt in prompts)
+    assert all(prompt.startswith(INSTRUCCIONES_COMPACTAS) for _, prompt in prompts)
+    # Están todos los alimentos de todos los días, en orden
+    alimentos = [(fila.split("|")[0], comida.rsplit(" ", 1)[0])
+                 for fila in _filas(prompts) for comida in fila.split("|")[2].split(", ")]
+    assert alimentos == [(dia.removeprefix("Día "), alimento) for dia, franjas in DIETA.items()
+                         if dia != "Coste total" for comidas in franjas.values() for alimento in comidas]
+
+
+def test_bloques_de_dias_enteros():
+    prompts = generar_prompts_compactos(DIETA, _presupuesto(100))
+    assert len(prompts) > 1
+    # Cada día está entero en un único prompt
+    dias = [{fila.split("|")[0] for fila in _filas([prompt])} for prompt in prompts]
+    assert sum(len(d) for d in dias) == 7
+    assert prompts[0][0] == f"Días 1 a {max(dias[0], key=int)}"
+    assert len(generar_prompts_compactos(DIETA, _presupuesto(1000))) == 1
+
+
+def test_franja_que_no_cabe_se_reparte_por_alimentos():
+    prompts = generar_prompts_compactos(DIETA, _presupuesto(15))
+    comida = [fila for fila in _filas(prompts) if fila.startswith("1|comida|")]
+    assert len(comida) > 1
+    assert ", ".join(fila.split("|")[2] for fila in comida) == "arroz 90, pollo 150, tomate 200, aceite de oliva 15"
+
+
+def test_presupuesto_insuficiente():
+    with pytest.raises(ValueError):
+        generar_prompts_compactos(DIETA, estimar_tokens(INSTRUCCIONES_COMPACTAS))
+    with pytest.raises(ValueError):
+        generar_prompts_compactos(DIETA, _presupuesto(3))
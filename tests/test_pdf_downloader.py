@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del limitador de peticiones y de los nombres de fichero de pdf_downloader.py.
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+
+from pdf_downloader import RateLimiter, unique_files  # noqa: E402
+
+
+def _tiempo(limiter, urls):
+    inicio = time.monotonic()
+    hilos = [threading.Thread(target=limiter.wait, args=(url,)) for url in urls]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return time.monotonic() - inicio
+
+
+def test_rate_limiter_separa_las_peticiones_al_mismo_servidor():
+    # 5 peticiones a 20 por segundo: la última espera al menos 4 / 20 s
+    assert _tiempo(RateLimiter(20), ["http://a/pdf"] * 5) >= 0.19
+
+
+def test_rate_limiter_no_espera_entre_servidores_distintos():
+    assert _tiempo(RateLimiter(2), [f"http://servidor{k}/pdf" for k in range(5)]) < 0.2
+
+
+def test_rate_limiter_sin_limite():
+    assert _tiempo(RateLimiter(0), ["http://a/pdf"] * 20) < 0.2
+
+
+def test_unique_files_numera_los_nombres_repetidos():
+    pdfs = unique_files([
+        {"food": "Pan", "link": "a"},
+        {"food": "pan", "link": "b"},
+        {"food": "Pan", "link": "a"},
+        {"food": "Pan", "link": "c"},
+        {"food": "Leche", "link": "d"},
+    ])
+    assert [(pdf["link"], pdf["file"]) for pdf in pdfs] == [
+        ("a", "Pan.pdf"), ("b", "pan (2).pdf"), ("c", "Pan (3).pdf"), ("d", "Leche.pdf")]
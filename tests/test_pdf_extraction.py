@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las diferencias entre extracciones y de su traslado a alimentos.json
+(pdf_extraction.py).
+"""
+
+import json
+import os
+
+import pytest
+
+from pdf_extraction import diff_records, extract_pdf, merge_alimentos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANTES = {
+    "abadejo": {"Categoría": "Pescados", "Energía (Kcal)": "76", "Proteínas (g)": "17.4"},
+    "aceite de oliva": {"Categoría": "Aceites y grasas", "Hidratos de carbono (g)": "Tr"},
+    "acelga": {"Categoría": "Verduras y hortalizas", "Energía (Kcal)": "20"},
+}
+DESPUES = {
+    "abadejo": {"Categoría": "Pescados", "Energía (Kcal)": "78", "Proteínas (g)": "17.4"},
+    "aceite de oliva": {"Categoría": "Aceites y grasas", "Hidratos de carbono (g)": "0.1"},
+    "aguacate": {"Categoría": "Frutas", "Energía (Kcal)": "141"},
+}
+
+
+def _alimentos(tmp_path, alimentos):
+    ruta = tmp_path / "alimentos.json"
+    ruta.write_text(json.dumps(alimentos, ensure_ascii=False, indent=4), encoding="utf-8")
+    return ruta
+
+
+def test_diff_records():
+    informe = diff_records(ANTES, DESPUES)
+    assert informe["nuevos"] == ["aguacate"]
+    assert informe["eliminados"] == ["acelga"]
+    assert informe["cambios"] == [
+        {"alimento": "abadejo", "nutriente": "Energía (Kcal)", "antes": "76", "despues": "78"},
+        {"alimento": "aceite de oliva", "nutriente": "Hidratos de carbono (g)", "antes": "Tr", "despues": "0.1"},
+    ]
+
+
+def test_diff_records_nutriente_nuevo_o_eliminado():
+    cambios = diff_records({"pan": {"Energía (Kcal)": "261"}}, {"pan": {"Proteínas (g)": "8"}})["cambios"]
+    assert cambios == [
+        {"alimento": "pan", "nutriente": "Energía (Kcal)", "antes": "261", "despues": None},
+        {"alimento": "pan", "nutriente": "Proteínas (g)", "antes": None, "despues": "8"},
+    ]
+
+
+def test_merge_alimentos_actualiza_sin_cambiar_el_formato(tmp_path):
+    ruta = _alimentos(tmp_path, {
+        "abadejo": {"Energía (Kcal)": "76", "Precio (€/100g)": "2.60"},
+        "aceite de oliva": {"Hidratos de carbono (g)": "0", "Precio (€/100g)": "0.44"},
+    })
+    texto = ruta.read_text(encoding="utf-8")
+    actualizados, conflictos = merge_alimentos(diff_records(ANTES, DESPUES)["cambios"], str(ruta))
+    assert len(actualizados) == 2 and conflictos == []
+    # "Tr" extraído se corresponde con "0" en alimentos.json
+    esperado = texto.replace('"Energía (Kcal)": "76"', '"Energía (Kcal)": "78"').replace(
+        '"Hidratos de carbono (g)": "0"', '"Hidratos de carbono (g)": "0.1"')
+    assert ruta.read_text(encoding="utf-8") == esperado
+
+
+def test_merge_alimentos_no_sobrescribe_valores_corregidos(tmp_path):
+    ruta = _alimentos(tmp_path, {"abadejo": {"Energía (Kcal)": "80"}})
+    texto = ruta.read_text(encoding="utf-8")
+    actualizados, conflictos = merge_alimentos(diff_records(ANTES, DESPUES)["cambios"], str(ruta))
+    assert actualizados == []
+    assert conflictos == [{"alimento": "abadejo", "nutriente": "Energía (Kcal)", "antes": "76", "despues": "78",
+                           "alimentos": "80"}]
+    assert ruta.read_text(encoding="utf-8") == texto
+
+
+def test_merge_alimentos_con_otro_formato(tmp_path):
+    ruta = tmp_path / "alimentos.json"
+    ruta.write_text('{"abadejo":{"Energía (Kcal)":"76"}}', encoding="utf-8")
+    actualizados, _ = merge_alimentos(diff_records(ANTES, DESPUES)["cambios"], str(ruta))
+    assert len(actualizados) == 1
+    assert json.loads(ruta.read_text(encoding="utf-8")) == {"abadejo": {"Energía (Kcal)": "78"}}
+
+
+def test_merge_alimentos_sin_fichero(tmp_path, capsys):
+    assert merge_alimentos(diff_records(ANTES, DESPUES)["cambios"], str(tmp_path / "no.json")) == ([], [])
+    assert "Aviso" in capsys.readouterr().out
+
+
+def test_precomprobacion_no_cambia_la_extraccion():
+    # Muestra de los PDFs del repositorio (la comparación completa con los 229 PDFs es la
+    # columna "= original" de python -m benchmarks.extraccion_pdfs)
+    pytest.importorskip("pdfplumber")
+    carpeta = os.path.join(RAIZ, "pdfs datos de alimentos")
+    if not os.path.isdir(carpeta):
+        pytest.skip("no están los PDFs de alimentos")
+    ficheros = sorted(f for f in os.listdir(carpeta) if f.lower().endswith(".pdf"))[::10]
+    for fichero in ficheros:
+        ruta = os.path.join(carpeta, fichero)
+        assert extract_pdf(ruta, precheck=True) == extract_pdf(ruta, precheck=False), fichero